@@ -0,0 +1,92 @@
+"""Aho–Corasick multi-pattern matcher.
+
+Compiles a set of patterns into an automaton once; each search is then one
+pass over the input, whatever the number of patterns. Patterns and input
+are sequences of hashable symbols: characters of a string, or words of a
+tokenized utterance, which makes every match a whole-word match and takes
+one step per word instead of per character.
+"""
+from collections import deque
+
+
+class AhoCorasick:
+    """Finds every occurrence of a fixed set of patterns in one scan.
+
+    ``patterns`` is an iterable of ``(pattern, value)`` where a pattern is a
+    str or a tuple of symbols; a pattern given twice keeps its first value.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]       # state -> {symbol: next state}, trie edges only
+        self._outputs = [()]    # state -> ((length, value), ...), longest first
+        self.values = {}
+
+        for pattern, value in patterns:
+            pattern = tuple(pattern)
+            if not pattern or pattern in self.values:
+                continue
+            self.values[pattern] = value
+            state = 0
+            for symbol in pattern:
+                nxt = self._goto[state].get(symbol)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][symbol] = nxt
+                    self._goto.append({})
+                    self._outputs.append(())
+                state = nxt
+            self._outputs[state] = ((len(pattern), value),)
+
+        # Failure link: the state for the longest proper suffix of this
+        # state's path that is also a trie path. Computed breadth-first, so a
+        # state's failure state (always shallower) is done before it.
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, nxt in self._goto[state].items():
+                self._fail[nxt] = self._step(self._fail[state], symbol) if state else 0
+                self._outputs[nxt] += self._outputs[self._fail[nxt]]
+                queue.append(nxt)
+
+    def _step(self, state, symbol):
+        goto, fail = self._goto, self._fail
+        while state and symbol not in goto[state]:
+            state = fail[state]
+        return goto[state].get(symbol, 0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def iter_matches(self, sequence):
+        """Every ``(start, end, value)`` occurrence, overlapping ones included, by end"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for index, symbol in enumerate(sequence):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for length, value in outputs[state]:
+                yield index + 1 - length, index + 1, value
+
+    def search(self, sequence):
+        """Leftmost-longest, non-overlapping ``(start, end, value)`` matches"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        longest = {}    # start -> (end, value) of the longest match starting there
+        state = 0
+        for index, symbol in enumerate(sequence):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            # Matches arrive by end, so a later one from the same start is longer
+            for length, value in outputs[state]:
+                longest[index + 1 - length] = (index + 1, value)
+
+        matches = []
+        covered = 0
+        for start in sorted(longest):
+            if start >= covered:
+                end, value = longest[start]
+                matches.append((start, end, value))
+                covered = end
+        return matches
@@ -0,0 +1,102 @@
+"""Every way an utterance can name a menu item, compiled into one automaton.
+
+Menu names, item_prefix_mapping, size_required_items, drink_name_mapping
+and item_name_mapping are folded into a single ``{words: target}`` table
+and one word-level Aho–Corasick automaton, so finding every menu mention
+in a phrase is one scan of its words. The longest mention wins: "spicy
+deluxe" is the Spicy Deluxe Sandwich, not the "spicy" alias.
+
+Targets are what a cart line is named after: a priced menu name, or for
+sized items the base name ("Soft Drink") that a size is appended to.
+"""
+from aho_corasick import AhoCorasick
+
+# "Spicy Deluxe Sandwich" can also be ordered as "spicy deluxe"
+GENERIC_SUFFIXES = ('sandwich', 'salad')
+# Alias chains ("lemonade" -> "Lemonade" -> "Chick-fil-A Lemonade") are followed this far
+MAX_ALIAS_HOPS = 4
+
+
+def tokenize(text):
+    """``"2 fries, a Coke."`` -> ``['2', 'fries', ',', 'a', 'coke']``"""
+    return text.lower().rstrip('.!? ').replace(',', ' , ').split()
+
+
+def _plural(words):
+    last = words[-1]
+    return words[:-1] + (last + ('es' if last.endswith(('ch', 'sh')) else 's'),)
+
+
+class AliasMatcher:
+    def __init__(self, price_list, item_name_mapping, size_required_items,
+                 drink_name_mapping=None, item_prefix_mapping=None):
+        """Aliases whose target is not on the menu (e.g. "nuggets" without a
+        count) are left out. Earlier tables win when two define the same words."""
+        self._orderable = {name for name in price_list if ' (' not in name}
+        self._orderable.update(size_required_items.values())
+        self._tables = (item_prefix_mapping or {}, size_required_items,
+                        drink_name_mapping or {}, item_name_mapping)
+
+        table = {}
+        for name in sorted(self._orderable):
+            table.setdefault(tuple(tokenize(name)), name)
+        for mapping in self._tables:
+            for alias in mapping:
+                target = self._follow(alias)
+                if target:
+                    table.setdefault(tuple(tokenize(alias)), target)
+        for name in sorted(self._orderable):
+            words = tuple(tokenize(name))
+            if len(words) > 2 and words[-1] in GENERIC_SUFFIXES:
+                table.setdefault(words[:-1], name)
+        for words, target in list(table.items()):
+            if '&' in words:
+                # "Mac & Cheese" is said "mac and cheese"
+                table.setdefault(tuple('and' if word == '&' else word for word in words), target)
+        for words, target in list(table.items()):
+            table.setdefault(_plural(words), target)
+
+        self._table = table
+        self._automaton = AhoCorasick(table.items())
+
+    def _follow(self, alias):
+        """The orderable name ``alias`` leads to through the alias tables, or None"""
+        name = alias
+        for _ in range(MAX_ALIAS_HOPS):
+            for mapping in self._tables:
+                if name in mapping and mapping[name] != name:
+                    name = mapping[name]
+                    break
+            else:
+                break
+            if name in self._orderable:
+                break
+        return name if name in self._orderable else None
+
+    @property
+    def patterns(self):
+        """``(words, target)`` for every alias, for automata that extend this one"""
+        return self._table.items()
+
+    def lookup(self, phrase):
+        """Target of ``phrase`` when it is exactly a menu name or alias (any case), else None"""
+        return self._table.get(tuple(tokenize(phrase)))
+
+    def resolve(self, phrase):
+        """``lookup``, else the longest mention in ``phrase``, else None"""
+        return self.lookup(phrase) or self.best(phrase)
+
+    def find(self, text):
+        """Every menu mention in ``text``: ``(start word, end word, target)``, leftmost-longest"""
+        return self._automaton.search(tokenize(text))
+
+    def mentions(self, text):
+        return [target for _, _, target in self.find(text)]
+
+    def best(self, text):
+        """Target of the longest mention in ``text`` (the first, on a tie), or None"""
+        best, best_length = None, 0
+        for start, end, target in self.find(text):
+            if end - start > best_length:
+                best, best_length = target, end - start
+        return best
@@ -1,103 +1,183 @@
-from flask import Flask, request, jsonify, render_template
-from static_data import price_list, item_name_mapping, size_required_items, menu_items
+import time
+# Startup timing report: phases are marked as the module loads
+_startup_began = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
+from config import Config
+from session_store import create_session_store
+from intent_router import IntentRouter, IntentRequest
+from catalog import CatalogStore
+from cart import base_name, dollars, to_cents
+from order_parser import MAX_QUANTITY, NUMBER_WORDS, stated_size
+from fast_path import FastPathClassifier
+from intent_cache import IntentCache, cache_key
+from idempotency import WebhookResponses, response_key
+from logging_setup import configure_logging, PayloadSampler
+from webhook_batch import run_batch, to_ndjson
+from metrics import MetricsRegistry
+from profiler import RequestProfiler
+import functools
+import hmac
+import logging
 import os
 import json
-import re
-from google.cloud.dialogflow_v2 import SessionsClient
-from google.cloud.dialogflow_v2.types import TextInput, QueryInput
-from google.oauth2 import service_account
-import time
+import threading
+
+
+startup_phases = [('imports', time.perf_counter() - _startup_began)]
+_startup_last_mark = time.perf_counter()
+
 
+def mark_startup(phase):
+    """Record the time spent since the previous mark under ``phase``"""
+    global _startup_last_mark
+    now = time.perf_counter()
+    startup_phases.append((phase, now - _startup_last_mark))
+    _startup_last_mark = now
+
+
+configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT)
+logger = logging.getLogger(__name__)
+# Raw webhook bodies: debug-only unless LOG_PAYLOAD_SAMPLE_EVERY is set
+payload_sampler = PayloadSampler(logger, Config.LOG_PAYLOAD_SAMPLE_EVERY)
 
 # At the top of your file, after imports
 app = Flask(__name__)
 CORS(app)
 
-# Initialize Dialogflow client at startup
+# Dialogflow agent the chat UI talks to
+DIALOGFLOW_PROJECT_ID = 'fast-food-chatbot'
+
+# Seconds to wait before retrying a Dialogflow client that failed to build
+DIALOGFLOW_INIT_RETRY_SECONDS = 30
+
+# The Dialogflow SDK is imported, and credentials and the gRPC client are
+# built, on first use rather than at import, so booting a worker (or
+# serving only /webhook) never loads google.cloud, parses credentials or
+# opens a channel. app.config['DIALOGFLOW_CLIENT'] holds the client once
+# built; setting it beforehand (e.g. to a stub) skips initialization.
+app.config['DIALOGFLOW_CLIENT'] = None
+_dialogflow_lock = threading.Lock()
+# Separate from _dialogflow_lock, which is held while the client is built
+# and the credentials are loaded from inside that
+_credentials_lock = threading.Lock()
+_dialogflow_credentials = None
+_dialogflow_retry_at = 0.0
+
+
+def load_dialogflow_credentials():
+    """Load service-account credentials for the Dialogflow client"""
+    from google.oauth2 import service_account
+
+    if os.getenv('FLASK_ENV') == 'production':
+        logger.info("Loading production credentials from environment variable")
+        credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
+        if not credentials_json:
+            raise ValueError(
+                "GOOGLE_CREDENTIALS_JSON environment variable not set")
+
+        credentials_dict = json.loads(credentials_json)
+        logger.info("Credentials loaded successfully")
+        return service_account.Credentials.from_service_account_info(
+            credentials_dict)
+    else:
+        logger.info("Loading development credentials from file")
+        credentials_path = 'credentials/service-account.json'
+        return service_account.Credentials.from_service_account_file(
+            credentials_path)
 
 
-# Global variables
-dialogflow_client = None
+def get_dialogflow_credentials():
+    """Service-account credentials, loaded once per process and then reused"""
+    global _dialogflow_credentials
+    if _dialogflow_credentials is None:
+        with _credentials_lock:
+            if _dialogflow_credentials is None:
+                _dialogflow_credentials = load_dialogflow_credentials()
+    return _dialogflow_credentials
 
 
 def init_dialogflow():
     """Initialize Dialogflow client"""
-    global dialogflow_client
+    import grpc
+    from google.cloud.dialogflow_v2 import SessionsClient
+    from google.cloud.dialogflow_v2.services.sessions.transports import SessionsGrpcTransport
+
     try:
-        if os.getenv('FLASK_ENV') == 'production':
-            print("Loading production credentials from environment variable")
-            credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
-            if not credentials_json:
-                raise ValueError(
-                    "GOOGLE_CREDENTIALS_JSON environment variable not set")
-
-            credentials_dict = json.loads(credentials_json)
-            print("Credentials loaded successfully")
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict)
+        if Config.DIALOGFLOW_ENDPOINT:
+            # Local stand-in (see fake_dialogflow.py): plaintext, no credentials
+            logger.info("Using Dialogflow endpoint %s", Config.DIALOGFLOW_ENDPOINT)
+            channel = grpc.insecure_channel(Config.DIALOGFLOW_ENDPOINT)
+            client = SessionsClient(transport=SessionsGrpcTransport(channel=channel))
         else:
-            print("Loading development credentials from file")
-            credentials_path = 'credentials/service-account.json'
-            credentials = service_account.Credentials.from_service_account_file(
-                credentials_path)
-
-        # Initialize Dialogflow client
-        client = SessionsClient(credentials=credentials)
-        print("Dialogflow client initialized successfully")
+            credentials = get_dialogflow_credentials()
+            # Initialize Dialogflow client
+            client = SessionsClient(credentials=credentials)
+        logger.info("Dialogflow client initialized successfully")
         return client
 
     except Exception as e:
-        print(f"Error initializing credentials: {str(e)}")
+        logger.error("Error initializing credentials: %s", e)
         raise
 
 
-# Initialize Dialogflow at startup
-try:
-    dialogflow_client = init_dialogflow()
-    app.config['DIALOGFLOW_CLIENT'] = dialogflow_client
-    print(f"Dialogflow client initialized: {dialogflow_client is not None}")
-except Exception as e:
-    print(f"Error initializing Dialogflow client: {str(e)}")
+def get_dialogflow_client():
+    """The process's SessionsClient, built on first use; None if it can't be built"""
+    global _dialogflow_retry_at
+    client = app.config['DIALOGFLOW_CLIENT']
+    if client is not None:
+        return client
+
+    with _dialogflow_lock:
+        client = app.config['DIALOGFLOW_CLIENT']
+        if client is None and time.monotonic() >= _dialogflow_retry_at:
+            start = time.perf_counter()
+            try:
+                client = init_dialogflow()
+            except Exception as e:
+                logger.error("Error initializing Dialogflow client: %s", e)
+                _dialogflow_retry_at = time.monotonic() + DIALOGFLOW_INIT_RETRY_SECONDS
+            else:
+                logger.info("Dialogflow client ready in %.1f ms",
+                            (time.perf_counter() - start) * 1000)
+                app.config['DIALOGFLOW_CLIENT'] = client
+    return client
+
+
+def reset_dialogflow_client():
+    """Drop the client (not the credentials) so the next use opens a fresh channel.
+
+    gRPC channels do not survive fork, so this runs in every forked child
+    (e.g. gunicorn workers with preload_app) before it serves anything.
+    """
+    global _dialogflow_lock, _credentials_lock, _dialogflow_retry_at
+    _dialogflow_lock = threading.Lock()
+    _credentials_lock = threading.Lock()
+    _dialogflow_retry_at = 0.0
     app.config['DIALOGFLOW_CLIENT'] = None
-print(f"Dialogflow client initialized: {dialogflow_client is not None}")
 
 
-# Global storage for orders and pending orders
-orders = {}
-pending_orders = {}
-last_ordered_item = {}
-awaiting_order_confirmation = {}
-awaiting_menu_response = {}  # Track menu query follow-ups
-awaiting_more_items = {}  # Track if we're asking about additional items
+os.register_at_fork(after_in_child=reset_dialogflow_client)
+
+if Config.DIALOGFLOW_PRELOAD:
+    # Pay for the SDK import at boot (once in the master under
+    # GUNICORN_PRELOAD) instead of on the first chat message
+    import google.cloud.dialogflow_v2  # noqa: F401
+    import google.oauth2.service_account  # noqa: F401
+    mark_startup('dialogflow sdk')
+
 
-# Add a function to clear orders for a session
+# Per-session conversation state (cart, pending item, awaiting-* flags).
+# The backend evicts idle sessions after SESSION_TTL_SECONDS and keeps at
+# most SESSION_MAX_SESSIONS of them.
+session_store = create_session_store(Config)
+mark_startup('session store')
 
 
 def clear_session_data(session_id):
-    if session_id in orders:
-        del orders[session_id]
-    if session_id in pending_orders:
-        del pending_orders[session_id]
-    if session_id in last_ordered_item:
-        del last_ordered_item[session_id]
-    if session_id in awaiting_order_confirmation:
-        del awaiting_order_confirmation[session_id]
-    if session_id in awaiting_menu_response:
-        del awaiting_menu_response[session_id]
-    if session_id in awaiting_more_items:
-        del awaiting_more_items[session_id]
-
-
-# Add these new global variables at the top
-drink_name_mapping = {
-    "Coke": "Soft Drink",
-    "Coca-Cola": "Soft Drink",
-    "Sprite": "Soft Drink",
-    "Dr Pepper": "Soft Drink",
-    "Diet Coke": "Soft Drink",
-    "Pepsi": "Soft Drink"
-}
+    session_store.delete(session_id)
+
 
 item_modifications = {
     "add": {},
@@ -121,31 +201,7 @@ def create_response_message(message):
 
 
 def parse_quantity(text):
-    number_words = {
-        'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
-    }
-    return number_words.get(text.lower(), 1)
-
-
-def calculate_total(order_items):
-    total = 0
-    for item in order_items:
-        food_item = item['food_item']
-        quantity = item.get('quantity', 1)
-        # Get base price from price list
-        price = price_list.get(food_item, 0)
-        total += price * quantity
-    return total
-
-
-# Add this mapping for items that need prefixes
-item_prefix_mapping = {
-    "Cool Wrap": "Grilled Cool Wrap",
-    # Add other items that need prefixes
-}
-
-# Add this helper function
+    return NUMBER_WORDS.get(text.lower(), 1)
 
 
 def create_response(message):
@@ -161,53 +217,25 @@ def create_response(message):
     })
 
 
-# Add these helper functions near the top with other helpers
+# Prices, name lookups and MenuQuery replies, rebuilt together whenever
+# catalog.json changes. A request uses one Catalog from start to finish.
+catalogs = CatalogStore(Config.CATALOG_PATH, keep=Config.CATALOG_KEEP_VERSIONS,
+                        shared_dir=Config.PRICE_TABLE_DIR)
+catalogs.watch(Config.CATALOG_POLL_SECONDS)
+mark_startup('catalog')
+
+
 def get_menu_items_by_category(category):
-    category_mapping = {
-        'sandwiches': ['Chicken Sandwich', 'Deluxe Chicken Sandwich', 'Spicy Chicken Sandwich',
-                       'Spicy Deluxe Sandwich', 'Grilled Chicken Sandwich', 'Grilled Chicken Club Sandwich'],
-        'salads': ['Cobb Salad', 'Spicy Southwest Salad', 'Market Salad', 'Side Salad'],
-        'drinks': [item for item in menu_items.keys() if any(x in item for x in ['Drink', 'Lemonade', 'Tea', 'Coffee', 'Milk', 'Sunjoy'])],
-        'desserts': [item for item in menu_items.keys() if any(x in item for x in ['Milkshake', 'Cookie', 'Icedream', 'Brownie'])],
-        'sides': [item for item in menu_items.keys() if any(x in item for x in ['Fries', 'Mac & Cheese', 'Fruit Cup', 'Soup'])]
-    }
-    return category_mapping.get(category.lower(), [])
+    return list(catalogs.current.snapshot.items_in(category))
 
 
 def format_menu_item_details(item_name):
-    item = menu_items.get(item_name)
-    if not item:
-        return None
-
-    price = item['price']
-    ingredients = ', '.join(item['ingredients'])
-    return f"{item_name}: ${price:.2f}\nIngredients: {ingredients}"
+    return catalogs.current.snapshot.details.get(item_name)
 
 
 def get_full_item_name(item_name):
     """Convert partial item names to their full menu item names"""
-    # Check direct mapping first
-    if item_name in item_name_mapping:
-        base_name = item_name_mapping[item_name]
-    else:
-        base_name = item_name
-
-    # If item requires size and no size specified, return small by default
-    if base_name in size_required_items:
-        if not any(size in item_name.lower() for size in ['small', 'medium', 'large']):
-            return f"{base_name} (Small)"
-
-    # Search for exact match first
-    for menu_item in menu_items.keys():
-        if base_name.lower() == menu_item.lower():
-            return menu_item
-
-    # If no exact match, search for partial match
-    for menu_item in menu_items.keys():
-        if base_name.lower() in menu_item.lower():
-            return menu_item
-
-    return None
+    return catalogs.current.menu_index.resolve(item_name)
 
 
 # Add at the top with other global variables
@@ -230,6 +258,7 @@ HANDLED_INTENTS = [
     'ModifyOrder',
     'Yes',
     'No',
+    'ConfirmOrder',
     'Default Welcome Intent',
     'MenuQuery',
     'OrderCompletion',
@@ -255,553 +284,879 @@ def get_consistent_session_id(session_path):
         return f"web-{int(time.time() * 1000)}"
 
 
+def get_store_id(session_id):
+    """Store a session is ordering from: the session ID's prefix before
+    STORE_SESSION_SEPARATOR, or None for the base prices"""
+    store_id, separator, _ = session_id.partition(Config.STORE_SESSION_SEPARATOR)
+    return store_id if separator else None
+
+
+_unpriced_reported = set()
+
+
+def add_to_cart(ctx, food_item, quantity=1):
+    """Add ``food_item`` to the session's cart, priced once at the session's store.
+    Returns the cart line, or None when the store does not sell the item (it
+    is on the menu but the store sets its price to null)."""
+    item_name = ctx.catalog.canonical_name(food_item)
+    price = ctx.prices.get(item_name)
+    if price is None and item_name in ctx.catalog.price_list:
+        logger.debug("Not adding %s: not sold at store %s", item_name, ctx.prices.store_id)
+        return None
+    line = ctx.state.orders.add(item_name, quantity, to_cents(price),
+                                ctx.catalog.categories_of(item_name))
+    if line.unit_cents is None:
+        unpriced_items.inc()
+        # Once per item and catalog version, not on every order
+        if (ctx.catalog.version, item_name) not in _unpriced_reported:
+            _unpriced_reported.add((ctx.catalog.version, item_name))
+            logger.warning("No price for %r (catalog version %s); it is left out of the total",
+                           item_name, ctx.catalog.version)
+    logger.debug("Added item: %s (Quantity: %s)", item_name, quantity)
+    return line
+
+
+def not_sold_text(item_names):
+    """Reply sentence for items the session's store does not sell"""
+    verb = 'is' if len(item_names) == 1 else 'are'
+    return f"Sorry, {', '.join(item_names)} {verb} not available at this location."
+
+
+def no_price_text(item_name):
+    return f"Sorry, I don't have a price for the {item_name}. Is there anything else I can get you?"
+
+
+def remove_from_cart(ctx, phrase):
+    """Remove what ``phrase`` names from the cart; returns the lines removed.
+
+    Categories ("drinks"), sized items and base names ("lemonade", every
+    size) go straight through the cart's indexes. Anything else, or a
+    name with no line in the cart, falls back to a substring scan.
+    """
+    cart = ctx.state.orders
+    target = ctx.catalog.removal_target(phrase)
+    if target is None:
+        lines = []
+    elif target[0] == 'category':
+        return cart.remove_category(target[1])
+    elif target[0] == 'item':
+        line = cart.remove(target[1])
+        lines = [line] if line else []
+    else:
+        lines = cart.remove_base(target[1])
+    if not lines:
+        remove_name = phrase.lower().strip()
+        lines = cart.remove_where(lambda item: remove_name in item.lower())
+    return lines
+
+
+def resolve_added_item(catalog, text, size=None):
+    """Menu name for an item added through ModifyOrder. A full menu name is
+    taken as is; otherwise the size said in ``text`` ("large lemonade"), else
+    ``size``, is applied where the item comes in one."""
+    exact = catalog.menu_index.exact(text)
+    if exact:
+        return exact
+    item_name = (catalog.menu_index.resolve(catalog.aliases.resolve(text) or text)
+                 or catalog.menu_index.resolve(text) or text)
+    size = stated_size(text) or size
+    if size and f"{base_name(item_name)} ({size})" in catalog.price_list:
+        return f"{base_name(item_name)} ({size})"
+    return item_name
+
+
+def confirm_order(state):
+    """Confirm the cart, clear it and return the confirmation message"""
+    cart = state.orders
+    message = (
+        f"Your order has been confirmed! Here's what you ordered:\n{cart.summary()}"
+        f"\nTotal: ${dollars(cart.subtotal_cents)}\nThank you for choosing Chick-fil-A!"
+    )
+
+    # Clear the order and confirmation status after processing
+    cart.clear()
+    state.awaiting_order_confirmation = False
+
+    return message
+
+
+# Intent handlers: each takes an IntentRequest and returns the reply text
+
+
+def handle_order_food(ctx):
+    if ctx.free_text:
+        return handle_order_food_text(ctx)
+
+    state = ctx.state
+    catalog = ctx.catalog
+    food_items = ctx.parameters.get('FoodItem', [])
+    sizes = ctx.parameters.get('Size', [])
+    numbers = ctx.parameters.get('number', [])
+
+    # Initialize index for sizes
+    size_idx = 0
+    unavailable = []
+
+    for idx, food_item in enumerate(food_items):
+        # Map the food item name to the menu item
+        mapped_item = catalog.aliases.lookup(food_item) or food_item
+
+        # Determine quantity
+        if idx < len(numbers) and numbers[idx]:
+            quantity = int(numbers[idx])
+        else:
+            quantity = 1  # Default quantity
+
+        # Determine if the item requires a size
+        if mapped_item in catalog.sized_item_names or mapped_item in catalog.size_required_items:
+            if size_idx < len(sizes):
+                size = sizes[size_idx]
+                size_idx += 1  # Move to the next size for subsequent items
+            else:
+                size = 'Medium'  # Default size
+            full_item_name = f"{mapped_item} ({size})"
+        else:
+            full_item_name = mapped_item
+
+        if add_to_cart(ctx, full_item_name, quantity) is None:
+            unavailable.append(full_item_name)
+
+    # Set context for additional items
+    state.awaiting_more_items = True
+
+    if state.orders:
+        response_message = "I've added to your order:\n" + state.orders.summary()
+        if unavailable:
+            response_message += f"{not_sold_text(unavailable)} "
+        response_message += "Would you like anything else?"
+    elif unavailable:
+        response_message = f"{not_sold_text(unavailable)} Would you like something else?"
+    else:
+        response_message = "I couldn't understand the items you want to order. Could you please rephrase your order?"
+
+    return response_message
+
+
+def handle_order_food_text(ctx):
+    """OrderFood for the /dialogflow path: parse the raw query into items"""
+    state = ctx.state
+    catalog = ctx.catalog
+    food_items = ctx.parameters.get('FoodItem', [])
+    # Size is a list parameter; an item without a stated size takes the first one given
+    sizes = ctx.parameters.get('Size') or []
+    default_size = sizes[0] if isinstance(sizes, list) and sizes else 'Medium'
+
+    added_items = []
+    unavailable = []
+    too_many = False
+    for parsed in catalog.order_parser.parse(ctx.query_text):
+        logger.debug("Parsed item: %s", parsed)
+        if parsed.quantity > MAX_QUANTITY:
+            too_many = True
+            continue
+        matched_item = parsed.item
+        if matched_item is None:
+            # Nothing on the menu by name: Dialogflow's FoodItem, then typos
+            # ("chiken sandwhich", "lemonaid") that would otherwise drop the item
+            matched_item = next((food_item for food_item in food_items
+                                 if food_item.lower() in parsed.text), None)
+            if matched_item is None:
+                matched_item = catalog.fuzzy_matcher.match(parsed.text)
+        if not matched_item:
+            continue
+
+        if matched_item in catalog.sized_item_names:
+            full_item_name = f"{matched_item} ({parsed.size or default_size})"
+        else:
+            full_item_name = matched_item
+        if add_to_cart(ctx, full_item_name, parsed.quantity) is None:
+            unavailable.append(full_item_name)
+            continue
+        added_items.append(
+            f"{parsed.quantity} {full_item_name}" if parsed.quantity > 1 else full_item_name)
+
+    limit_text = f"I can only add up to {MAX_QUANTITY} of an item at a time."
+    notes = ''
+    if unavailable:
+        notes += f"{not_sold_text(unavailable)} "
+    if too_many:
+        notes += f"{limit_text} "
+    if added_items:
+        items_text = ", ".join(added_items)
+        state.awaiting_more_items = True
+        return f"I've added {items_text} to your order. {notes}Would you like anything else?"
+    if unavailable:
+        return f"{notes}Would you like something else?"
+    if too_many:
+        return f"Sorry, {limit_text} Could you please order a smaller quantity?"
+
+    return "I didn't catch what food item you wanted. Could you please repeat that?"
+
+
+def add_pending_item(ctx, size):
+    """Finish the item waiting for a size (OrderFood - size / SpecifySize)"""
+    state = ctx.state
+    if state.last_ordered_item:
+        pending_item = state.last_ordered_item
+        food_item = pending_item['item']
+        quantity = pending_item['quantity']
+
+        full_item_name = f"{food_item} ({size})"
+        line = add_to_cart(ctx, full_item_name, quantity)
+        state.last_ordered_item = None
+        if line is None:
+            return f"{not_sold_text([full_item_name])} Would you like something else?"
+
+        return f"I've added {quantity} {full_item_name} to your order. Would you like anything else?"
+
+
+def handle_order_food_size(ctx):
+    return add_pending_item(ctx, ctx.parameters.get('size', ''))
+
+
+def handle_specify_size(ctx):
+    return add_pending_item(ctx, ctx.parameters.get('Size', ''))
+
+
+def handle_order_nuggets(ctx):
+    ctx.state.awaiting_menu_response = {
+        'context': 'nugget_type',
+        'item': 'nuggets'
+    }
+    return "Would you like regular or grilled nuggets?"
+
+
+def handle_modify_order(ctx):
+    logger.debug("Processing ModifyOrder intent")
+    state = ctx.state
+    parameters = ctx.parameters
+    actions = parameters.get('ModifyAction', [])
+    items_to_remove = parameters.get('ItemsToRemove', '')
+    items_to_add = parameters.get('ItemsToAdd', [])
+    food_items = parameters.get('FoodItem', [])
+
+    logger.debug("Actions: %s, Remove: %s, Add: %s, FoodItems: %s",
+                 actions, items_to_remove, items_to_add, food_items)
+
+    # "swap my fries for mac & cheese" is a removal plus an addition
+    swapping = 'replace' in actions or 'swap' in actions
+    removing = 'remove' in actions or swapping
+    adding = 'add' in actions or swapping
+
+    # If we have a remove action and FoodItem but no ItemsToRemove, use FoodItem
+    if removing and food_items and not items_to_remove:
+        items_to_remove = food_items
+
+    # Ensure lists
+    items_to_remove = [items_to_remove] if isinstance(
+        items_to_remove, str) else items_to_remove
+    items_to_add = [items_to_add] if isinstance(
+        items_to_add, str) else items_to_add
+
+    logger.debug("Final items to remove: %s", items_to_remove)
+    logger.debug("Final items to add: %s", items_to_add)
+
+    # Handle removals
+    removed_groups = []
+    if removing and items_to_remove:
+        removed_groups = [remove_from_cart(ctx, item) for item in items_to_remove
+                          if isinstance(item, str) and item.strip()]
+    items_removed = [line.item for lines in removed_groups for line in lines]
+
+    # Handle additions
+    items_added, unavailable = [], []
+    if adding and items_to_add:
+        items_to_add = [item for item in items_to_add if isinstance(item, str) and item.strip()]
+        # A one-for-one swap keeps the quantity and size of what it replaces
+        pairs = removed_groups if swapping and len(removed_groups) == len(items_to_add) \
+            else [()] * len(items_to_add)
+        for item_to_add, replaced in zip(items_to_add, pairs):
+            quantity = sum(line.quantity for line in replaced) or 1
+            size = next((line.item[len(base_name(line.item)) + 2:-1] for line in replaced
+                         if line.item != base_name(line.item)), None)
+            item_name = resolve_added_item(ctx.catalog, item_to_add, size)
+            if add_to_cart(ctx, item_name, quantity) is None:
+                unavailable.append(item_name)
+            else:
+                items_added.append(item_to_add)
+
+    logger.debug("Final order: %s", state.orders)
+
+    # Prepare response
+    response_parts = []
+    if items_removed:
+        response_parts.append(
+            f"I've removed {', '.join(items_removed)} from your order")
+    if items_added:
+        response_parts.append(
+            f"I've added {', '.join(items_added)} to your order")
+
+    response = f"{' and '.join(response_parts)}. Would you like anything else?"
+    if unavailable:
+        response = f"{not_sold_text(unavailable)} Would you like something else?"
+        if response_parts:
+            response = f"{' and '.join(response_parts)}. {response}"
+    elif not response_parts:
+        response = "I couldn't understand what you wanted to modify. Please try again."
+
+    return response
+
+
+def handle_sandwich_spicy_or_not(ctx):
+    ctx.state.awaiting_menu_response = {
+        'context': 'sandwich_spicy',
+        'asked_about': 'spicy'
+    }
+    return "Would you like your chicken sandwich spicy or regular?"
+
+
+def handle_sandwich_spicy_choice(ctx):
+    state = ctx.state
+    # "spicy", "spicy deluxe", "grilled"...; anything else is the regular one
+    sandwich = ctx.catalog.aliases.best(ctx.query_text)
+    if sandwich not in ctx.catalog.snapshot.items_in('sandwiches'):
+        sandwich = 'Chicken Sandwich'
+    state.awaiting_more_items = True
+    if add_to_cart(ctx, sandwich) is None:
+        return f"{not_sold_text([sandwich])} Would you like something else?"
+    return "I've added your sandwich to the order. Would you like anything else?"
+
+
+def handle_review_order(ctx):
+    cart = ctx.state.orders
+    if not cart:
+        return "You haven't ordered anything yet."
+
+    return f"Here's your current order:\n{cart.summary()}\nTotal: ${dollars(cart.subtotal_cents)}"
+
+
+def handle_order_completion(ctx):
+    state = ctx.state
+    cart = state.orders
+    if not cart:
+        return "It seems you haven't ordered anything yet. What would you like to order?"
+
+    # Mark this session as awaiting confirmation
+    state.awaiting_order_confirmation = True
+
+    return (
+        f"Thank you for your order! Here's what you ordered:\n{cart.summary(with_prices=True)}"
+        f"\nTotal: ${dollars(cart.subtotal_cents)}\nWould you like to confirm your order?"
+    )
+
+
+def handle_confirm_order(ctx):
+    state = ctx.state
+    # Check if we're in a menu query context
+    if state.awaiting_menu_response:
+        menu_context = state.awaiting_menu_response
+        item_name = menu_context['item']
+        menu = ctx.catalog.snapshot
+
+        if menu_context['asked_about'] == 'price':
+            # They asked about ingredients, now want price
+            state.awaiting_menu_response = None
+            # The session's store price only; a store may not sell the item
+            price = ctx.prices.get(item_name)
+            if price is None:
+                return no_price_text(item_name)
+            return f"The {item_name} costs ${price:.2f}. Would you like to order one?"
+        elif menu_context['asked_about'] == 'ingredients':
+            # They asked about price, now want ingredients
+            state.awaiting_menu_response = None
+            return f"The {item_name} is made with {menu.ingredients[item_name]}. Would you like to order one?"
+
+    # Only process order confirmation if we're actually awaiting one
+    elif state.awaiting_order_confirmation:
+        if not state.orders:
+            state.awaiting_order_confirmation = False
+            return "It seems you haven't ordered anything yet. What would you like to order?"
+
+        return confirm_order(state)
+    else:
+        return "I'm not sure what you're confirming. Would you like to place an order?"
+
+
+def handle_welcome(ctx):
+    return "Welcome to Chick-fil-A! How can I help you today?"
+
+
+def handle_menu_query(ctx):
+    menu_category = ctx.parameters.get('menucategory', '').lower()
+    food_item = ctx.parameters.get('fooditem', '')
+
+    menu = ctx.catalog.snapshot
+
+    # If a specific item was asked about
+    if food_item:
+        if food_item not in menu.ingredient_replies:
+            # "cool wrap", "spicy deluxe"
+            food_item = ctx.catalog.aliases.resolve(food_item) or food_item
+        reply = menu.ingredient_replies.get(food_item)
+        if reply:
+            ctx.state.awaiting_menu_response = {
+                'item': food_item,
+                'asked_about': 'ingredients'
+            }
+            return reply
+
+    # If a specific category was requested
+    elif menu_category:
+        return (menu.category_replies.get(menu_category)
+                or f"I'm sorry, I don't have information about {menu_category}.")
+
+    # If no specific category or item was mentioned
+    else:
+        return menu.overview_reply
+
+
+def handle_yes(ctx):
+    state = ctx.state
+    # Check if we're awaiting order confirmation
+    if state.awaiting_order_confirmation:
+        if not state.orders:
+            state.awaiting_order_confirmation = False
+            return "It seems you haven't ordered anything yet. What would you like to order?"
+
+        return confirm_order(state)
+
+    # Handle other Yes responses (menu queries, etc.)
+    elif state.awaiting_menu_response:
+        menu_context = state.awaiting_menu_response
+        item_name = menu_context['item']
+
+        if menu_context['asked_about'] == 'ingredients':
+            # They asked about ingredients, now want price
+            price = ctx.prices.get(item_name)
+            if price is None:
+                # Unpriced, e.g. a store that sets the item to null
+                state.awaiting_menu_response = None
+                return no_price_text(item_name)
+            # Update context to order
+            state.awaiting_menu_response = {
+                'item': item_name,
+                'asked_about': 'order'
+            }
+            return f"The {item_name} costs ${price:.2f}. Would you like to order one?"
+
+        elif menu_context['asked_about'] == 'order':
+            # They want to order the item
+            line = add_to_cart(ctx, item_name)
+            state.awaiting_menu_response = None  # Clear menu context
+            # Set the new context
+            state.awaiting_more_items = True
+            if line is None:
+                return f"{not_sold_text([item_name])} Would you like something else?"
+            return f"I've added 1 {item_name} to your order. Would you like anything else?"
+
+
+def handle_no(ctx):
+    state = ctx.state
+    if state.awaiting_more_items:
+        # They don't want more items, proceed to order completion
+        state.awaiting_more_items = False
+        cart = state.orders
+        if not cart:
+            return "I don't see any items in your order. Would you like to order something?"
+
+        state.awaiting_order_confirmation = True
+
+        return (
+            f"Here's your order summary:\n{cart.summary()}\n"
+            f"Total: ${dollars(cart.subtotal_cents)}\n"
+            "Would you like to confirm this order?"
+        )
+    else:
+        return "I'm not sure what you're saying no to. Would you like to place an order?"
+
+
+def handle_nugget_type(ctx):
+    nugget_type = ctx.query_text.lower()
+    logger.debug("Processing nugget type: %s", nugget_type)
+    ctx.state.awaiting_menu_response = {
+        'context': 'nugget_count',
+        'nugget_type': 'regular' if 'regular' in nugget_type else 'grilled'
+    }
+    return "Would you like an 8-count or 12-count?"
+
+
+def handle_nugget_count(ctx):
+    state = ctx.state
+    if state.awaiting_menu_response and state.awaiting_menu_response.get('context') == 'nugget_count':
+        count = '12' if '12' in ctx.query_text else '8'
+        nugget_type = state.awaiting_menu_response.get(
+            'nugget_type', 'regular')
+
+        # Get the correct nugget item name
+        nugget_item = nugget_options[nugget_type][count]
+
+        # Add to orders
+        line = add_to_cart(ctx, nugget_item)
+
+        # Clear nugget context and set awaiting more items
+        state.awaiting_menu_response = None
+        state.awaiting_more_items = True
+        if line is None:
+            return f"{not_sold_text([nugget_item])} Would you like something else?"
+
+        logger.debug("Added nuggets to order: %s", nugget_item)
+        return f"I've added {nugget_item} to your order. Would you like anything else?"
+    else:
+        return "I'm not sure what type of nuggets you'd like. Would you like regular or grilled nuggets?"
+
+
+def handle_clear_order(ctx):
+    if ctx.state.orders:
+        ctx.state.clear()  # Clear all session data
+        return "I've cleared your order. What would you like to order?"
+    return "You don't have any items in your order. Would you like to start a new order?"
+
+
+INTENT_HANDLERS = {
+    'OrderFood': handle_order_food,
+    'OrderFood - size': handle_order_food_size,
+    'SpecifySize': handle_specify_size,
+    'ModifyOrder': handle_modify_order,
+    'Yes': handle_yes,
+    'No': handle_no,
+    'ConfirmOrder': handle_confirm_order,
+    'Default Welcome Intent': handle_welcome,
+    'MenuQuery': handle_menu_query,
+    'OrderCompletion': handle_order_completion,
+    'ReviewOrder': handle_review_order,
+    'SandwichSpicyOrNot': handle_sandwich_spicy_or_not,
+    'SandwichSpicyOrNot - custom': handle_sandwich_spicy_choice,
+    'OrderNuggets': handle_order_nuggets,
+    'NuggetType': handle_nugget_type,
+    'NuggetCount': handle_nugget_count,
+    'ClearOrder': handle_clear_order,
+}
+
+# Built once at import and shared by /webhook and /dialogflow. Every intent
+# in HANDLED_INTENTS must have a handler, so a gap fails here, not mid-chat.
+intent_router = IntentRouter(
+    {intent_name: INTENT_HANDLERS[intent_name] for intent_name in HANDLED_INTENTS})
+
+
+# Served on /metrics. Store and cache figures are callbacks, read only
+# when scraped, so nothing is copied per request.
+metrics = MetricsRegistry()
+intent_requests = metrics.counter(
+    'chatbot_intent_requests_total', 'Intents dispatched to a local handler', ['intent'])
+intent_errors = metrics.counter(
+    'chatbot_intent_errors_total', 'Intent handlers that raised', ['intent'])
+intent_latency = metrics.histogram(
+    'chatbot_intent_duration_seconds', 'Time spent in the local intent handler', ['intent'])
+detect_intent_latency = metrics.histogram(
+    'chatbot_detect_intent_duration_seconds', 'Dialogflow detect_intent round trips', ['mode'])
+detect_intent_errors = metrics.counter(
+    'chatbot_detect_intent_errors_total', 'detect_intent calls that failed', ['mode'])
+chat_messages = metrics.counter(
+    'chatbot_chat_messages_total', 'Chat messages on /dialogflow by what answered them',
+    ['resolved_by'])
+metrics.gauge('chatbot_sessions_active', 'Live sessions in the session store',
+              callback=lambda: len(session_store))
+metrics.gauge('chatbot_session_fields', 'Live sessions with each state field set',
+              ['field'], callback=session_store.field_counts)
+unpriced_items = metrics.counter(
+    'chatbot_cart_unpriced_items_total', 'Items added to a cart without a catalog price')
+metrics.gauge('chatbot_catalog_version', 'Catalog version new carts are priced against',
+              callback=lambda: catalogs.current.version)
+metrics.counter('chatbot_catalog_reload_errors_total', 'Catalog files that failed to load',
+                callback=lambda: catalogs.reload_errors)
+
+
+def record_intent_timing(intent_name, seconds, failed):
+    intent_requests.inc(intent_name)
+    intent_latency.observe(seconds, intent_name)
+    if failed:
+        intent_errors.inc(intent_name)
+
+
+intent_router.add_timing_hook(record_intent_timing)
+
+
+def run_intent(req, free_text=False):
+    """Run the handler for a Dialogflow webhook request and return the reply text"""
+    query_result = req.get('queryResult', {})
+    intent_name = query_result.get('intent', {}).get('displayName', '')
+    query_text = query_result.get('queryText', '').lower()
+    parameters = query_result.get('parameters', {})
+    session_id = get_consistent_session_id(req.get('session', ''))
+
+    payload_sampler.log("Raw Request", req)
+    logger.debug("intent=%s session=%s query=%r parameters=%s",
+                 intent_name, session_id, query_text, parameters)
+
+    if not intent_name:
+        logger.warning("No intent name found in request")
+        return "I'm sorry, I didn't understand that. Could you please rephrase?"
+
+    if intent_name not in intent_router:
+        logger.warning("Unhandled intent: %s", intent_name)
+        return f"Debug: Received intent '{intent_name}' but no handler found."
+
+    # Load, mutate and write back the session as one atomic step so a
+    # concurrent request for the same session on another worker waits
+    with session_store.transaction(session_id) as state:
+        logger.debug("Current orders before processing: %s", state.orders)
+        # A cart keeps pricing against the catalog version it started with
+        catalog = catalogs.get(state.catalog_version) if state.orders else catalogs.current
+        prices = catalog.prices_for(get_store_id(session_id))
+        if state.orders.unresolved:
+            # A cart saved before carts carried their prices
+            state.orders.resolve_prices(lambda item: to_cents(prices.get(item)))
+        if not state.orders.categorized:
+            # Loaded from a shared backend, which stores no indexes
+            state.orders.categorize(catalog.categories_of)
+        ctx = IntentRequest(session_id, intent_name, query_text, parameters, state, catalog,
+                            prices, free_text=free_text)
+        message = intent_router.dispatch(intent_name, ctx)
+        state.catalog_version = catalog.version if state.orders else None
+        logger.debug("Current orders after processing: %s", state.orders)
+
+    if message is None:
+        # The handler had nothing to say for this context
+        message = "I'm processing your request. What would you like to order?"
+    return message
+
+
+webhook_responses = WebhookResponses(Config.WEBHOOK_IDEMPOTENCY_SIZE,
+                                     Config.WEBHOOK_IDEMPOTENCY_TTL_SECONDS) \
+    if Config.WEBHOOK_IDEMPOTENCY_SIZE else None
+if webhook_responses is not None:
+    metrics.counter('chatbot_webhook_replays_total',
+                    'Retried webhook requests answered with the reply already sent',
+                    callback=lambda: webhook_responses.stats()['replays'])
+
+
+def answer_webhook(req, free_text=False):
+    """``run_intent``, except that a retry of a request already answered gets the same reply"""
+    if webhook_responses is None:
+        return run_intent(req, free_text)
+    key = response_key(req, get_consistent_session_id(req.get('session', '')))
+    return webhook_responses.get_or_run(key, lambda: run_intent(req, free_text))
+
+
+fast_path = FastPathClassifier()
+metrics.counter('chatbot_fast_path_hits_total', 'Chat messages resolved by the local fast path',
+                callback=lambda: fast_path.hits)
+metrics.counter('chatbot_fast_path_misses_total', 'Chat messages the fast path passed upstream',
+                callback=lambda: fast_path.misses)
+
+
+def resolve_locally(session_id, text):
+    """Answer a chat message without Dialogflow when its intent is unambiguous.
+
+    Returns the /dialogflow response body, or None if the message has to go
+    upstream.
+    """
+    intent = fast_path.classify(text, session_store.get(session_id))
+    if intent is None:
+        return None
+
+    intent_name, parameters = intent
+    req = {
+        'session': f"projects/{DIALOGFLOW_PROJECT_ID}/agent/sessions/{session_id}",
+        'queryResult': {
+            'queryText': text,
+            'intent': {'displayName': intent_name},
+            'parameters': parameters
+        }
+    }
+    return {
+        'fulfillmentText': run_intent(req, free_text=True),
+        'intent': intent_name,
+        'parameters': parameters,
+        'queryText': text
+    }
+
+
+# Off unless a request sends X-Profile: <ADMIN_TOKEN> or falls into
+# PROFILE_SAMPLE_RATE; see /admin/profile for the collected stacks
+profiler = RequestProfiler(Config.PROFILE_SAMPLE_RATE, Config.ADMIN_TOKEN,
+                           Config.PROFILE_INTERVAL_MS / 1000)
+
+
+def profiled(view):
+    """Run a view under the stack sampler when the request asks for it or is sampled"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        wanted = profiler.wanted(request.headers.get('X-Profile'))
+        return profiler.run(wanted, view, *args, **kwargs)
+    return wrapper
+
+
+def admin_authorized():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode())
+
+
+@app.route('/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def admin_profile():
+    """GET: collapsed stacks (?format=json for counts), POST {"sample_rate"}: retune, DELETE: reset"""
+    if not admin_authorized():
+        return jsonify({'error': 'Not found'}), 404
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            sample_rate = float(data['sample_rate'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'sample_rate (0.0-1.0) is required'}), 400
+        if not 0.0 <= sample_rate <= 1.0:
+            return jsonify({'error': 'sample_rate (0.0-1.0) is required'}), 400
+        profiler.sample_rate = sample_rate
+        return jsonify(profiler.stats())
+
+    if request.method == 'DELETE':
+        profiler.sampler.reset()
+        return jsonify(profiler.stats())
+
+    if request.args.get('format') == 'json':
+        return jsonify(profiler.stats())
+    return Response(profiler.sampler.collapsed(), mimetype='text/plain')
+
+
 @app.route('/webhook', methods=['POST'])
+@profiled
 def webhook():
     req = request.get_json()
     response_data = process_webhook(req)
     return jsonify(response_data)
 
 
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/webhook/batch', methods=['POST'])
+def webhook_batch():
+    """NDJSON of webhook requests in, NDJSON of webhook responses out, streamed"""
+    results = run_batch(
+        request.stream, process_webhook,
+        lambda req: get_consistent_session_id(req.get('session', '')),
+        max_workers=Config.BATCH_MAX_WORKERS)
+    return Response(stream_with_context(to_ndjson(results)),
+                    mimetype='application/x-ndjson')
+
+
 def process_webhook(req):
     try:
-        print("\n=== WEBHOOK REQUEST ===")
-
         if req is None:
             return {'fulfillmentText': "Invalid request format."}
 
-        # Extract required data from req
-        query_result = req.get('queryResult', {})
-        intent = query_result.get('intent', {})
-        intent_name = intent.get('displayName', '')
-        query_text = query_result.get('queryText', '').lower()
-        parameters = query_result.get('parameters', {})
-        full_session = req.get('session', '')
-        session_id = get_consistent_session_id(full_session)
-
-        # Detailed debug logging
-        print("Intent Data:", {
-            'displayName': intent_name,
-            'parameters': parameters,
-            'queryText': query_text,
-            'fulfillmentText': query_result.get('fulfillmentText', '')
-        })
-
-        print("Raw Request:", json.dumps(req, indent=2))
-        print(f"Session ID: {session_id}")
-        print(f"Received intent: {intent_name}")
-        print(f"Query Text: {query_text}")
-        print(f"Parameters: {parameters}")
-        print(
-            f"Current orders before processing: {orders.get(session_id, [])}")
-        print(
-            f"Is intent '{intent_name}' in handled intents? {intent_name in HANDLED_INTENTS}")
-
-        # Initialize orders if needed
-        if session_id not in orders:
-            orders[session_id] = []
-
-        if intent_name == 'OrderFood':
-            food_items = parameters.get('FoodItem', [])
-            sizes = parameters.get('Size', [])
-            numbers = parameters.get('number', [])
-            query = query_text.lower()
-
-            # Initialize index for sizes
-            size_idx = 0
-
-            for idx, food_item in enumerate(food_items):
-                # Map the food item name to the menu item
-                mapped_item = item_name_mapping.get(food_item, food_item)
-
-                # Determine quantity
-                if idx < len(numbers) and numbers[idx]:
-                    quantity = int(numbers[idx])
-                else:
-                    quantity = 1  # Default quantity
-
-                # Determine if the item requires a size
-                if mapped_item in size_required_items:
-                    if size_idx < len(sizes):
-                        size = sizes[size_idx]
-                        size_idx += 1  # Move to the next size for subsequent items
-                    else:
-                        size = 'Medium'  # Default size
-                    full_item_name = f"{mapped_item} ({size})"
-                else:
-                    full_item_name = mapped_item
-
-                # Add the item to the order
-                order_item = {
-                    'food_item': full_item_name,
-                    'quantity': quantity
-                }
-                orders[session_id].append(order_item)
-                print(f"Added item: {full_item_name} (Quantity: {quantity})")
-
-            # Create order summary
-            order_summary = []
-            for item in orders[session_id]:
-                order_summary.append(
-                    f"{item['quantity']} x {item['food_item']}")
-
-            # Set context for additional items
-            awaiting_more_items[session_id] = True
-
-            if order_summary:
-                response_message = "I've added to your order:\n" + \
-                    "\n".join(order_summary)
-                response_message += "\nWould you like anything else?"
-            else:
-                response_message = "I couldn't understand the items you want to order. Could you please rephrase your order?"
+        return create_response_message(answer_webhook(req))
 
-            return create_response_message(response_message)
+    except Exception as e:
+        logger.exception("Error in process_webhook: %s", e)
+        return {
+            'fulfillmentText': "I encountered an error processing your request. Could you please try again?"
+        }
 
-        elif intent_name == 'OrderFood - size':
-            size = parameters.get('size', '')
-            if session_id in last_ordered_item:
-                pending_item = last_ordered_item[session_id]
-                food_item = pending_item['item']
-                quantity = pending_item['quantity']
 
-                full_item_name = f"{food_item} ({size})"
-                order_item = {
-                    'food_item': full_item_name,
-                    'quantity': quantity
-                }
-                orders[session_id].append(order_item)
-                del last_ordered_item[session_id]
-
-                response_message = f"I've added {quantity} {full_item_name} to your order. Would you like anything else?"
-                return create_response_message(response_message)
-
-        elif intent_name == 'SpecifySize':
-            size = parameters.get('Size', '')
-            if session_id in last_ordered_item:
-                pending_item = last_ordered_item[session_id]
-                food_item = pending_item['item']
-                quantity = pending_item['quantity']
-
-                full_item_name = f"{food_item} ({size})"
-                order_item = {
-                    'food_item': full_item_name,
-                    'quantity': quantity
-                }
-                orders[session_id].append(order_item)
-                del last_ordered_item[session_id]
+def convert_proto_value(value):
+    """Convert a Struct parameter value to a JSON-serializable value"""
+    if hasattr(value, 'values'):  # RepeatedComposite
+        return [str(v) for v in value.values]
+    elif hasattr(value, 'fields'):  # MapComposite
+        return {k: convert_proto_value(v) for k, v in value.fields.items()}
+    return str(value) if value else []
 
-                response_message = f"I've added {quantity} {full_item_name} to your order. Would you like anything else?"
-                return create_response_message(response_message)
 
-        elif intent_name == 'OrderNuggets':
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
+def format_detect_intent_response(response):
+    """Shape a DetectIntentResponse the way the chat UI expects it"""
+    parameters = {k: convert_proto_value(
+        v) for k, v in response.query_result.parameters.items()}
 
-            awaiting_menu_response[session_id] = {
-                'context': 'nugget_type',
-                'item': 'nuggets'
-            }
-            response_message = "Would you like regular or grilled nuggets?"
-            return create_response_message(response_message)
-
-        elif intent_name == 'ModifyOrder':
-            print("Processing ModifyOrder intent...")
-            parameters = query_result.get('parameters', {})
-            actions = parameters.get('ModifyAction', [])
-            items_to_remove = parameters.get('ItemsToRemove', '')
-            items_to_add = parameters.get('ItemsToAdd', [])
-            food_items = parameters.get('FoodItem', [])
-
-            print(
-                f"Debug - Actions: {actions}, Remove: {items_to_remove}, Add: {items_to_add}, FoodItems: {food_items}")
-
-            # If we have a remove action and FoodItem but no ItemsToRemove, use FoodItem
-            if 'remove' in actions and food_items and not items_to_remove:
-                items_to_remove = food_items
-
-            # Ensure lists
-            items_to_remove = [items_to_remove] if isinstance(
-                items_to_remove, str) else items_to_remove
-            items_to_add = [items_to_add] if isinstance(
-                items_to_add, str) else items_to_add
-
-            print(f"Debug - Final items to remove: {items_to_remove}")
-            print(f"Debug - Final items to add: {items_to_add}")
-
-            # Handle removals
-            if 'remove' in actions and items_to_remove:
-                original_order = orders[session_id].copy()
-                orders[session_id] = []
-                items_removed = []
-
-                for order_item in original_order:
-                    should_keep = True
-                    for item_to_remove in items_to_remove:
-                        if isinstance(item_to_remove, str) and item_to_remove.strip():
-                            remove_name = item_to_remove.lower().strip()
-                            order_name = order_item['food_item'].lower(
-                            ).strip()
-
-                            print(
-                                f"Debug - Comparing: '{remove_name}' with '{order_name}'")
-
-                            if ('fries' in remove_name and 'fries' in order_name) or \
-                               ('drink' in remove_name and 'drink' in order_name) or \
-                               (remove_name in order_name):
-                                should_keep = False
-                                items_removed.append(order_item['food_item'])
-                                break
-
-                    if should_keep:
-                        orders[session_id].append(order_item)
-
-            # Handle additions
-            if 'add' in actions and items_to_add:
-                for item_to_add in items_to_add:
-                    if isinstance(item_to_add, str) and item_to_add.strip():
-                        orders[session_id].append({
-                            'food_item': item_to_add,
-                            'quantity': 1
-                        })
-
-            print(f"Debug - Final order: {orders[session_id]}")
-
-            # Prepare response
-            response_parts = []
-            if items_removed:
-                response_parts.append(
-                    f"I've removed {', '.join(items_removed)} from your order")
-            if items_to_add:
-                response_parts.append(
-                    f"I've added {', '.join(items_to_add)} to your order")
-
-            response = f"{' and '.join(response_parts)}. Would you like anything else?"
-            if not response_parts:
-                response = "I couldn't understand what you wanted to modify. Please try again."
-
-            return create_response(response)
-
-        elif intent_name == 'SandwichSpicyOrNot':
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
-
-            awaiting_menu_response[session_id] = {
-                'context': 'sandwich_spicy',
-                'asked_about': 'spicy'
-            }
-            response_message = "Would you like your chicken sandwich spicy or regular?"
-            return create_response_message(response_message)
-
-        elif intent_name == 'SandwichSpicyOrNot - custom':
-            response = query_text.lower()
-            if session_id not in orders:
-                orders[session_id] = []
-
-            if 'spicy' in response:
-                orders[session_id].append({
-                    'food_item': 'Spicy Chicken Sandwich',
-                    'quantity': 1
-                })
-            else:
-                orders[session_id].append({
-                    'food_item': 'Chicken Sandwich',
-                    'quantity': 1
-                })
-
-            awaiting_more_items[session_id] = True
-            response_message = "I've added your sandwich to the order. Would you like anything else?"
-            return create_response_message(response_message)
-
-        elif intent_name == 'ReviewOrder':
-            order_items = orders.get(session_id, [])
-            if not order_items:
-                response_message = "You haven't ordered anything yet."
-                return create_response_message(response_message)
-
-            order_summary = ''
-            for item in order_items:
-                quantity = item.get('quantity', 1)
-                food_item = item['food_item']
-                order_summary += f"{quantity} x {food_item}\n"
-
-            total_price = calculate_total(order_items)
-            response_message = f"Here's your current order:\n{order_summary}\nTotal: ${total_price:.2f}"
-            return create_response_message(response_message)
-
-        elif intent_name == 'OrderCompletion':
-            order_items = orders.get(session_id, [])
-            if not order_items:
-                response_message = "It seems you haven't ordered anything yet. What would you like to order?"
-                return create_response_message(response_message)
-
-            # Mark this session as awaiting confirmation
-            awaiting_order_confirmation[session_id] = True
-
-            order_summary = ''
-            for item in order_items:
-                quantity = item.get('quantity', 1)
-                food_item = item['food_item']
-                price = price_list.get(food_item, 0)
-                order_summary += f"{quantity} x {food_item} (${price:.2f} each)\n"
-
-            total_price = calculate_total(order_items)
-            response_message = (
-                f"Thank you for your order! Here's what you ordered:\n{order_summary}"
-                f"\nTotal: ${total_price:.2f}\nWould you like to confirm your order?"
-            )
-            return create_response_message(response_message)
-
-        elif intent_name == 'ConfirmOrder':
-            # Check if we're in a menu query context
-            if session_id in awaiting_menu_response:
-                menu_context = awaiting_menu_response[session_id]
-                item_name = menu_context['item']
-                item = menu_items[item_name]
-
-                if menu_context['asked_about'] == 'price':
-                    # They asked about ingredients, now want price
-                    awaiting_menu_response.pop(session_id)
-                    response_message = f"The {item_name} costs ${item['price']:.2f}. Would you like to order one?"
-                    return create_response_message(response_message)
-                elif menu_context['asked_about'] == 'ingredients':
-                    # They asked about price, now want ingredients
-                    awaiting_menu_response.pop(session_id)
-                    response_message = f"The {item_name} is made with {', '.join(item['ingredients'])}. Would you like to order one?"
-                    return create_response_message(response_message)
-
-            # Only process order confirmation if we're actually awaiting one
-            elif session_id in awaiting_order_confirmation:
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    awaiting_order_confirmation.pop(session_id, None)
-                    response_message = "It seems you haven't ordered anything yet. What would you like to order?"
-                    return create_response_message(response_message)
-
-                # Process the confirmation
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-
-                # Clear the order and confirmation status after processing
-                orders[session_id] = []
-                awaiting_order_confirmation.pop(session_id, None)
-
-                response_message = (
-                    f"Your order has been confirmed! Here's what you ordered:\n{order_summary}"
-                    f"\nTotal: ${total_price:.2f}\nThank you for choosing Chick-fil-A!"
-                )
-                return create_response_message(response_message)
-            else:
-                response_message = "I'm not sure what you're confirming. Would you like to place an order?"
-                return create_response_message(response_message)
-
-        elif intent_name == 'Default Welcome Intent':
-            response_message = "Welcome to Chick-fil-A! How can I help you today?"
-            return create_response_message(response_message)
-
-        elif intent_name == 'MenuQuery':
-            menu_category = parameters.get('menucategory', '').lower()
-            food_item = parameters.get('fooditem', '')
-
-            # If a specific item was asked about
-            if food_item:
-                if food_item in menu_items:
-                    ingredients = menu_items[food_item]['ingredients']
-                    price = menu_items[food_item]['price']
-
-                    awaiting_menu_response[session_id] = {
-                        'item': food_item,
-                        'asked_about': 'ingredients'
-                    }
-
-                    response_message = f"{food_item} contains: {', '.join(ingredients)}. Would you like to know the price?"
-                    return create_response_message(response_message)
-
-            # If a specific category was requested
-            elif menu_category:
-                items = get_menu_items_by_category(menu_category)
-                if items:
-                    items_text = ", ".join(items)
-                    response_message = f"Here are our {menu_category} options: {items_text}"
-                    return create_response_message(response_message)
-                else:
-                    response_message = f"I'm sorry, I don't have information about {menu_category}."
-                    return create_response_message(response_message)
-
-            # If no specific category or item was mentioned
-            else:
-                categories = list(menu_items.keys())
-                categories_text = ", ".join(categories)
-                response_message = f"We have several menu categories: {categories_text}. Which would you like to know more about?"
-                return create_response_message(response_message)
-
-        elif intent_name == 'Yes':
-            # Check if we're awaiting order confirmation
-            if session_id in awaiting_order_confirmation:
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    awaiting_order_confirmation.pop(session_id)
-                    response_message = "It seems you haven't ordered anything yet. What would you like to order?"
-                    return create_response_message(response_message)
-
-                # Process the confirmation
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-
-                # Clear the order and confirmation status after processing
-                orders[session_id] = []
-                awaiting_order_confirmation.pop(session_id)
-
-                response_message = (
-                    f"Your order has been confirmed! Here's what you ordered:\n{order_summary}"
-                    f"\nTotal: ${total_price:.2f}\nThank you for choosing Chick-fil-A!"
-                )
-                return create_response_message(response_message)
-
-            # Handle other Yes responses (menu queries, etc.)
-            elif session_id in awaiting_menu_response:
-                menu_context = awaiting_menu_response[session_id]
-                item_name = menu_context['item']
-
-                if menu_context['asked_about'] == 'ingredients':
-                    # They asked about ingredients, now want price
-                    price = price_list.get(item_name, "price not available")
-                    response_message = f"The {item_name} costs ${price:.2f}. Would you like to order one?"
-                    # Update context to order
-                    awaiting_menu_response[session_id] = {
-                        'item': item_name,
-                        'asked_about': 'order'
-                    }
-                    return create_response_message(response_message)
-
-                elif menu_context['asked_about'] == 'order':
-                    # They want to order the item
-                    if session_id not in orders:
-                        orders[session_id] = []
-                    orders[session_id].append({
-                        'food_item': item_name,
-                        'quantity': 1
-                    })
-                    awaiting_menu_response.pop(
-                        session_id)  # Clear menu context
-                    # Set the new context
-                    awaiting_more_items[session_id] = True
-                    response_message = f"I've added 1 {item_name} to your order. Would you like anything else?"
-                    return create_response_message(response_message)
-
-        elif intent_name == 'No':
-            if session_id in awaiting_more_items:
-                # They don't want more items, proceed to order completion
-                awaiting_more_items.pop(session_id)
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    response_message = "I don't see any items in your order. Would you like to order something?"
-                    return create_response_message(response_message)
-
-                # Generate order summary
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-                awaiting_order_confirmation[session_id] = True
-
-                response_message = (
-                    f"Here's your order summary:\n{order_summary}\n"
-                    f"Total: ${total_price:.2f}\n"
-                    "Would you like to confirm this order?"
-                )
-                return create_response_message(response_message)
-            else:
-                response_message = "I'm not sure what you're saying no to. Would you like to place an order?"
-                return create_response_message(response_message)
-
-        elif intent_name == 'NuggetType':
-            nugget_type = query_text.lower()
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
-
-            print(f"Processing nugget type: {nugget_type}")
-            awaiting_menu_response[session_id] = {
-                'context': 'nugget_count',
-                'nugget_type': 'regular' if 'regular' in nugget_type else 'grilled'
-            }
-            response_message = "Would you like an 8-count or 12-count?"
-            return create_response_message(response_message)
-
-        elif intent_name == 'NuggetCount':
-            if session_id in awaiting_menu_response and awaiting_menu_response[session_id].get('context') == 'nugget_count':
-                count = '12' if '12' in query_text else '8'
-                nugget_type = awaiting_menu_response[session_id].get(
-                    'nugget_type', 'regular')
-
-                # Get the correct nugget item name
-                nugget_item = nugget_options[nugget_type][count]
-
-                # Add to orders
-                orders[session_id].append({
-                    'food_item': nugget_item,
-                    'quantity': 1
-                })
-
-                # Clear nugget context and set awaiting more items
-                awaiting_menu_response.pop(session_id)
-                awaiting_more_items[session_id] = True
-
-                print(f"Added nuggets to order: {nugget_item}")
-                response_message = f"I've added {nugget_item} to your order. Would you like anything else?"
-                return create_response_message(response_message)
-            else:
-                return create_response("I'm not sure what type of nuggets you'd like. Would you like regular or grilled nuggets?")
-
-        elif intent_name == 'ClearOrder':
-            if session_id in orders and orders[session_id]:
-                orders[session_id] = []  # Clear the order
-                clear_session_data(session_id)  # Clear all session data
-                return create_response("I've cleared your order. What would you like to order?")
-            return create_response("You don't have any items in your order. Would you like to start a new order?")
-
-        elif intent_name:  # If we have an intent name but didn't handle it
-            print(f"WARNING: Unhandled intent: {intent_name}")
-            response_message = f"Debug: Received intent '{intent_name}' but no handler found."
-            return create_response_message(response_message)
-        else:
-            print("WARNING: No intent name found in request")
-            response_message = "I'm sorry, I didn't understand that. Could you please rephrase?"
-            return create_response_message(response_message)
+    return {
+        'fulfillmentText': response.query_result.fulfillment_text,
+        'intent': response.query_result.intent.display_name,
+        'parameters': parameters,
+        'queryText': response.query_result.query_text
+    }
 
-    except Exception as e:
-        print(f"Error in process_webhook: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'fulfillmentText': "I encountered an error processing your request. Could you please try again?"
-        }
 
-    except Exception as e:
-        print(f"Error in process_webhook: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'fulfillmentText': "I encountered an error processing your request. Could you please try again?"
+intent_cache = IntentCache(Config.INTENT_CACHE_SIZE, Config.INTENT_CACHE_TTL_SECONDS) \
+    if Config.INTENT_CACHE_SIZE else None
+if intent_cache is not None:
+    metrics.gauge('chatbot_intent_cache_entries', 'Entries in the detect_intent cache',
+                  callback=lambda: intent_cache.stats()['size'])
+    for stat in ('hits', 'misses', 'coalesced', 'evictions'):
+        metrics.counter(f'chatbot_intent_cache_{stat}_total', f'detect_intent cache {stat}',
+                        callback=lambda stat=stat: intent_cache.stats()[stat])
+
+
+def detect_intent_result(response):
+    """What the intent cache keeps of a DetectIntentResponse"""
+    from google.protobuf import json_format
+
+    contexts = (context.name.rsplit('/', 1)[-1] for context in response.query_result.output_contexts)
+    return {
+        'response': format_detect_intent_response(response),
+        # Parameters as the webhook receives them, for replaying the handler
+        'parameters': json_format.MessageToDict(response.query_result._pb.parameters),
+        # Contexts left active, leaving out Dialogflow's own (__system_counters__)
+        'contexts': sorted(name for name in contexts if not name.startswith('__')),
+    }
+
+
+def replayable(result):
+    """Whether another session may reuse a detect_intent result: only one that
+    left no contexts active, since replaying it does not set them"""
+    return not result['contexts']
+
+
+def note_upstream_reply(session_id, state, result):
+    """Record what a real detect_intent call left behind: the session's active
+    contexts, and that the intent sets none when it left none"""
+    if not result['contexts']:
+        fast_path.learn(result['response']['intent'])
+    if result['contexts'] != state.dialogflow_contexts:
+        with session_store.transaction(session_id) as current:
+            current.dialogflow_contexts = result['contexts']
+
+
+def replay_cached_intent(session_id, text, result):
+    """Build the /dialogflow response for a cache hit without calling Dialogflow.
+
+    Only ``replayable`` results reach here, for sessions with no contexts
+    active, so skipping Dialogflow leaves its contexts as asking would have.
+    """
+    response = dict(result['response'], queryText=text)
+    intent_name = response['intent']
+    if intent_name in intent_router:
+        # The cached reply was our webhook's answer for another session;
+        # run the handler against this session's state instead
+        req = {
+            'session': f"projects/{DIALOGFLOW_PROJECT_ID}/agent/sessions/{session_id}",
+            'queryResult': {
+                'queryText': text,
+                'intent': {'displayName': intent_name},
+                'parameters': result['parameters']
+            }
         }
+        response['fulfillmentText'] = run_intent(req)
+    return response
 
 
 @app.route('/dialogflow', methods=['POST'])
+@profiled
 def handle_dialogflow():
     try:
         data = request.get_json(silent=True, force=True)
-        dialogflow_client = app.config['DIALOGFLOW_CLIENT']
+
+        if Config.LOCAL_FAST_PATH and 'sessionId' in data and 'text' in data:
+            local_response = resolve_locally(data['sessionId'], data['text'])
+            if local_response is not None:
+                chat_messages.inc('fast_path')
+                return jsonify(local_response)
+
+        if 'queryResult' in data:  # Webhook request; needs no Dialogflow client
+            return process_webhook_request(data)
+
+        dialogflow_client = get_dialogflow_client()
 
         if not dialogflow_client:
             return jsonify({
@@ -813,41 +1168,55 @@ def handle_dialogflow():
             session_id = data.get('sessionId')
             user_text = data.get('text')
 
-            session = dialogflow_client.session_path(
-                'fast-food-chatbot', session_id)
-            text_input = TextInput(text=user_text, language_code='en')
-            query_input = QueryInput(text=text_input)
-
-            response = dialogflow_client.detect_intent(
-                request={'session': session, 'query_input': query_input}
-            )
-
-            # Convert parameters to JSON-serializable format
-            def convert_proto_value(value):
-                if hasattr(value, 'values'):  # RepeatedComposite
-                    return [str(v) for v in value.values]
-                elif hasattr(value, 'fields'):  # MapComposite
-                    return {k: convert_proto_value(v) for k, v in value.fields.items()}
-                return str(value) if value else []
-
-            parameters = {k: convert_proto_value(
-                v) for k, v in response.query_result.parameters.items()}
-
-            return jsonify({
-                'fulfillmentText': response.query_result.fulfillment_text,
-                'intent': response.query_result.intent.display_name,
-                'parameters': parameters,
-                'queryText': response.query_result.query_text
-            })
-        elif 'queryResult' in data:  # Webhook request
-            return process_webhook_request(data)
+            def detect_intent():
+                from google.cloud.dialogflow_v2.types import TextInput, QueryInput
+
+                session = dialogflow_client.session_path(
+                    DIALOGFLOW_PROJECT_ID, session_id)
+                text_input = TextInput(text=user_text, language_code='en')
+                query_input = QueryInput(text=text_input)
+
+                start = time.perf_counter()
+                try:
+                    return dialogflow_client.detect_intent(
+                        request={'session': session, 'query_input': query_input}
+                    )
+                except Exception:
+                    detect_intent_errors.inc('sync')
+                    raise
+                finally:
+                    detect_intent_latency.observe(time.perf_counter() - start, 'sync')
+
+            state = session_store.get(session_id)
+
+            def upstream():
+                result = detect_intent_result(detect_intent())
+                note_upstream_reply(session_id, state, result)
+                return result
+
+            if intent_cache is None or state.dialogflow_contexts:
+                # Active contexts steer what Dialogflow matches; only it can answer
+                chat_messages.inc('dialogflow')
+                return jsonify(upstream()['response'])
+
+            key = cache_key(user_text, state)
+            result, computed = intent_cache.get_or_compute(key, upstream, keep=replayable)
+            if computed:
+                chat_messages.inc('dialogflow')
+                return jsonify(result['response'])
+            if not replayable(result):
+                # Shared another session's call, whose contexts this session also needs
+                chat_messages.inc('dialogflow')
+                return jsonify(upstream()['response'])
+            chat_messages.inc('intent_cache')
+            return jsonify(replay_cached_intent(session_id, user_text, result))
         else:
             return jsonify({
                 'fulfillmentText': "Invalid request format"
             }), 400
 
     except Exception as e:
-        print(f"Error in handle_dialogflow: {str(e)}")
+        logger.exception("Error in handle_dialogflow: %s", e)
         return jsonify({
             'error': str(e),
             'fulfillmentText': "I encountered an error processing your request. Could you please try again?"
@@ -856,537 +1225,13 @@ def handle_dialogflow():
 
 def process_webhook_request(req):
     try:
-        print("\n=== WEBHOOK REQUEST ===")
-        req = request.get_json(silent=True, force=True)
-
-        # Detailed debug logging
-        query_result = req.get('queryResult', {})
-        intent = query_result.get('intent', {})
-
-        print("Intent Data:", {
-            'displayName': intent.get('displayName'),
-            'parameters': query_result.get('parameters'),
-            'queryText': query_result.get('queryText'),
-            'fulfillmentText': query_result.get('fulfillmentText')
-        })
-
-        # Check if intent names match exactly
-        intent_name = intent.get('displayName')
-        print(f"Received intent: '{intent_name}'")
-        print(f"Intent type: {type(intent_name)}")  # Check if it's a string
-
         if req is None:
             return jsonify({'fulfillmentText': "Invalid request format."})
 
-        print("Raw Request:", json.dumps(req, indent=2))
-        full_session = req.get('session', '')
-        session_id = get_consistent_session_id(req.get('session', ''))
-        query_result = req.get('queryResult', {})
-        intent_name = query_result.get('intent', {}).get('displayName')
-        query_text = query_result.get('queryText', '').lower()
-        parameters = query_result.get('parameters', {})
-
-        # Initialize orders if needed
-        if session_id not in orders:
-            orders[session_id] = []
-
-        print(f"Session ID: {session_id}")
-        print(f"Received intent: {intent_name}")
-        print(f"Query Text: {query_text}")
-        print(f"Parameters: {parameters}")
-        print(
-            f"Current orders before processing: {orders.get(session_id, [])}")
-
-        # Print out all your handled intents for comparison
-        print(
-            f"Is intent '{intent_name}' in handled intents? {intent_name in HANDLED_INTENTS}")
-
-        if intent_name == 'OrderFood':
-            food_items = parameters.get('FoodItem', [])
-            default_size = parameters.get('Size', 'Medium')
-            query = query_text.lower()
-
-            if session_id not in orders:
-                orders[session_id] = []
-
-            added_items = []
-
-            # Split query into individual items and clean up
-            query = re.sub(r'^can i get |^can i have |^i want ', '', query)
-            query = query.replace(',', ' and ')
-            items = [item.strip() for item in query.split(' and ')]
-
-            print(f"Processing items: {items}")
-
-            # Process each item in the query
-            for item in items:
-                item_size = default_size  # Start with default size
-                item_quantity = 1     # Default quantity
-                original_item = item  # Keep original item text for reference
-
-                # Extract quantity
-                quantity_match = re.match(r'^(\d+)', item)
-                if quantity_match:
-                    item_quantity = int(quantity_match.group(1))
-                    item = item[len(quantity_match.group(0)):].strip()
-
-                # Extract size from the item text
-                size_match = re.search(
-                    r'(small|medium|large)', item, re.IGNORECASE)
-                if size_match:
-                    item_size = size_match.group(1).capitalize()
-                    item = item.replace(size_match.group(1), '').strip()
-
-                print(
-                    f"Processing: {original_item} -> Quantity: {item_quantity}, Size: {item_size}")
-
-                # Match item to menu items
-                matched_item = None
-                if 'fry' in item or 'fries' in item:
-                    matched_item = 'Waffle Fries'
-                    full_item_name = f"Waffle Potato Fries ({item_size})"
-                elif 'drink' in item or 'soda' in item or 'beverage' in item:
-                    matched_item = 'Soft Drink'
-                    full_item_name = f"Soft Drink ({item_size})"
-                elif 'milkshake' in item or 'shake' in item:
-                    matched_item = 'Milkshake'
-                    full_item_name = f"Milkshake ({item_size})"
-                elif 'lemonade' in item:
-                    matched_item = 'Lemonade'
-                    full_item_name = f"Lemonade ({item_size})"
-                elif 'tea' in item:
-                    matched_item = 'Iced Tea'
-                    full_item_name = f"Iced Tea ({item_size})"
-                else:
-                    # For non-size items, use the FoodItem from parameters
-                    for food_item in food_items:
-                        if food_item.lower() in item.lower():
-                            matched_item = food_item
-                            full_item_name = food_item
-                            break
-
-                if matched_item:
-                    orders[session_id].append({
-                        'food_item': full_item_name,
-                        'quantity': item_quantity
-                    })
-                    added_items.append(
-                        f"{item_quantity} {full_item_name}" if item_quantity > 1 else full_item_name)
-                    print(
-                        f"Added item: {full_item_name} (Quantity: {item_quantity})")
-
-            if added_items:
-                items_text = ", ".join(added_items)
-                awaiting_more_items[session_id] = True
-                return create_response(f"I've added {items_text} to your order. Would you like anything else?")
-
-            return create_response("I didn't catch what food item you wanted. Could you please repeat that?")
-
-        elif intent_name == 'OrderFood - size':
-            size = parameters.get('size', '')
-            if session_id in last_ordered_item:
-                pending_item = last_ordered_item[session_id]
-                food_item = pending_item['item']
-                quantity = pending_item['quantity']
-
-                full_item_name = f"{food_item} ({size})"
-                order_item = {
-                    'food_item': full_item_name,
-                    'quantity': quantity
-                }
-                orders[session_id].append(order_item)
-                del last_ordered_item[session_id]
-
-                return create_response(f"I've added {quantity} {full_item_name} to your order. Would you like anything else?")
-
-        elif intent_name == 'SpecifySize':
-            size = parameters.get('Size', '')
-            if session_id in last_ordered_item:
-                pending_item = last_ordered_item[session_id]
-                food_item = pending_item['item']
-                quantity = pending_item['quantity']
-
-                full_item_name = f"{food_item} ({size})"
-                order_item = {
-                    'food_item': full_item_name,
-                    'quantity': quantity
-                }
-                orders[session_id].append(order_item)
-                del last_ordered_item[session_id]
-
-                return create_response(f"I've added {quantity} {full_item_name} to your order. Would you like anything else?")
-
-        elif intent_name == 'OrderNuggets':
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
-
-            awaiting_menu_response[session_id] = {
-                'context': 'nugget_type',
-                'item': 'nuggets'
-            }
-            return create_response("Would you like regular or grilled nuggets?")
-
-        elif intent_name == 'ModifyOrder':
-            print("Processing ModifyOrder intent...")
-            parameters = query_result.get('parameters', {})
-            actions = parameters.get('ModifyAction', [])
-            items_to_remove = parameters.get('ItemsToRemove', '')
-            items_to_add = parameters.get('ItemsToAdd', [])
-            food_items = parameters.get('FoodItem', [])
-
-            print(
-                f"Debug - Actions: {actions}, Remove: {items_to_remove}, Add: {items_to_add}, FoodItems: {food_items}")
-
-            # If we have a remove action and FoodItem but no ItemsToRemove, use FoodItem
-            if 'remove' in actions and food_items and not items_to_remove:
-                items_to_remove = food_items
-
-            # Ensure lists
-            items_to_remove = [items_to_remove] if isinstance(
-                items_to_remove, str) else items_to_remove
-            items_to_add = [items_to_add] if isinstance(
-                items_to_add, str) else items_to_add
-
-            print(f"Debug - Final items to remove: {items_to_remove}")
-            print(f"Debug - Final items to add: {items_to_add}")
-
-            # Handle removals
-            if 'remove' in actions and items_to_remove:
-                original_order = orders[session_id].copy()
-                orders[session_id] = []
-                items_removed = []
-
-                for order_item in original_order:
-                    should_keep = True
-                    for item_to_remove in items_to_remove:
-                        if isinstance(item_to_remove, str) and item_to_remove.strip():
-                            remove_name = item_to_remove.lower().strip()
-                            order_name = order_item['food_item'].lower(
-                            ).strip()
-
-                            print(
-                                f"Debug - Comparing: '{remove_name}' with '{order_name}'")
-
-                            if ('fries' in remove_name and 'fries' in order_name) or \
-                               ('drink' in remove_name and 'drink' in order_name) or \
-                               (remove_name in order_name):
-                                should_keep = False
-                                items_removed.append(order_item['food_item'])
-                                break
-
-                    if should_keep:
-                        orders[session_id].append(order_item)
-
-            # Handle additions
-            if 'add' in actions and items_to_add:
-                for item_to_add in items_to_add:
-                    if isinstance(item_to_add, str) and item_to_add.strip():
-                        orders[session_id].append({
-                            'food_item': item_to_add,
-                            'quantity': 1
-                        })
-
-            print(f"Debug - Final order: {orders[session_id]}")
-
-            # Prepare response
-            response_parts = []
-            if items_removed:
-                response_parts.append(
-                    f"I've removed {', '.join(items_removed)} from your order")
-            if items_to_add:
-                response_parts.append(
-                    f"I've added {', '.join(items_to_add)} to your order")
-
-            response = f"{' and '.join(response_parts)}. Would you like anything else?"
-            if not response_parts:
-                response = "I couldn't understand what you wanted to modify. Please try again."
-
-            return create_response(response)
-
-        elif intent_name == 'SandwichSpicyOrNot':
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
-
-            awaiting_menu_response[session_id] = {
-                'context': 'sandwich_spicy',
-                'asked_about': 'spicy'
-            }
-            return create_response("Would you like your chicken sandwich spicy or regular?")
-
-        elif intent_name == 'SandwichSpicyOrNot - custom':
-            response = query_text.lower()
-            if session_id not in orders:
-                orders[session_id] = []
-
-            if 'spicy' in response:
-                orders[session_id].append({
-                    'food_item': 'Spicy Chicken Sandwich',
-                    'quantity': 1
-                })
-            else:
-                orders[session_id].append({
-                    'food_item': 'Chicken Sandwich',
-                    'quantity': 1
-                })
-
-            awaiting_more_items[session_id] = True
-            return create_response("I've added your sandwich to the order. Would you like anything else?")
-
-        elif intent_name == 'ReviewOrder':
-            order_items = orders.get(session_id, [])
-            if not order_items:
-                return jsonify({
-                    'fulfillmentText': "You haven't ordered anything yet."
-                })
-
-            order_summary = ''
-            for item in order_items:
-                quantity = item.get('quantity', 1)
-                food_item = item['food_item']
-                order_summary += f"{quantity} x {food_item}\n"
-
-            total_price = calculate_total(order_items)
-            return create_response(f"Here's your current order:\n{order_summary}\nTotal: ${total_price:.2f}")
-
-        elif intent_name == 'OrderCompletion':
-            order_items = orders.get(session_id, [])
-            if not order_items:
-                return create_response("It seems you haven't ordered anything yet. What would you like to order?")
-
-            # Mark this session as awaiting confirmation
-            awaiting_order_confirmation[session_id] = True
-
-            order_summary = ''
-            for item in order_items:
-                quantity = item.get('quantity', 1)
-                food_item = item['food_item']
-                price = price_list.get(food_item, 0)
-                order_summary += f"{quantity} x {food_item} (${price:.2f} each)\n"
-
-            total_price = calculate_total(order_items)
-            return create_response(f"Thank you for your order! Here's what you ordered:\n{order_summary}\nTotal: ${total_price:.2f}\nWould you like to confirm your order?")
-
-        elif intent_name == 'ConfirmOrder':
-            # Check if we're in a menu query context
-            if session_id in awaiting_menu_response:
-                menu_context = awaiting_menu_response[session_id]
-                item_name = menu_context['item']
-                item = menu_items[item_name]
-
-                if menu_context['asked_about'] == 'price':
-                    # They asked about ingredients, now want price
-                    awaiting_menu_response.pop(session_id)
-                    return create_response(f"The {item_name} costs ${item['price']:.2f}. Would you like to order one?")
-                elif menu_context['asked_about'] == 'ingredients':
-                    # They asked about price, now want ingredients
-                    awaiting_menu_response.pop(session_id)
-                    return create_response(f"The {item_name} is made with {', '.join(item['ingredients'])}. Would you like to order one?")
-
-            # Only process order confirmation if we're actually awaiting one
-            elif session_id in awaiting_order_confirmation:
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    awaiting_order_confirmation.pop(session_id, None)
-                    return create_response("It seems you haven't ordered anything yet. What would you like to order?")
-
-                # Process the confirmation
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-
-                # Clear the order and confirmation status after processing
-                orders[session_id] = []
-                awaiting_order_confirmation.pop(session_id, None)
-
-                return create_response(f"Your order has been confirmed! Here's what you ordered:\n{order_summary}\nTotal: ${total_price:.2f}\nThank you for choosing Chick-fil-A!")
-            else:
-                return create_response("I'm not sure what you're confirming. Would you like to place an order?")
-
-        elif intent_name == 'Default Welcome Intent':
-            return create_response("Welcome to Chick-fil-A! How can I help you today?")
-
-        elif intent_name == 'MenuQuery':
-            menu_category = parameters.get('menucategory', '').lower()
-            food_item = parameters.get('fooditem', '')
-
-            # If a specific item was asked about
-            if food_item:
-                if food_item in menu_items:
-                    ingredients = menu_items[food_item]['ingredients']
-                    price = menu_items[food_item]['price']
-
-                    awaiting_menu_response[session_id] = {
-                        'item': food_item,
-                        'asked_about': 'ingredients'
-                    }
-
-                    return create_response(f"{food_item} contains: {', '.join(ingredients)}. Would you like to know the price?")
-
-            # If a specific category was requested
-            elif menu_category:
-                items = get_menu_items_by_category(menu_category)
-                if items:
-                    items_text = ", ".join(items)
-                    return create_response(f"Here are our {menu_category} options: {items_text}")
-                else:
-                    return create_response(f"I'm sorry, I don't have information about {menu_category}.")
-
-            # If no specific category or item was mentioned
-            else:
-                categories = list(menu_items.keys())
-                categories_text = ", ".join(categories)
-                return create_response(f"We have several menu categories: {categories_text}. Which would you like to know more about?")
-
-        elif intent_name == 'Yes':
-            # Check if we're awaiting order confirmation
-            if session_id in awaiting_order_confirmation:
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    awaiting_order_confirmation.pop(session_id)
-                    return create_response("It seems you haven't ordered anything yet. What would you like to order?")
-
-                # Process the confirmation
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-
-                # Clear the order and confirmation status after processing
-                orders[session_id] = []
-                awaiting_order_confirmation.pop(session_id)
-
-                return create_response(f"Your order has been confirmed! Here's what you ordered:\n{order_summary}\nTotal: ${total_price:.2f}\nThank you for choosing Chick-fil-A!")
-
-            # Handle other Yes responses (menu queries, etc.)
-            elif session_id in awaiting_menu_response:
-                menu_context = awaiting_menu_response[session_id]
-                item_name = menu_context['item']
-
-                if menu_context['asked_about'] == 'ingredients':
-                    # They asked about ingredients, now want price
-                    price = price_list.get(item_name, "price not available")
-                    response = f"The {item_name} costs ${price:.2f}. Would you like to order one?"
-                    # Update context to order
-                    awaiting_menu_response[session_id] = {
-                        'item': item_name,
-                        'asked_about': 'order'
-                    }
-                    return create_response(response)
-
-                elif menu_context['asked_about'] == 'order':
-                    # They want to order the item
-                    if session_id not in orders:
-                        orders[session_id] = []
-                    orders[session_id].append({
-                        'food_item': item_name,
-                        'quantity': 1
-                    })
-                    awaiting_menu_response.pop(
-                        session_id)  # Clear menu context
-                    # Set the new context
-                    awaiting_more_items[session_id] = True
-                    return create_response(f"I've added 1 {item_name} to your order. Would you like anything else?")
-
-        elif intent_name == 'No':
-            if session_id in awaiting_more_items:
-                # They don't want more items, proceed to order completion
-                awaiting_more_items.pop(session_id)
-                order_items = orders.get(session_id, [])
-                if not order_items:
-                    return create_response("I don't see any items in your order. Would you like to order something?")
-
-                # Generate order summary
-                order_summary = ''
-                for item in order_items:
-                    quantity = item.get('quantity', 1)
-                    food_item = item['food_item']
-                    order_summary += f"{quantity} x {food_item}\n"
-
-                total_price = calculate_total(order_items)
-                awaiting_order_confirmation[session_id] = True
-
-                return create_response(
-                    f"Here's your order summary:\n{order_summary}\n"
-                    f"Total: ${total_price:.2f}\n"
-                    "Would you like to confirm this order?"
-                )
-            else:
-                return create_response("I'm not sure what you're saying no to. Would you like to place an order?")
-
-        elif intent_name == 'NuggetType':
-            nugget_type = query_text.lower()
-            if session_id not in awaiting_menu_response:
-                awaiting_menu_response[session_id] = {}
-
-            print(f"Processing nugget type: {nugget_type}")
-            awaiting_menu_response[session_id] = {
-                'context': 'nugget_count',
-                'nugget_type': 'regular' if 'regular' in nugget_type else 'grilled'
-            }
-            return create_response("Would you like an 8-count or 12-count?")
-
-        elif intent_name == 'NuggetCount':
-            if session_id in awaiting_menu_response and awaiting_menu_response[session_id].get('context') == 'nugget_count':
-                count = '12' if '12' in query_text else '8'
-                nugget_type = awaiting_menu_response[session_id].get(
-                    'nugget_type', 'regular')
-
-                # Get the correct nugget item name
-                nugget_item = nugget_options[nugget_type][count]
-
-                # Initialize orders if needed
-                if session_id not in orders:
-                    orders[session_id] = []
-
-                # Add to orders
-                orders[session_id].append({
-                    'food_item': nugget_item,
-                    'quantity': 1
-                })
-
-                # Clear nugget context and set awaiting more items
-                awaiting_menu_response.pop(session_id)
-                awaiting_more_items[session_id] = True
-
-                print(f"Added nuggets to order: {nugget_item}")
-                return create_response(f"I've added {nugget_item} to your order. Would you like anything else?")
-            else:
-                return create_response("I'm not sure what type of nuggets you'd like. Would you like regular or grilled nuggets?")
-
-        elif intent_name == 'ClearOrder':
-            if session_id in orders and orders[session_id]:
-                orders[session_id] = []  # Clear the order
-                clear_session_data(session_id)  # Clear all session data
-                return create_response("I've cleared your order. What would you like to order?")
-            return create_response("You don't have any items in your order. Would you like to start a new order?")
-
-        elif intent_name:  # If we have an intent name but didn't handle it
-            print(f"WARNING: Unhandled intent: {intent_name}")
-            return jsonify({
-                'fulfillmentText': f"Debug: Received intent '{intent_name}' but no handler found."
-            })
-        else:
-            print("WARNING: No intent name found in request")
-            return jsonify({
-                'fulfillmentText': "I'm sorry, I didn't understand that. Could you please rephrase?"
-            })
-
-        print(f"Current orders after processing: {orders.get(session_id, [])}")
-
-        # Default return at the end of the function
-        return create_response("I'm processing your request. What would you like to order?")
+        return create_response(answer_webhook(req, free_text=True))
 
     except Exception as e:
-        print(f"Error in webhook: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in webhook: %s", e)
         return create_response("I encountered an error processing your request. Could you please try again?")
 
 
@@ -1412,6 +1257,13 @@ def home():
 #     return jsonify({'reply': bot_reply})
 
 
+mark_startup('handlers and routes')
+metrics.gauge('chatbot_startup_seconds', 'Time spent loading app.py, by phase', ['phase'],
+              callback=lambda: dict(startup_phases))
+logger.info("Startup took %.1f ms (%s)", (time.perf_counter() - _startup_began) * 1000,
+            ', '.join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in startup_phases))
+
+
 if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,213 @@
+"""ASGI entry point with a non-blocking /dialogflow proxy.
+
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:application
+
+Chat messages ({"sessionId", "text"} posted to /dialogflow) go upstream
+through the async Sessions client, so a single process can keep hundreds
+of chats waiting on Dialogflow at once. Everything else (the chat page,
+/webhook, webhook-format bodies on /dialogflow) is served by the Flask app
+in a thread pool, exactly as under the sync workers.
+"""
+import asyncio
+import importlib
+import json
+import logging
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (app, get_dialogflow_credentials, resolve_locally, session_store, intent_cache,
+                 detect_intent_result, replay_cached_intent, replayable, note_upstream_reply,
+                 metrics, chat_messages, detect_intent_latency, detect_intent_errors,
+                 DIALOGFLOW_PROJECT_ID)
+from intent_cache import cache_key
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def create_async_client():
+    """Build the async Sessions client (must run inside the event loop)"""
+    import grpc
+    from google.cloud.dialogflow_v2 import SessionsAsyncClient
+    from google.cloud.dialogflow_v2.services.sessions.transports import SessionsGrpcAsyncIOTransport
+
+    if Config.DIALOGFLOW_ENDPOINT:
+        channel = grpc.aio.insecure_channel(Config.DIALOGFLOW_ENDPOINT)
+        return SessionsAsyncClient(transport=SessionsGrpcAsyncIOTransport(channel=channel))
+    return SessionsAsyncClient(credentials=get_dialogflow_credentials())
+
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+def replay_body(body):
+    """A ``receive`` callable that hands an already-read body to the next app"""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {'type': 'http.disconnect'}
+        sent = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return receive
+
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class Saturated(Exception):
+    """Raised when every upstream slot is taken"""
+
+
+class DialogflowProxy:
+    """ASGI app: async /dialogflow chat proxy in front of the Flask app.
+
+    At most ``max_in_flight`` upstream calls run at once; past that the
+    proxy answers 429 with Retry-After straight away instead of queueing,
+    so a saturated process sheds load rather than building up latency.
+    Each call is abandoned with a 504 after ``timeout`` seconds. Messages
+    already in the intent cache never take a slot.
+    """
+
+    def __init__(self, wsgi_app, client_factory=create_async_client,
+                 max_in_flight=Config.DIALOGFLOW_MAX_IN_FLIGHT,
+                 timeout=Config.DIALOGFLOW_TIMEOUT_SECONDS,
+                 retry_after=Config.DIALOGFLOW_RETRY_AFTER_SECONDS):
+        self.wsgi = WsgiToAsgi(wsgi_app)
+        self.client_factory = client_factory
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.client = None
+        # Only touched from the event loop thread, so plain ints are safe
+        self.in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != '/dialogflow' or scope['method'] != 'POST':
+            return await self.wsgi(scope, receive, send)
+
+        body = await read_body(receive)
+        try:
+            data = json.loads(body or b'null')
+        except ValueError:
+            data = None
+        if not (isinstance(data, dict) and 'sessionId' in data and 'text' in data):
+            # Webhook-format and malformed bodies keep their Flask handling
+            return await self.wsgi(scope, replay_body(body), send)
+
+        if Config.LOCAL_FAST_PATH:
+            local_response = await asyncio.to_thread(
+                resolve_locally, data['sessionId'], data['text'])
+            if local_response is not None:
+                chat_messages.inc('fast_path')
+                return await send_json(send, 200, local_response)
+
+        status, payload, headers = await self.detect_intent(data['sessionId'], data['text'])
+        await send_json(send, status, payload, headers)
+
+    async def detect_intent(self, session_id, text):
+        try:
+            state = await asyncio.to_thread(session_store.get, session_id)
+            if intent_cache is None or state.dialogflow_contexts:
+                # Active contexts steer what Dialogflow matches; only it can answer
+                result = await self.upstream_result(session_id, state, text)
+                chat_messages.inc('dialogflow')
+                return 200, result['response'], []
+
+            result, computed = await intent_cache.get_or_compute_async(
+                cache_key(text, state), lambda: self.upstream_result(session_id, state, text),
+                keep=replayable)
+            if computed:
+                chat_messages.inc('dialogflow')
+                return 200, result['response'], []
+            if not replayable(result):
+                # Shared another session's call, whose contexts this session also needs
+                result = await self.upstream_result(session_id, state, text)
+                chat_messages.inc('dialogflow')
+                return 200, result['response'], []
+            chat_messages.inc('intent_cache')
+            return 200, await asyncio.to_thread(replay_cached_intent, session_id, text, result), []
+        except Saturated:
+            self.rejected += 1
+            return 429, {
+                'error': 'Too many concurrent requests',
+                'fulfillmentText': "I'm helping a lot of guests right now. Please try again in a moment."
+            }, [(b'retry-after', str(self.retry_after).encode())]
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return 504, {
+                'error': 'Dialogflow request timed out',
+                'fulfillmentText': "Sorry, that took too long. Could you please try again?"
+            }, []
+        except Exception as e:
+            logger.exception("Error in async detect_intent: %s", e)
+            return 500, {
+                'error': str(e),
+                'fulfillmentText': "I encountered an error processing your request. Could you please try again?"
+            }, []
+
+    async def upstream(self, session_id, text):
+        """One detect_intent call, counted against ``max_in_flight``"""
+        if self.in_flight >= self.max_in_flight:
+            raise Saturated()
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self.client is None:
+                # The SDK is imported on first use; keep that second-long
+                # import off the event loop
+                await asyncio.to_thread(importlib.import_module, 'google.cloud.dialogflow_v2')
+                if self.client is None:
+                    self.client = self.client_factory()
+            from google.cloud.dialogflow_v2.types import TextInput, QueryInput
+
+            session = self.client.session_path(DIALOGFLOW_PROJECT_ID, session_id)
+            query_input = QueryInput(text=TextInput(text=text, language_code='en'))
+            return await asyncio.wait_for(
+                self.client.detect_intent(
+                    request={'session': session, 'query_input': query_input}),
+                self.timeout)
+        except Exception:
+            detect_intent_errors.inc('async')
+            raise
+        finally:
+            detect_intent_latency.observe(time.perf_counter() - start, 'async')
+            self.in_flight -= 1
+
+    async def upstream_result(self, session_id, state, text):
+        result = detect_intent_result(await self.upstream(session_id, text))
+        await asyncio.to_thread(note_upstream_reply, session_id, state, result)
+        return result
+
+
+application = DialogflowProxy(app)
+metrics.gauge('chatbot_dialogflow_in_flight', 'detect_intent calls in progress (async proxy)',
+              callback=lambda: application.in_flight)
+metrics.counter('chatbot_dialogflow_rejected_total', 'Chat messages answered 429 (async proxy)',
+                callback=lambda: application.rejected)
+metrics.counter('chatbot_dialogflow_timeouts_total', 'detect_intent calls abandoned (async proxy)',
+                callback=lambda: application.timed_out)
@@ -0,0 +1,110 @@
+"""Per-lookup latency of FuzzyMatcher on a 10k-entry catalog.
+
+    python benchmarks/bench_fuzzy.py [--entries 10000] [--queries 2000]
+
+The catalog is the real menu padded with synthetic item names; queries are
+catalog names with one or two random typos.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_match import FuzzyMatcher, tokenize  # noqa: E402
+from static_data import menu_items  # noqa: E402
+
+
+FLAVORS = ['smoky', 'maple', 'honey', 'buffalo', 'garlic', 'lemon', 'pepper', 'sweet',
+           'spicy', 'grilled', 'crispy', 'toasted', 'southwest', 'barbecue', 'sriracha',
+           'teriyaki', 'chipotle', 'ranch', 'mango', 'peach', 'cinnamon', 'vanilla']
+BASES = ['chicken', 'turkey', 'veggie', 'biscuit', 'bagel', 'salad', 'wrap', 'bowl',
+         'melt', 'sandwich', 'tenders', 'nuggets', 'fries', 'lemonade', 'shake',
+         'smoothie', 'parfait', 'muffin', 'cookie', 'brownie', 'burrito', 'platter']
+FORMS = ['deluxe', 'classic', 'mini', 'club', 'supreme', 'combo', 'kids', 'family',
+         'original', 'signature', 'double', 'junior']
+SIZES = ['', ' (Small)', ' (Medium)', ' (Large)', ' (4-count)', ' (8-count)']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ven', 'tor', 'sul', 'bri', 'an', 'el', 'os', 'qua', 'zen', 'dor']
+
+
+def brand_names(rng, count=400):
+    """Made-up brand/regional words, so the vocabulary grows with the catalog"""
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))))
+    return sorted(words)
+
+
+def build_catalog(entries, rng):
+    names = list(menu_items)
+    seen = set(names)
+    brands = brand_names(rng)
+    while len(names) < entries:
+        words = [rng.choice(brands)] + rng.sample(FLAVORS, rng.randint(1, 2))
+        name = ' '.join(words + [rng.choice(BASES), rng.choice(FORMS)])
+        name = name.title() + rng.choice(SIZES)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def typo(word, rng):
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(['delete', 'substitute', 'transpose', 'insert'])
+    if kind == 'delete':
+        return word[:i] + word[i + 1:]
+    if kind == 'substitute':
+        return word[:i] + rng.choice('aeioulnrst') + word[i + 1:]
+    if kind == 'transpose':
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return word[:i] + rng.choice('aeioulnrst') + word[i:]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    catalog = build_catalog(args.entries, rng)
+    start = time.perf_counter()
+    matcher = FuzzyMatcher(catalog)
+    build_seconds = time.perf_counter() - start
+
+    targets = [rng.choice(catalog) for _ in range(args.queries)]
+    queries = [' '.join(typo(w, rng) for w in tokenize(name)) for name in targets]
+
+    timings = []
+    found = 0
+    for query, target in zip(queries, targets):
+        start = time.perf_counter()
+        ranked = matcher.rank(query, limit=5)
+        timings.append(time.perf_counter() - start)
+        if any(name == target for _, name in ranked):
+            found += 1
+
+    micros = [t * 1e6 for t in timings]
+    print(f"catalog entries:   {len(catalog)}")
+    print(f"index build:       {build_seconds * 1000:.0f} ms")
+    print(f"lookups:           {len(queries)}")
+    print(f"latency p50:       {statistics.median(micros):.0f} us")
+    print(f"latency p95:       {percentile(micros, 95):.0f} us")
+    print(f"latency p99:       {percentile(micros, 99):.0f} us")
+    print(f"target in top 5:   {found / len(queries):.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Per-utterance latency of OrderParser against the old split-and-regex parsing.
+
+    python benchmarks/bench_order_parser.py [--items 1,3,6] [--utterances 2000]
+
+Utterances are built from menu names, sized-item aliases, sizes and
+quantities ("can i get 2 large fries, a cobb salad and three lemonades").
+The old path is the per-item loop the /dialogflow OrderFood handler ran
+before the parser: split on "and", regexes for quantity and size, then
+keyword checks and a scan of the FoodItem names.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog, read_catalog_file  # noqa: E402
+
+NUMBERS = ['', '', 'a ', '2 ', '3 ', 'two ', 'four ']
+SIZES = ['', '', 'small ', 'medium ', 'large ']
+LEAD_INS = ['', 'can i get ', 'i want ', 'can i have ']
+
+
+def old_parse(query, food_items):
+    """The handler's parsing before OrderParser, without the cart updates"""
+    query = re.sub(r'^can i get |^can i have |^i want ', '', query.lower())
+    query = query.replace(',', ' and ')
+    parsed = []
+    for item in (item.strip() for item in query.split(' and ')):
+        quantity, size = 1, 'Medium'
+        quantity_match = re.match(r'^(\d+)', item)
+        if quantity_match:
+            quantity = int(quantity_match.group(1))
+            item = item[len(quantity_match.group(0)):].strip()
+        size_match = re.search(r'(small|medium|large)', item, re.IGNORECASE)
+        if size_match:
+            size = size_match.group(1).capitalize()
+            item = item.replace(size_match.group(1), '').strip()
+        matched = None
+        if 'fry' in item or 'fries' in item:
+            matched = 'Waffle Potato Fries'
+        elif 'drink' in item or 'soda' in item or 'beverage' in item:
+            matched = 'Soft Drink'
+        elif 'milkshake' in item or 'shake' in item:
+            matched = 'Milkshake'
+        elif 'lemonade' in item:
+            matched = 'Lemonade'
+        elif 'tea' in item:
+            matched = 'Iced Tea'
+        else:
+            matched = next((name for name in food_items if name.lower() in item), None)
+        parsed.append((quantity, size, matched))
+    return parsed
+
+
+def build_utterances(catalog, counts, total, rng):
+    names = [name for name in catalog.price_list if ' (' not in name]
+    names += list(catalog.size_required_items)
+    utterances = []
+    for index in range(total):
+        count = counts[index % len(counts)]
+        picks = rng.sample(names, count)
+        phrases = [rng.choice(NUMBERS) + rng.choice(SIZES) + name.lower() for name in picks]
+        text = ', '.join(phrases[:-1]) + (' and ' if count > 1 else '') + phrases[-1]
+        utterances.append((count, rng.choice(LEAD_INS) + text, picks))
+    return utterances
+
+
+def time_each(func, utterances, repeat=5):
+    """Best of ``repeat`` runs per utterance, in microseconds, by item count"""
+    by_count = {}
+    for count, text, picks in utterances:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(text, picks)
+            best = min(best, time.perf_counter() - start)
+        by_count.setdefault(count, []).append(best * 1e6)
+    return by_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', default='1,3,6', help='items per utterance, comma separated')
+    parser.add_argument('--utterances', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    start = time.perf_counter()
+    catalog = Catalog(read_catalog_file(), 1)
+    build_seconds = time.perf_counter() - start
+    order_parser = catalog.order_parser
+
+    counts = [int(count) for count in args.items.split(',')]
+    utterances = build_utterances(catalog, counts, args.utterances, rng)
+    old_found = sum(sum(1 for _, _, item in old_parse(text, picks) if item) == count
+                    for count, text, picks in utterances)
+    found = sum(sum(1 for parsed in order_parser.parse(text) if parsed.item) == count
+                for count, text, _ in utterances)
+
+    # Warm up both paths (regex cache, first dict lookups) before timing
+    for _, text, picks in utterances[:100]:
+        old_parse(text, picks)
+        order_parser.parse(text)
+    old = time_each(old_parse, utterances)
+    new = time_each(lambda text, picks: order_parser.parse(text), utterances)
+
+    print(f"catalog build:     {build_seconds * 1000:.0f} ms (parser included)")
+    print(f"utterances:        {len(utterances)}")
+    print(f"every item found:  old {old_found / len(utterances):.1%}   parser {found / len(utterances):.1%}")
+    for count in counts:
+        print(f"{count} item(s) p50:    old {statistics.median(old[count]):6.1f} us   "
+              f"parser {statistics.median(new[count]):6.1f} us")
+
+
+if __name__ == '__main__':
+    main()
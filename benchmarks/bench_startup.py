@@ -0,0 +1,154 @@
+"""Measure how long a fresh worker takes to import the app and answer its first request.
+
+    python benchmarks/bench_startup.py [--runs 5] [--module app|asgi]
+    python benchmarks/bench_startup.py --save benchmarks/baselines/startup.json
+    python benchmarks/bench_startup.py --baseline benchmarks/baselines/startup.json [--check]
+
+Each run starts a clean interpreter with ``-X importtime``, imports the
+module, sends one GET / through the test client and reports back. The
+median of the runs is printed along with the slowest imports of the
+last run and whether the Dialogflow SDK or grpc were loaded; a webhook-only
+worker should load neither until its first /dialogflow message.
+
+With --check the script exits non-zero when import time or RSS regress
+past --threshold against the baseline, or when the SDK is loaded at import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child; the last stdout line is the result
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module} as target
+imported = time.perf_counter()
+flask_app = getattr(target, 'app', None)
+if not hasattr(flask_app, 'test_client'):
+    import app as target_app
+    flask_app = target_app.app
+flask_app.test_client().get('/')
+answered = time.perf_counter()
+with open('/proc/self/statm') as f:
+    rss_mb = int(f.read().split()[1]) * {page_size} / 2 ** 20
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (answered - started) * 1000,
+    'rss_mb': rss_mb,
+    'sdk_loaded': sorted(m for m in ('google.cloud.dialogflow_v2', 'google.oauth2', 'grpc')
+                         if m in sys.modules),
+}}))
+"""
+
+SDK_PREFIXES = ('google.', 'grpc', 'proto')
+
+
+def parse_importtime(stderr):
+    """``{module: cumulative microseconds}`` from ``-X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+
+def run_once(module):
+    env = dict(os.environ, LOG_LEVEL='WARNING', DIALOGFLOW_PRELOAD='false')
+    code = CHILD.format(module=module, page_size=os.sysconf('SC_PAGE_SIZE'))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(proc.stderr)
+    return result
+
+
+def measure(module, runs):
+    results = [run_once(module) for _ in range(runs)]
+    imports = results[-1]['imports']
+    return {
+        'import_ms': statistics.median(r['import_ms'] for r in results),
+        'first_response_ms': statistics.median(r['first_response_ms'] for r in results),
+        'rss_mb': statistics.median(r['rss_mb'] for r in results),
+        'modules_imported': len(imports),
+        'sdk_modules_imported': sum(1 for name in imports if name.startswith(SDK_PREFIXES)),
+        'sdk_loaded': results[-1]['sdk_loaded'],
+    }, imports
+
+
+def regressions(results, baseline, threshold):
+    """Descriptions of every check that fails against ``baseline``"""
+    failures = []
+    if results['sdk_loaded']:
+        failures.append(f"Dialogflow SDK loaded at import: {', '.join(results['sdk_loaded'])}")
+    for metric in ('import_ms', 'first_response_ms', 'rss_mb'):
+        old = baseline.get(metric)
+        if old and results[metric] > old * (1 + threshold):
+            failures.append(f"{metric} {results[metric]:.1f} exceeds baseline {old:.1f} by more than "
+                            f"{threshold:.0%}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', choices=['app', 'asgi'], default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--baseline', help='compare against a saved JSON baseline')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 on a regression against --baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown before --check fails (default 25%%)')
+    args = parser.parse_args()
+
+    results, imports = measure(args.module, args.runs)
+    print(f"import {args.module}: {results['import_ms']:.1f} ms, first response after "
+          f"{results['first_response_ms']:.1f} ms, rss {results['rss_mb']:.1f} MB "
+          f"(median of {args.runs})")
+    print(f"  {results['modules_imported']} modules imported, "
+          f"{results['sdk_modules_imported']} from google/grpc/proto")
+    print(f"  Dialogflow SDK loaded: {', '.join(results['sdk_loaded']) or 'no'}")
+    print("Slowest imports (cumulative):")
+    for name, micros in sorted(imports.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get(args.module, {})
+        print(f"Compared with {args.baseline}:")
+        for metric in ('import_ms', 'first_response_ms', 'rss_mb', 'modules_imported'):
+            old = baseline.get(metric)
+            if old:
+                print(f"  {metric:<20} {results[metric]:10.1f}  (baseline {old:.1f}, "
+                      f"{(results[metric] - old) / old * 100:+.1f}%)")
+    if args.save:
+        saved = {}
+        if os.path.exists(args.save):
+            with open(args.save) as f:
+                saved = json.load(f)
+        saved[args.module] = results
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.save}")
+
+    if args.check:
+        failures = regressions(results, baseline, args.threshold)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
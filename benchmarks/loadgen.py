@@ -0,0 +1,345 @@
+"""Lunch-rush load generator: synthetic conversations against a running server.
+
+    python benchmarks/loadgen.py --spawn --rps 200 --concurrency 50 --duration 60
+    python benchmarks/loadgen.py --url http://127.0.0.1:5000 --mode webhook --server-pid 1234
+
+Conversations are built from static_data.menu_items with a weighted mix of
+plain orders (varied quantities), sized sides and drinks, the nugget
+type/count flow, modify/remove edits and carts abandoned half way.
+``--concurrency`` sessions talk at once, each running one conversation
+after another, and all of them share a ``--rps`` send budget.
+
+--mode dialogflow posts chat text to /dialogflow, so the server must have
+DIALOGFLOW_ENDPOINT pointing at fake_dialogflow.py (which calls back into
+/webhook). --mode webhook posts webhook bodies to /webhook directly.
+--spawn starts both the fake agent and the app (gunicorn) locally, so the
+whole run is offline.
+
+A request counts as an error when it fails, answers a non-200 status, or
+answers 200 with the app's error fallback text (ERROR_REPLIES), which is
+how the webhook reports a handler that raised.
+
+Every --report-every seconds a line shows sent requests/sec, error rate,
+p50/p99 latency over that window and the server's RSS (the server process
+and its children); a summary follows at the end, and --output saves the
+timeline as JSON.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from static_data import menu_items, price_list, size_required_items  # noqa: E402
+
+
+SIZES = ['Small', 'Medium', 'Large']
+PLAIN_ITEMS = [name for name in menu_items if '(' not in name and 'Nuggets' not in name]
+SIZED_ITEMS = [name for name, base in size_required_items.items()
+               if f"{base} (Small)" in price_list]
+MENU_QUESTIONS = ["what's on the menu", "what drinks do you have", "what are my options"]
+
+# (scenario, weight)
+SCENARIOS = [('plain', 35), ('sized', 20), ('nuggets', 15), ('modify', 15), ('abandoned', 15)]
+
+
+def order_turn(rng, item, quantity=1, size=None):
+    words = f"{quantity} {size.lower() + ' ' if size else ''}{item.lower()}"
+    parameters = {'FoodItem': [item], 'number': [quantity]}
+    if size:
+        parameters['Size'] = [size]
+    return (f"can i get {words}", 'OrderFood', parameters)
+
+
+def build_conversation(rng):
+    """One conversation as ``[(text, intent, parameters), ...]``"""
+    scenario = rng.choices([s for s, _ in SCENARIOS], [w for _, w in SCENARIOS])[0]
+    turns = []
+    if rng.random() < 0.3:
+        turns.append(("hi", 'Default Welcome Intent', {}))
+
+    if scenario == 'plain':
+        for _ in range(rng.randint(1, 3)):
+            turns.append(order_turn(rng, rng.choice(PLAIN_ITEMS), rng.randint(1, 4)))
+    elif scenario == 'sized':
+        turns.append(order_turn(rng, rng.choice(PLAIN_ITEMS), rng.randint(1, 2)))
+        turns.append(order_turn(rng, rng.choice(SIZED_ITEMS), rng.randint(1, 3), rng.choice(SIZES)))
+    elif scenario == 'nuggets':
+        turns.append(("i want nuggets", 'OrderNuggets', {}))
+        turns.append((rng.choice(['regular', 'grilled']), 'NuggetType', {}))
+        turns.append((f"{rng.choice([8, 12])} count", 'NuggetCount', {}))
+    elif scenario == 'modify':
+        first, second = rng.sample(PLAIN_ITEMS, 2)
+        turns.append(order_turn(rng, first))
+        turns.append(order_turn(rng, second, rng.randint(1, 2)))
+        turns.append((f"remove the {first.lower()}", 'ModifyOrder',
+                      {'ModifyAction': ['remove'], 'FoodItem': [first]}))
+        turns.append(("review my order", 'ReviewOrder', {}))
+    else:  # abandoned: browse, add something, walk away
+        turns.append((rng.choice(MENU_QUESTIONS), 'MenuQuery', {'menucategory': '', 'fooditem': ''}))
+        turns.append(order_turn(rng, rng.choice(PLAIN_ITEMS), rng.randint(1, 2)))
+        return turns
+
+    turns.append(("no", 'No', {}))
+    turns.append(("yes", 'Yes', {}))
+    return turns
+
+
+class RateLimiter:
+    """Hands out evenly spaced send slots, ``rate`` per second, across all workers"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self, stop):
+        """Sleep until this caller's slot; False if the run stopped meanwhile"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            stop.wait(slot - now)
+        return not stop.is_set()
+
+
+# Starts of the fulfillmentText the app sends when it could not handle a request
+ERROR_REPLIES = (
+    "I encountered an error processing your request",
+    "Sorry, I'm having trouble connecting to my backend",
+)
+
+
+def is_error_reply(body):
+    """Whether a 200 response body carries the app's error fallback text"""
+    try:
+        reply = json.loads(body)
+    except ValueError:
+        return True
+    text = reply.get('fulfillmentText', '') if isinstance(reply, dict) else ''
+    return text.startswith(ERROR_REPLIES)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.window = []
+        self.window_errors = 0
+        self.latencies = []
+        self.errors = 0
+        self.conversations = 0
+
+    def record(self, latency, ok):
+        with self.lock:
+            self.window.append(latency)
+            self.latencies.append(latency)
+            if not ok:
+                self.window_errors += 1
+                self.errors += 1
+
+    def take_window(self):
+        with self.lock:
+            window, errors = self.window, self.window_errors
+            self.window, self.window_errors = [], 0
+        return window, errors
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def process_tree_rss_mb(pid):
+    """RSS of ``pid`` plus all its descendants (Linux /proc only)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except OSError:
+            continue
+        stack.extend(children.get(current, ()))
+    return total / 2 ** 20
+
+
+def worker(base_url, mode, limiter, stats, stop, seed):
+    rng = random.Random(seed)
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    while not stop.is_set():
+        session_id = f"load-{uuid.uuid4().hex}"
+        for text, intent, parameters in build_conversation(rng):
+            if not limiter.wait(stop):
+                return
+            if mode == 'webhook':
+                path = '/webhook'
+                body = {
+                    'session': f"projects/fast-food-chatbot/agent/sessions/{session_id}",
+                    'queryResult': {'queryText': text, 'intent': {'displayName': intent},
+                                    'parameters': parameters},
+                }
+            else:
+                path = '/dialogflow'
+                body = {'sessionId': session_id, 'text': text}
+
+            started = time.perf_counter()
+            try:
+                connection.request('POST', path, json.dumps(body),
+                                   {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                body = response.read()
+                ok = response.status == 200 and not is_error_reply(body)
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+            stats.record(time.perf_counter() - started, ok)
+        with stats.lock:
+            stats.conversations += 1
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"nothing listening on {host}:{port} after {timeout}s")
+
+
+def spawn(app_port, agent_port, latency, threads):
+    """Start fake_dialogflow in-process and the app under gunicorn.
+
+    Returns ``(agent, server)``; the caller must keep the agent referenced,
+    as a collected gRPC server shuts down.
+    """
+    from fake_dialogflow import serve
+    agent = serve(agent_port, latency, webhook_url=f"http://127.0.0.1:{app_port}/webhook")
+
+    env = dict(os.environ, PORT=str(app_port), LOG_LEVEL='WARNING',
+               DIALOGFLOW_ENDPOINT=f"127.0.0.1:{agent_port}")
+    # Every in-flight /dialogflow call holds a thread while the fake agent
+    # calls /webhook back, so fewer threads than concurrent sessions
+    # deadlocks the worker on itself
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--threads', str(threads), 'app:app'],
+        cwd=ROOT, env=env)
+    wait_for_port('127.0.0.1', app_port)
+    return agent, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='server base URL')
+    parser.add_argument('--mode', choices=['dialogflow', 'webhook'], default='dialogflow')
+    parser.add_argument('--rps', type=float, default=100, help='target requests per second')
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent sessions')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--report-every', type=float, default=5, help='seconds between report lines')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--server-pid', type=int, help='sample this process tree for RSS')
+    parser.add_argument('--spawn', action='store_true',
+                        help='start fake_dialogflow and the app locally on --url\'s port')
+    parser.add_argument('--agent-port', type=int, default=50051)
+    parser.add_argument('--agent-latency-ms', type=float, default=0,
+                        help='simulated Dialogflow latency (with --spawn)')
+    parser.add_argument('--server-threads', type=int,
+                        help='gunicorn threads per worker with --spawn (default: 2 x concurrency)')
+    parser.add_argument('--output', help='write the timeline and summary as JSON')
+    args = parser.parse_args()
+
+    agent = server = None
+    if args.spawn:
+        agent, server = spawn(urlsplit(args.url).port or 80, args.agent_port,
+                              args.agent_latency_ms / 1000, args.server_threads or 2 * args.concurrency)
+        args.server_pid = server.pid
+
+    stats = Stats()
+    stop = threading.Event()
+    limiter = RateLimiter(args.rps)
+    workers = [threading.Thread(target=worker, daemon=True,
+                                args=(args.url, args.mode, limiter, stats, stop, args.seed + i))
+               for i in range(args.concurrency)]
+    started = time.monotonic()
+    for thread in workers:
+        thread.start()
+
+    timeline = []
+    try:
+        while time.monotonic() - started < args.duration:
+            time.sleep(min(args.report_every, args.duration - (time.monotonic() - started)))
+            window, errors = stats.take_window()
+            point = {
+                'elapsed_s': round(time.monotonic() - started, 1),
+                'requests_per_sec': len(window) / args.report_every,
+                'error_rate': errors / len(window) if window else 0.0,
+                'p50_ms': percentile(window, 0.50) * 1000,
+                'p99_ms': percentile(window, 0.99) * 1000,
+                'server_rss_mb': process_tree_rss_mb(args.server_pid) if args.server_pid else None,
+            }
+            timeline.append(point)
+            rss = f"{point['server_rss_mb']:.1f} MB" if args.server_pid else 'n/a'
+            print(f"{point['elapsed_s']:6.1f}s  {point['requests_per_sec']:7.1f} req/s  "
+                  f"errors {point['error_rate']:6.2%}  p50 {point['p50_ms']:7.2f} ms  "
+                  f"p99 {point['p99_ms']:7.2f} ms  rss {rss}", flush=True)
+    finally:
+        stop.set()
+        for thread in workers:
+            thread.join(timeout=5)
+        elapsed = time.monotonic() - started
+        if server is not None:
+            server.terminate()
+            server.wait()
+            agent.stop(0)
+
+    latencies = stats.latencies
+    summary = {
+        'requests': len(latencies),
+        'conversations': stats.conversations,
+        'requests_per_sec': len(latencies) / elapsed,
+        'error_rate': stats.errors / len(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies, default=0.0) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+    print(f"{summary['requests']} requests ({summary['conversations']} conversations) "
+          f"in {elapsed:.1f}s: {summary['requests_per_sec']:.1f} req/s, "
+          f"errors {summary['error_rate']:.2%}")
+    print(f"latency p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms  "
+          f"p99 {summary['p99_ms']:.2f} ms  max {summary['max_ms']:.2f} ms")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'summary': summary, 'timeline': timeline}, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
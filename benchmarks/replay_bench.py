@@ -0,0 +1,225 @@
+"""Replay multi-turn conversations through the app and report latency, throughput and memory.
+
+    python benchmarks/replay_bench.py [--sessions 2000] [--endpoint webhook|dialogflow|both]
+    python benchmarks/replay_bench.py --input recorded.ndjson
+    python benchmarks/replay_bench.py --save benchmarks/baselines/replay.json
+    python benchmarks/replay_bench.py --baseline benchmarks/baselines/replay.json
+
+Conversations are synthetic (OrderFood -> SpecifySize -> No -> Yes, with
+the item and size varied per session) unless --input names an NDJSON file
+of recorded webhook requests (the /webhook/batch format), which are
+grouped into conversations by session.
+
+Requests go through app.test_client(): /webhook gets the webhook bodies
+directly; /dialogflow gets {"sessionId", "text"} and a stub SessionsClient
+that classifies the text and calls the webhook in-process, as the real
+agent would. Every conversation uses a fresh session ID, so memory growth
+per 10k sessions shows what the session store and caches retain.
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from google.cloud.dialogflow_v2.types import DetectIntentResponse, Intent, QueryResult  # noqa: E402
+
+import app  # noqa: E402
+from fake_dialogflow import classify  # noqa: E402
+from webhook_batch import parse_line  # noqa: E402
+
+
+ITEMS = ['Chicken Sandwich', 'Spicy Chicken Sandwich', 'Waffle Potato Fries', 'Mac & Cheese',
+         'Fruit Cup', 'Chicken Noodle Soup', 'Grilled Chicken Sandwich', 'Cobb Salad']
+SIZES = ['Small', 'Medium', 'Large']
+
+
+def synthetic_conversations(count):
+    """``[[(text, intent, parameters), ...], ...]``, one list per session"""
+    conversations = []
+    for i in range(count):
+        item = ITEMS[i % len(ITEMS)]
+        size = SIZES[i % len(SIZES)]
+        quantity = i % 3 + 1
+        conversations.append([
+            (f"can i get {quantity} {item.lower()}", 'OrderFood',
+             {'FoodItem': [item], 'number': [quantity]}),
+            (size.lower(), 'SpecifySize', {'Size': size}),
+            ("no", 'No', {}),
+            ("yes", 'Yes', {}),
+        ])
+    return conversations
+
+
+def recorded_conversations(path):
+    """Group recorded webhook requests into per-session conversations, keeping order.
+
+    Lines that are not a webhook request are skipped.
+    """
+    sessions = {}
+    with open(path) as f:
+        for line in f:
+            req = parse_line(line)
+            if req is None:
+                continue
+            query_result = req.get('queryResult', {})
+            sessions.setdefault(req.get('session', ''), []).append((
+                query_result.get('queryText', ''),
+                query_result.get('intent', {}).get('displayName', ''),
+                query_result.get('parameters', {}),
+            ))
+    return list(sessions.values())
+
+
+class StubSessionsClient:
+    """Stands in for SessionsClient: known turns map to their recorded intent,
+    anything else goes through fake_dialogflow's keyword rules"""
+
+    def __init__(self, conversations):
+        self.intents = {}
+        for conversation in conversations:
+            for text, intent, parameters in conversation:
+                self.intents.setdefault(text, (intent, parameters))
+
+    def session_path(self, project, session):
+        return f"projects/{project}/agent/sessions/{session}"
+
+    def detect_intent(self, request):
+        text = request['query_input'].text.text
+        intent, parameters = self.intents.get(text) or classify(text)
+        reply = app.process_webhook({
+            'responseId': str(uuid.uuid4()),
+            'session': request['session'],
+            'queryResult': {'queryText': text, 'intent': {'displayName': intent},
+                            'parameters': parameters},
+        })
+        return DetectIntentResponse(query_result=QueryResult(
+            query_text=text,
+            intent=Intent(display_name=intent),
+            parameters=parameters,
+            fulfillment_text=reply['fulfillmentText'],
+        ))
+
+
+def rss_mb():
+    """Current resident set size; falls back to the peak where /proc is missing"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run(client, endpoint, conversations):
+    latencies = []
+    gc.collect()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    for conversation in conversations:
+        session_id = f"bench-{uuid.uuid4().hex}"
+        for text, intent, parameters in conversation:
+            if endpoint == 'webhook':
+                body = {
+                    'session': f"projects/{app.DIALOGFLOW_PROJECT_ID}/agent/sessions/{session_id}",
+                    'queryResult': {'queryText': text, 'intent': {'displayName': intent},
+                                    'parameters': parameters},
+                }
+            else:
+                body = {'sessionId': session_id, 'text': text}
+            t0 = time.perf_counter()
+            response = client.post(f'/{endpoint}', json=body)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"/{endpoint} returned {response.status_code}: {response.data[:200]}")
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    rss_after = rss_mb()
+
+    latencies.sort()
+    return {
+        'sessions': len(conversations),
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'requests_per_sec': len(latencies) / elapsed,
+        'rss_mb': rss_after,
+        'rss_growth_mb_per_10k_sessions': (rss_after - rss_before) * 10000 / len(conversations),
+    }
+
+
+def compare(results, baseline):
+    """Lines of ``metric: now (baseline, +x%)`` for every metric in both runs"""
+    lines = []
+    for endpoint, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(endpoint, {}).get(metric)
+            if old is None or metric in ('sessions', 'requests'):
+                continue
+            change = (value - old) / old * 100 if old else 0.0
+            lines.append(f"  {endpoint:<10} {metric:<32} {value:10.3f}  (baseline {old:.3f}, {change:+.1f}%)")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000,
+                        help='synthetic conversations to replay')
+    parser.add_argument('--input', help='NDJSON of recorded webhook requests')
+    parser.add_argument('--endpoint', choices=['webhook', 'dialogflow', 'both'], default='both')
+    parser.add_argument('--no-fast-path', action='store_true',
+                        help='send every /dialogflow message to the stub agent')
+    parser.add_argument('--no-intent-cache', action='store_true',
+                        help='disable the detect_intent cache for /dialogflow')
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--baseline', help='compare against a saved JSON baseline')
+    args = parser.parse_args()
+
+    conversations = recorded_conversations(args.input) if args.input \
+        else synthetic_conversations(args.sessions)
+    if args.no_fast_path:
+        app.Config.LOCAL_FAST_PATH = False
+    if args.no_intent_cache:
+        app.intent_cache = None
+    app.app.config['DIALOGFLOW_CLIENT'] = StubSessionsClient(conversations)
+    client = app.app.test_client()
+
+    endpoints = ['webhook', 'dialogflow'] if args.endpoint == 'both' else [args.endpoint]
+    results = {}
+    for endpoint in endpoints:
+        results[endpoint] = metrics = run(client, endpoint, conversations)
+        print(f"/{endpoint}: {metrics['sessions']} sessions, {metrics['requests']} requests")
+        print(f"  latency p50 {metrics['p50_ms']:.3f} ms  p95 {metrics['p95_ms']:.3f} ms  "
+              f"p99 {metrics['p99_ms']:.3f} ms  mean {metrics['mean_ms']:.3f} ms")
+        print(f"  throughput {metrics['requests_per_sec']:.0f} req/s")
+        print(f"  rss {metrics['rss_mb']:.1f} MB, "
+              f"+{metrics['rss_growth_mb_per_10k_sessions']:.2f} MB per 10k sessions")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline}:")
+        print('\n'.join(compare(results, baseline)))
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Cart consistency under concurrent requests for the same sessions.
+
+    python benchmarks/stress_sessions.py [--threads 32] [--sessions 64] [--requests 300]
+    python benchmarks/stress_sessions.py --hold-ms 2 --stripes 1    # one global lock
+    python benchmarks/stress_sessions.py --hold-ms 2 --unlocked     # shows lost updates
+
+Every thread sends OrderFood and ModifyOrder "add" webhooks through
+app.process_webhook to sessions picked at random from a small pool, so
+requests for one session overlap all the time. Each thread tallies what it
+ordered; at the end every cart must hold exactly those quantities and a
+subtotal that matches them. Exits 1 on any mismatch.
+
+--hold-ms keeps each transaction open that much longer between loading and
+saving the session (as a slow handler would), which makes races far more
+likely and shows what per-session locking buys over one global lock.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import app  # noqa: E402
+from cart import to_cents  # noqa: E402
+from session_store import MemorySessionStore  # noqa: E402
+
+# (intent, parameters, cart line it adds to, quantity added)
+ORDERS = [
+    ('OrderFood', {'FoodItem': ['Chicken Sandwich'], 'number': [1]}, 'Chicken Sandwich', 1),
+    ('OrderFood', {'FoodItem': ['Chicken Sandwich'], 'number': [3]}, 'Chicken Sandwich', 3),
+    ('OrderFood', {'FoodItem': ['Waffle Potato Fries'], 'Size': ['Large'], 'number': [2]},
+     'Waffle Potato Fries (Large)', 2),
+    ('OrderFood', {'FoodItem': ['Cobb Salad'], 'number': [1]}, 'Cobb Salad', 1),
+    ('ModifyOrder', {'ModifyAction': ['add'], 'ItemsToAdd': ['Fruit Cup']}, 'Fruit Cup (Small)', 1),
+]
+
+
+class SlowMemorySessionStore(MemorySessionStore):
+    """Holds every transaction open ``hold`` seconds after the handler ran"""
+
+    def __init__(self, hold, **kwargs):
+        super().__init__(**kwargs)
+        self.hold = hold
+
+    @contextlib.contextmanager
+    def transaction(self, session_id):
+        with super().transaction(session_id) as state:
+            yield state
+            time.sleep(self.hold)
+
+
+class _NoLocks:
+    def for_key(self, key):
+        return contextlib.nullcontext()
+
+
+def webhook(session_id, request_id, intent, parameters):
+    return {
+        'session': f"projects/p/agent/sessions/{session_id}",
+        'responseId': request_id,
+        'queryResult': {'queryText': intent.lower(), 'intent': {'displayName': intent},
+                        'parameters': parameters},
+    }
+
+
+def worker(index, args, sessions, barrier, tallies, failures):
+    rng = random.Random(args.seed * 1000 + index)
+    tally = {}
+    barrier.wait()
+    for n in range(args.requests):
+        session_id = rng.choice(sessions)
+        intent, parameters, item, quantity = rng.choice(ORDERS)
+        reply = app.process_webhook(webhook(session_id, f"t{index}-{n}", intent, parameters))
+        if 'error' in reply['fulfillmentText']:
+            failures.append(reply['fulfillmentText'])
+            continue
+        lines = tally.setdefault(session_id, {})
+        lines[item] = lines.get(item, 0) + quantity
+    tallies[index] = tally
+
+
+def check(sessions, tallies, prices):
+    """Mismatch descriptions, one per session whose cart is not what was ordered"""
+    mismatches = []
+    for session_id in sessions:
+        expected = {}
+        for tally in tallies:
+            for item, quantity in tally.get(session_id, {}).items():
+                expected[item] = expected.get(item, 0) + quantity
+        cart = app.session_store.get(session_id).orders
+        actual = {line.item: line.quantity for line in cart}
+        subtotal = sum(to_cents(prices[item]) * quantity for item, quantity in expected.items())
+        if actual != expected or cart.subtotal_cents != subtotal:
+            mismatches.append(f"{session_id}: expected {expected} (${subtotal / 100:.2f}), "
+                              f"cart has {actual} (${cart.subtotal_cents / 100:.2f})")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--sessions', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=300, help='requests per thread')
+    parser.add_argument('--stripes', type=int, default=256, help='session lock stripes')
+    parser.add_argument('--hold-ms', type=float, default=0.0,
+                        help='extra time each transaction stays open')
+    parser.add_argument('--unlocked', action='store_true',
+                        help='no session locking at all, to show the races it prevents')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    store = SlowMemorySessionStore(args.hold_ms / 1000, max_sessions=args.sessions * 2,
+                                   lock_stripes=args.stripes)
+    if args.unlocked:
+        store._locks = _NoLocks()
+    app.session_store = store
+    # Every request is new, so the retry cache would only add noise
+    app.webhook_responses = None
+
+    sessions = [f"stress-{i}" for i in range(args.sessions)]
+    tallies = [None] * args.threads
+    failures = []
+    barrier = threading.Barrier(args.threads + 1)
+    threads = [threading.Thread(target=worker, args=(i, args, sessions, barrier, tallies, failures))
+               for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.threads * args.requests
+    mismatches = check(sessions, tallies, app.catalogs.current.prices_for(None))
+    locking = 'none' if args.unlocked else f"{args.stripes} stripe(s)"
+    print(f"threads {args.threads}, sessions {args.sessions}, locking {locking}, "
+          f"hold {args.hold_ms:g} ms")
+    print(f"requests:          {total} in {elapsed:.2f} s ({total / elapsed:.0f} req/s)")
+    print(f"handler errors:    {len(failures)}")
+    print(f"inconsistent carts: {len(mismatches)} of {len(sessions)}")
+    for mismatch in mismatches[:5]:
+        print(f"  {mismatch}")
+    sys.exit(1 if mismatches or failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""Shopping cart with integer-cent prices and a running subtotal.
+
+Each menu item has one line; ordering it again adds to that line's
+quantity. A line's unit price is resolved once, when the item is first
+added. The subtotal is adjusted on every add and removal, so totals are
+exact and never re-walk the cart. Summary text is cached until the next
+change.
+
+Items the catalog has no price for are still added, but they are counted
+in ``unpriced`` and left out of the subtotal instead of silently costing $0.
+
+Lines are also indexed by base name (the item without its size, so
+"remove the lemonade" finds "Chick-fil-A Lemonade (Medium)") and by
+category ("fries", "drinks"), so edits touch only the lines they remove.
+"""
+import sys
+
+# unit_cents of a line restored from the old list-of-dicts format, until priced
+UNRESOLVED = -1
+
+
+def to_cents(price):
+    """Dollar price from the catalog as integer cents; None stays None"""
+    return None if price is None else round(price * 100)
+
+
+def base_name(item):
+    """``'Waffle Potato Fries (Large)'`` -> ``'Waffle Potato Fries'``"""
+    return item.partition(' (')[0]
+
+
+def dollars(cents):
+    """``1638`` -> ``'16.38'``"""
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+class CartLine:
+    __slots__ = ('item', 'quantity', 'unit_cents', 'categories')
+
+    def __init__(self, item, quantity, unit_cents, categories=()):
+        self.item = item
+        self.quantity = quantity
+        # None when the catalog had no price for the item
+        self.unit_cents = unit_cents
+        # Shared tuple from the catalog, e.g. ('drinks',)
+        self.categories = categories
+
+    @property
+    def priced(self):
+        return self.unit_cents is not None and self.unit_cents != UNRESOLVED
+
+    def __repr__(self):
+        return f"CartLine({self.item!r}, {self.quantity}, {self.unit_cents})"
+
+
+class Cart:
+    __slots__ = ('_lines', '_by_base', '_by_category', 'subtotal_cents', 'unpriced', 'unresolved',
+                 '_summary', '_priced_summary')
+
+    def __init__(self):
+        self._lines = {}  # item name -> CartLine, in the order first added
+        # base name / category -> {item name: None}, ordered like _lines.
+        # _by_category is None until categorized (carts restored from storage).
+        self._by_base = {}
+        self._by_category = {}
+        self.subtotal_cents = 0
+        self.unpriced = 0
+        self.unresolved = 0
+        self._summary = None
+        self._priced_summary = None
+
+    def add(self, item, quantity=1, unit_cents=None, categories=()):
+        """Add ``quantity`` of ``item``; an item already in the cart keeps its unit price"""
+        line = self._lines.get(item)
+        if line is None:
+            # One shared string per menu item across every cart
+            item = sys.intern(item)
+            line = self._lines[item] = CartLine(item, 0, unit_cents, categories)
+            self._by_base.setdefault(base_name(item), {})[item] = None
+            if self._by_category is not None:
+                for category in categories:
+                    self._by_category.setdefault(category, {})[item] = None
+            if unit_cents is None:
+                self.unpriced += 1
+            elif unit_cents == UNRESOLVED:
+                self.unresolved += 1
+        line.quantity += quantity
+        if line.priced:
+            self.subtotal_cents += line.unit_cents * quantity
+        self._changed()
+        return line
+
+    def remove(self, item):
+        """Drop ``item``'s line; returns it, or None if it was not in the cart"""
+        line = self._lines.get(item)
+        if line is not None:
+            self._remove_lines([line])
+        return line
+
+    def remove_base(self, base):
+        """Drop every size of ``base`` (e.g. all Waffle Potato Fries); returns the lines removed"""
+        return self._remove_lines([self._lines[item] for item in self._by_base.get(base, ())])
+
+    def remove_category(self, category):
+        """Drop every line in ``category``; returns the lines removed"""
+        return self._remove_lines([self._lines[item] for item in self._by_category.get(category, ())])
+
+    def remove_where(self, predicate):
+        """Drop every line whose item name satisfies ``predicate``; returns the lines removed.
+        Scans the whole cart; prefer the indexed removals."""
+        return self._remove_lines([line for line in self._lines.values() if predicate(line.item)])
+
+    def _remove_lines(self, lines):
+        for line in lines:
+            del self._lines[line.item]
+            self._unindex(self._by_base, base_name(line.item), line.item)
+            if self._by_category is not None:
+                for category in line.categories:
+                    self._unindex(self._by_category, category, line.item)
+            self._forget(line)
+        if lines:
+            self._changed()
+        return lines
+
+    @staticmethod
+    def _unindex(index, key, item):
+        items = index[key]
+        del items[item]
+        if not items:
+            del index[key]
+
+    @property
+    def categorized(self):
+        return self._by_category is not None
+
+    def categorize(self, categories_of):
+        """Build the category index of a restored cart with ``categories_of(item)``"""
+        self._by_category = {}
+        for line in self._lines.values():
+            line.categories = categories_of(line.item)
+            for category in line.categories:
+                self._by_category.setdefault(category, {})[line.item] = None
+
+    def clear(self):
+        self._lines.clear()
+        self._by_base.clear()
+        self._by_category = {}
+        self.subtotal_cents = 0
+        self.unpriced = 0
+        self.unresolved = 0
+        self._changed()
+
+    def resolve_prices(self, price_cents):
+        """Price lines restored from the old format with ``price_cents(item)``"""
+        for line in self._lines.values():
+            if line.unit_cents == UNRESOLVED:
+                line.unit_cents = price_cents(line.item)
+                if line.unit_cents is None:
+                    self.unpriced += 1
+                else:
+                    self.subtotal_cents += line.unit_cents * line.quantity
+        self.unresolved = 0
+        self._changed()
+
+    def _forget(self, line):
+        if line.priced:
+            self.subtotal_cents -= line.unit_cents * line.quantity
+        elif line.unit_cents is None:
+            self.unpriced -= 1
+        else:
+            self.unresolved -= 1
+
+    def _changed(self):
+        self._summary = None
+        self._priced_summary = None
+
+    def summary(self, with_prices=False):
+        """One ``"<quantity> x <item>\\n"`` line per item, optionally with unit prices"""
+        if not with_prices:
+            if self._summary is None:
+                self._summary = ''.join(f"{line.quantity} x {line.item}\n"
+                                        for line in self._lines.values())
+            return self._summary
+
+        if self._priced_summary is None:
+            self._priced_summary = ''.join(
+                f"{line.quantity} x {line.item} (${dollars(line.unit_cents)} each)\n" if line.priced
+                else f"{line.quantity} x {line.item} (price not available)\n"
+                for line in self._lines.values())
+        return self._priced_summary
+
+    def lines(self):
+        return list(self._lines.values())
+
+    def __contains__(self, item):
+        return item in self._lines
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __bool__(self):
+        return bool(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def to_compact(self):
+        """``[[item, quantity, unit_cents], ...]``, the form stored by the session backends"""
+        return [[line.item, line.quantity, line.unit_cents] for line in self._lines.values()]
+
+    @classmethod
+    def from_compact(cls, rows):
+        """Inverse of ``to_compact``; also reads the old ``[{'food_item', 'quantity'}, ...]``
+        carts, whose lines stay unresolved until ``resolve_prices``. The category
+        index is left for ``categorize``."""
+        cart = cls()
+        cart._by_category = None
+        for row in rows:
+            if isinstance(row, dict):
+                item, quantity, unit_cents = row['food_item'], row.get('quantity', 1), UNRESOLVED
+            else:
+                item, quantity, unit_cents = row
+            cart.add(item, quantity, unit_cents)
+        return cart
+
+    def __repr__(self):
+        return f"Cart({self.to_compact()!r})"
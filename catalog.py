@@ -0,0 +1,245 @@
+"""Menu and price catalog loaded from a JSON data file and reloaded in the background.
+
+The file holds ``version``, ``price_list``, ``item_name_mapping``,
+``size_required_items`` and ``menu_items``, optional ``drink_name_mapping``
+and ``item_prefix_mapping`` alias tables, and optional per-store price
+overrides under ``stores`` (``{store_id: {"prices": {item: price}}}``,
+where a null price leaves the item unpriced there). Each load builds a Catalog with
+every derived index (name lookups, alias matcher, fuzzy matcher, order
+parser, MenuQuery snapshot) before it is published, so a request never sees a half-built catalog.
+Publishing is one reference assignment; requests are never blocked.
+
+Recent versions stay available by number, so a cart keeps the prices it
+started with while a reload happens mid-conversation.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from alias_matcher import AliasMatcher, tokenize
+from fuzzy_match import FuzzyMatcher
+from menu_index import MenuIndex
+from menu_snapshot import MenuSnapshot
+from order_parser import OrderParser
+from cart import base_name
+from price_table import PriceTable, remove_superseded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+
+REQUIRED_KEYS = ('price_list', 'item_name_mapping', 'size_required_items', 'menu_items')
+
+# Cart categories beyond the MenuQuery ones: category -> keywords in item names
+EXTRA_CART_CATEGORIES = {'fries': ('Fries',)}
+# Words that, said on their own ("remove all drinks"), name a whole cart category
+CATEGORY_WORDS = {'fries': 'fries', 'fry': 'fries', 'drink': 'drinks', 'drinks': 'drinks',
+                  'beverage': 'drinks', 'beverages': 'drinks', 'dessert': 'desserts',
+                  'desserts': 'desserts', 'sides': 'sides', 'salads': 'salads',
+                  'sandwiches': 'sandwiches'}
+# Words around a category word that still leave the phrase naming the category
+CATEGORY_FILLERS = ('all', 'the', 'my', 'of', 'any')
+
+
+def read_catalog_file(path=DEFAULT_PATH):
+    """The raw catalog dict from ``path``; raises ValueError if a section is missing"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    missing = [key for key in REQUIRED_KEYS if not isinstance(data.get(key), dict)]
+    if missing:
+        raise ValueError(f"{path} is missing {', '.join(missing)}")
+    return data
+
+
+class Catalog:
+    """One version of the catalog and every index derived from it. Never mutated."""
+
+    def __init__(self, data, version, shared_dir=None):
+        self.version = version
+        self.price_list = MappingProxyType(dict(data['price_list']))
+        self.item_name_mapping = MappingProxyType(dict(data['item_name_mapping']))
+        self.size_required_items = MappingProxyType(dict(data['size_required_items']))
+        self.menu_items = MappingProxyType(dict(data['menu_items']))
+        self.drink_name_mapping = MappingProxyType(dict(data.get('drink_name_mapping', {})))
+        self.item_prefix_mapping = MappingProxyType(dict(data.get('item_prefix_mapping', {})))
+        # Base prices plus one row per store
+        self.price_table = PriceTable(
+            self.price_list,
+            {store_id: store.get('prices', {}) for store_id, store in data.get('stores', {}).items()},
+            shared_dir)
+
+        # Exact, alias and partial name lookups
+        self.menu_index = MenuIndex(self.menu_items, self.item_name_mapping, self.size_required_items)
+        # Drinks and sides that are ordered by base name plus a size
+        self.sized_item_names = frozenset(self.size_required_items.values())
+        # Every menu mention in an utterance, from all the alias tables at once
+        self.aliases = AliasMatcher(self.price_list, self.item_name_mapping, self.size_required_items,
+                                    self.drink_name_mapping, self.item_prefix_mapping)
+        self.fuzzy_matcher = self._build_fuzzy_matcher()
+        # Free-text orders ("2 large fries and a lemonade"), tokenized in one scan
+        self.order_parser = OrderParser(self.aliases, self.price_list)
+        self.snapshot = MenuSnapshot(self.menu_items)
+
+        # Cart indexes: item -> its categories (one shared tuple per item)
+        # and the base names ("Waffle Potato Fries") of every sized item
+        categories = {}
+        for category, items in self.snapshot.categories.items():
+            for item in items:
+                categories.setdefault(item, []).append(category)
+        for category, keywords in EXTRA_CART_CATEGORIES.items():
+            for item in self.menu_items:
+                if any(keyword in item for keyword in keywords):
+                    categories.setdefault(item, []).append(category)
+        self._item_categories = {item: tuple(names) for item, names in categories.items()}
+        self._base_names = {base_name(item).casefold(): base_name(item) for item in self.price_list}
+
+    def prices_for(self, store_id):
+        """``{item name: price}`` view for ``store_id`` (base prices if None or unknown)"""
+        return self.price_table.for_store(store_id)
+
+    def canonical_name(self, item_name):
+        """The priced menu name for ``item_name``: itself, or for a sized alias
+        such as "Lemonade (Medium)" the sized menu item it stands for"""
+        if item_name in self.price_list:
+            return item_name
+        base, separator, size = item_name.partition(' (')
+        target = self.size_required_items.get(base) if separator else None
+        if target and f"{target} ({size}" in self.price_list:
+            return f"{target} ({size}"
+        return item_name
+
+    def categories_of(self, item_name):
+        return self._item_categories.get(item_name, ())
+
+    def removal_target(self, phrase):
+        """What a "remove ..." phrase points at in a cart: ``('category', name)``,
+        ``('item', sized menu name)``, ``('base', base name)``, or None when it
+        names nothing on the menu. Only a bare category word ("fries", "all
+        drinks") is a category; "Soft Drink (Medium)" is that one line."""
+        words = [word for word in tokenize(phrase) if word not in CATEGORY_FILLERS]
+        if len(words) == 1 and words[0] in CATEGORY_WORDS:
+            return 'category', CATEGORY_WORDS[words[0]]
+        mapped = self.aliases.lookup(phrase) or phrase.strip()
+        exact = self.menu_index.exact(mapped)
+        if exact and exact != base_name(exact):
+            return 'item', exact
+        # Else the phrase's longest menu mention ("my coke" -> Soft Drink)
+        base = (self._base_names.get(base_name(exact or mapped).casefold())
+                or self._base_names.get(base_name(self.aliases.best(phrase) or '').casefold()))
+        if base:
+            return 'base', base
+        return None
+
+    def _build_fuzzy_matcher(self):
+        """Typo-tolerant matcher over menu names plus every alias with a real target"""
+        aliases = {' '.join(words): target for words, target in self.aliases.patterns}
+        return FuzzyMatcher(self.menu_items, aliases=aliases)
+
+    def __repr__(self):
+        return f"Catalog(version={self.version}, items={len(self.menu_items)})"
+
+
+class CatalogStore:
+    """The current Catalog, the last ``keep`` versions, and the file watcher.
+
+    ``reload`` is a no-op while the file's mtime and size are unchanged. A
+    file that fails to load is logged once and the current catalog stays.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, keep=8, shared_dir=None):
+        self.path = path
+        self.keep = keep
+        self.shared_dir = shared_dir
+        self.loads = 0
+        self.reload_errors = 0
+        self._versions = OrderedDict()
+        self._reload_lock = threading.Lock()
+        self._signature = None
+        self._watcher = None
+        self._interval = None
+        self.current = None
+        self.reload()
+        if self.current is None:
+            raise RuntimeError(f"Could not load the catalog from {path}")
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force=False):
+        """Load the file if it changed; returns True when a new catalog was published"""
+        with self._reload_lock:
+            signature = None
+            try:
+                signature = self._file_signature()
+                if signature == self._signature and not force:
+                    return False
+                data = read_catalog_file(self.path)
+                version = data.get('version')
+                if not isinstance(version, int) or (self.current and version <= self.current.version):
+                    # Edits that forget to bump the version still get a new one
+                    version = (self.current.version + 1) if self.current else 1
+                catalog = Catalog(data, version, self.shared_dir)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                # A missing file, bad JSON or a malformed item all keep the current catalog.
+                # Remember the broken file so it is reported once, not every poll
+                self._signature = signature
+                self.reload_errors += 1
+                logger.error("Catalog reload from %s failed, keeping version %s: %s",
+                             self.path, self.current.version if self.current else None, e)
+                return False
+
+            self._signature = signature
+            self._versions[version] = catalog
+            while len(self._versions) > self.keep:
+                self._versions.popitem(last=False)
+            self.current = catalog
+            if self.loads:
+                logger.info("Catalog version %s loaded from %s", version, self.path)
+            self.loads += 1
+            if catalog.price_table.path:
+                self._remove_old_price_files(catalog.price_table.path)
+            return True
+
+    def _remove_old_price_files(self, current_path):
+        """Delete the price files of earlier catalogs; a failure only costs disk space"""
+        try:
+            removed = remove_superseded(self.shared_dir, current_path)
+        except OSError as e:
+            logger.warning("Could not remove old price files from %s: %s", self.shared_dir, e)
+            return
+        if removed:
+            logger.info("Removed %d superseded price file(s) from %s", removed, self.shared_dir)
+
+    def get(self, version):
+        """Catalog ``version`` if it is still kept, else the current one"""
+        if version is None:
+            return self.current
+        return self._versions.get(version) or self.current
+
+    def watch(self, interval):
+        """Poll the file every ``interval`` seconds on a daemon thread"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._interval = interval
+        self._watcher = threading.Thread(target=self._watch, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+        os.register_at_fork(after_in_child=self._restart_watcher)
+
+    def _watch(self):
+        while True:
+            time.sleep(self._interval)
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Catalog watcher failed")
+
+    def _restart_watcher(self):
+        # The parent's watcher thread does not exist in a forked worker
+        self._reload_lock = threading.Lock()
+        self._watcher = threading.Thread(target=self._watch, name='catalog-watcher', daemon=True)
+        self._watcher.start()
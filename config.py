@@ -7,3 +7,66 @@ load_dotenv()
 class Config:
     GOOGLE_CREDENTIALS_JSON = os.getenv('GOOGLE_CREDENTIALS_JSON')
     GOOGLE_PROJECT_ID = os.getenv('GOOGLE_PROJECT_ID')
+
+    # Conversation state storage: 'memory' (per process), 'sqlite' (shared
+    # by every worker on the host) or 'redis' (shared across hosts)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+    SESSION_TTL_SECONDS = int(os.getenv('SESSION_TTL_SECONDS', 1800))
+    # Most sessions the memory and sqlite backends keep. A count, not a
+    # memory limit: a session's size grows with its cart. Redis is bounded
+    # by the server's maxmemory instead.
+    SESSION_MAX_SESSIONS = int(os.getenv('SESSION_MAX_SESSIONS', 10000))
+    # Memory backend: requests for one session are serialized on one of
+    # this many locks (picked by session id); other sessions run in parallel
+    SESSION_LOCK_STRIPES = int(os.getenv('SESSION_LOCK_STRIPES', 256))
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', 'sessions.db')
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+
+    # host:port of a plaintext Dialogflow stand-in such as fake_dialogflow.py
+    DIALOGFLOW_ENDPOINT = os.getenv('DIALOGFLOW_ENDPOINT')
+    # Import the Dialogflow SDK at startup rather than on the first
+    # /dialogflow call; webhook-only deployments leave this off
+    DIALOGFLOW_PRELOAD = os.getenv('DIALOGFLOW_PRELOAD', 'false').lower() == 'true'
+    # Async /dialogflow proxy (asgi.py): concurrent upstream calls per process,
+    # per-call timeout, and the Retry-After sent with 429 when saturated
+    DIALOGFLOW_MAX_IN_FLIGHT = int(os.getenv('DIALOGFLOW_MAX_IN_FLIGHT', 256))
+    DIALOGFLOW_TIMEOUT_SECONDS = float(os.getenv('DIALOGFLOW_TIMEOUT_SECONDS', 5))
+    DIALOGFLOW_RETRY_AFTER_SECONDS = int(os.getenv('DIALOGFLOW_RETRY_AFTER_SECONDS', 1))
+    # Menu and price catalog; the file is polled every CATALOG_POLL_SECONDS
+    # (0 = never) and reloaded on change. Carts keep the version they started
+    # with while it is among the last CATALOG_KEEP_VERSIONS loaded.
+    CATALOG_PATH = os.getenv('CATALOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json'))
+    CATALOG_POLL_SECONDS = float(os.getenv('CATALOG_POLL_SECONDS', 5))
+    CATALOG_KEEP_VERSIONS = int(os.getenv('CATALOG_KEEP_VERSIONS', 8))
+    # Session IDs of the form "<store id>__<conversation>" are priced with
+    # that store's overrides from the catalog's "stores" section
+    STORE_SESSION_SEPARATOR = os.getenv('STORE_SESSION_SEPARATOR', '__')
+    # Directory for the memory-mapped price table shared by every worker on
+    # the host; unset, each worker keeps the table in its own memory
+    PRICE_TABLE_DIR = os.getenv('PRICE_TABLE_DIR')
+    # Answer unambiguous replies ("yes", "clear my order", "8 count") locally
+    # instead of calling Dialogflow
+    LOCAL_FAST_PATH = os.getenv('LOCAL_FAST_PATH', 'true').lower() == 'true'
+    # detect_intent results cached per (normalized text, conversation state);
+    # size 0 turns the cache off
+    INTENT_CACHE_SIZE = int(os.getenv('INTENT_CACHE_SIZE', 5000))
+    INTENT_CACHE_TTL_SECONDS = int(os.getenv('INTENT_CACHE_TTL_SECONDS', 600))
+    # Webhook replies remembered per (session, responseId), so a request
+    # Dialogflow retries after a timeout is answered without running the
+    # handler twice; size 0 turns this off
+    WEBHOOK_IDEMPOTENCY_SIZE = int(os.getenv('WEBHOOK_IDEMPOTENCY_SIZE', 10000))
+    WEBHOOK_IDEMPOTENCY_TTL_SECONDS = int(os.getenv('WEBHOOK_IDEMPOTENCY_TTL_SECONDS', 300))
+    # Logging: level, 'text' or 'json' lines, and how often a raw webhook
+    # body is logged at INFO (one in N requests; 0 = only at DEBUG)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    LOG_PAYLOAD_SAMPLE_EVERY = int(os.getenv('LOG_PAYLOAD_SAMPLE_EVERY', 0))
+    # Sessions replayed in parallel by /webhook/batch
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 8))
+    # Enables the /admin endpoints (sent as X-Admin-Token) and per-request
+    # profiling (sent as X-Profile); unset, both are off
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    # Share of requests profiled without asking (0.0-1.0) and the stack
+    # sampling interval
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 1))
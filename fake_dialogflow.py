@@ -0,0 +1,151 @@
+"""Local stand-in for the Dialogflow Sessions API.
+
+Serves DetectIntent over plaintext gRPC with a handful of keyword rules in
+place of the real agent, so the proxy paths can be exercised offline:
+
+    python fake_dialogflow.py --port 50051 --latency-ms 150 \
+        --webhook-url http://localhost:5000/webhook
+    DIALOGFLOW_ENDPOINT=localhost:50051 python app.py
+
+With --webhook-url set, each matched intent is sent to the app's fulfillment
+webhook the way Dialogflow would, and its reply becomes the fulfillment text.
+"""
+import argparse
+import json
+import re
+import time
+import urllib.request
+import uuid
+from concurrent import futures
+
+import grpc
+from google.cloud.dialogflow_v2.types import (
+    DetectIntentRequest, DetectIntentResponse, Intent, QueryResult)
+
+from static_data import menu_items, item_name_mapping
+
+
+SERVICE_NAME = 'google.cloud.dialogflow.v2.Sessions'
+
+# Longest names first so "spicy deluxe sandwich" wins over "sandwich"
+_FOOD_NAMES = sorted(set(menu_items) | set(item_name_mapping), key=len, reverse=True)
+_FOOD_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(name.lower()) for name in _FOOD_NAMES) + r')\b')
+_CANONICAL_FOOD = {name.lower(): name for name in _FOOD_NAMES}
+
+# "swap my fries for mac & cheese", "replace the coke with a lemonade"
+_SWAP = re.compile(r'\b(?:swap|replace|change)\s+(?:my |the )?(.+?)\s+(?:for|with|to)\s+(?:an? |some )?(.+)$')
+
+_RULES = [
+    (re.compile(r'^(yes|yeah|yep|sure|ok(ay)?|confirm)\b'), 'Yes'),
+    (re.compile(r'^(no|nope|nah|that\'?s (it|all))\b'), 'No'),
+    (re.compile(r'\b(clear|cancel|start over)\b'), 'ClearOrder'),
+    (re.compile(r'\b(review|what\'?s in my order|my order)\b'), 'ReviewOrder'),
+    (re.compile(r'\b(checkout|check out|done|finish|complete)\b'), 'OrderCompletion'),
+    (re.compile(r'\b(8|12|eight|twelve)[ -]?(count|piece)?\b'), 'NuggetCount'),
+    (re.compile(r'^(regular|grilled)\b'), 'NuggetType'),
+    (re.compile(r'^(small|medium|large)$'), 'SpecifySize'),
+    (re.compile(r'\bnuggets?\b'), 'OrderNuggets'),
+    (re.compile(r'\b(remove|take off|without)\b'), 'ModifyOrder'),
+    (re.compile(r'\b(menu|what .* have|options)\b'), 'MenuQuery'),
+    (re.compile(r'^(hi|hello|hey)\b'), 'Default Welcome Intent'),
+]
+
+
+def classify(text):
+    """Map an utterance to (intent display name, parameters)"""
+    text = text.lower().strip()
+    foods = [_CANONICAL_FOOD[m] for m in _FOOD_PATTERN.findall(text)]
+    swap = _SWAP.search(text)
+    if swap:
+        return 'ModifyOrder', {'ModifyAction': ['swap'], 'ItemsToRemove': [swap.group(1)],
+                               'ItemsToAdd': [swap.group(2)]}
+    for pattern, intent in _RULES:
+        if pattern.search(text):
+            if intent == 'ModifyOrder':
+                return intent, {'ModifyAction': ['remove'], 'FoodItem': foods}
+            if intent == 'SpecifySize':
+                return intent, {'Size': text.capitalize()}
+            if intent == 'MenuQuery':
+                return intent, {'menucategory': '', 'fooditem': ''}
+            if intent == 'OrderNuggets' and re.search(r'\b(8|12)\b', text):
+                break
+            return intent, {}
+    if foods:
+        return 'OrderFood', {'FoodItem': foods}
+    return 'Default Fallback Intent', {}
+
+
+class FakeSessions:
+    def __init__(self, latency=0.0, webhook_url=None):
+        self.latency = latency
+        self.webhook_url = webhook_url
+
+    def detect_intent(self, request, context):
+        if self.latency:
+            time.sleep(self.latency)
+        text = request.query_input.text.text
+        intent, parameters = classify(text)
+        fulfillment_text = f"[fake] {intent}"
+        if self.webhook_url and intent != 'Default Fallback Intent':
+            fulfillment_text = self.call_webhook(request.session, text, intent, parameters)
+        return DetectIntentResponse(
+            response_id=str(uuid.uuid4()),
+            query_result=QueryResult(
+                query_text=text,
+                intent=Intent(display_name=intent),
+                parameters=parameters,
+                fulfillment_text=fulfillment_text,
+            ),
+        )
+
+    def call_webhook(self, session, text, intent, parameters):
+        payload = {
+            'responseId': str(uuid.uuid4()),
+            'session': session,
+            'queryResult': {
+                'queryText': text,
+                'parameters': parameters,
+                'intent': {'displayName': intent},
+            },
+        }
+        webhook_request = urllib.request.Request(
+            self.webhook_url, data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(webhook_request, timeout=10) as response:
+            return json.load(response).get('fulfillmentText', '')
+
+
+def serve(port=50051, latency=0.0, webhook_url=None, max_workers=64):
+    """Start the fake server in the background and return it"""
+    sessions = FakeSessions(latency=latency, webhook_url=webhook_url)
+    handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        'DetectIntent': grpc.unary_unary_rpc_method_handler(
+            sessions.detect_intent,
+            request_deserializer=DetectIntentRequest.deserialize,
+            response_serializer=DetectIntentResponse.serialize,
+        ),
+    })
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    server.add_generic_rpc_handlers((handler,))
+    server.add_insecure_port(f'127.0.0.1:{port}')
+    server.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=50051)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='simulated upstream latency per call')
+    parser.add_argument('--webhook-url', help="forward matched intents to this fulfillment URL")
+    parser.add_argument('--workers', type=int, default=64,
+                        help='concurrent calls the fake can serve')
+    args = parser.parse_args()
+    server = serve(args.port, args.latency_ms / 1000, args.webhook_url, args.workers)
+    print(f"Fake Dialogflow listening on 127.0.0.1:{args.port}")
+    server.wait_for_termination()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import re
+import threading
+
+
+def _exact(*phrases):
+    return re.compile(r'^(?:' + '|'.join(phrases) + r')$')
+
+
+YES = _exact(r'yes', r'yeah', r'yep', r'yup', r'sure', r'ok(?:ay)?', r'yes please',
+             r'confirm', r'yes,? confirm(?: it| my order)?', r'sounds good')
+NO = _exact(r'no', r'nope', r'nah', r'no thanks?(?: you)?', r"no,? that'?s (?:it|all)",
+            r"that'?s (?:it|all)", r'nothing else')
+CLEAR_ORDER = _exact(r'(?:clear|cancel|reset) (?:my |the )?order', r'start over')
+REVIEW_ORDER = _exact(r'(?:review|show|see|check) (?:me )?(?:my |the )?order',
+                      r"what'?s in my order", r'what did i order')
+NUGGET_COUNT = _exact(r'(?:an? )?(8|12)(?:[ -]?(?:count|piece|pc))?(?: please)?')
+
+_PUNCTUATION = re.compile(r'[.!?\s]+$')
+
+
+def normalize(text):
+    return _PUNCTUATION.sub('', text.strip().lower())
+
+
+class FastPathClassifier:
+    """Resolves short, unambiguous replies locally instead of via Dialogflow.
+
+    "yes", "no", "clear my order", "8 count" and friends only mean one
+    thing given where the conversation is, and the session state already
+    says where that is. Anything not matched here (or matched without the
+    context that makes it unambiguous) returns None and goes upstream.
+
+    Dialogflow never sees a message answered here, so its contexts for the
+    session stay as they were. That is only harmless for sessions with no
+    Dialogflow contexts active and for intents that set none, so an intent
+    is resolved locally only once Dialogflow has answered it without
+    setting any (``learn``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Intents Dialogflow has been seen to answer without setting a context
+        self.context_free = set()
+
+    def learn(self, intent_name):
+        """Mark ``intent_name`` as setting no Dialogflow contexts"""
+        self.context_free.add(intent_name)
+
+    def classify(self, text, state):
+        """Return ``(intent_name, parameters)`` for ``text``, or None"""
+        intent = None
+        if not state.dialogflow_contexts:
+            intent = self._classify(normalize(text), state)
+        if intent is not None and intent[0] not in self.context_free:
+            intent = None
+        with self._lock:
+            if intent is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return intent
+
+    def _classify(self, text, state):
+        if CLEAR_ORDER.match(text):
+            return 'ClearOrder', {}
+        if REVIEW_ORDER.match(text):
+            return 'ReviewOrder', {}
+
+        menu_context = state.awaiting_menu_response or {}
+        if YES.match(text):
+            if state.awaiting_order_confirmation or \
+                    menu_context.get('asked_about') in ('ingredients', 'order'):
+                return 'Yes', {}
+            return None
+        if NO.match(text):
+            if state.awaiting_more_items:
+                return 'No', {}
+            return None
+        if NUGGET_COUNT.match(text) and menu_context.get('context') == 'nugget_count':
+            return 'NuggetCount', {}
+        return None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
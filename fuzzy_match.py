@@ -0,0 +1,203 @@
+import heapq
+import re
+from itertools import combinations
+
+
+_TOKEN = re.compile(r"[a-z0-9%&']+")
+
+# Filler words that never name an item
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'some', 'of', 'please', 'with', 'me', 'i', 'get', 'can',
+    'could', 'want', 'would', 'like', 'and', 'order', 'have', 'my', 'to', 'add',
+})
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.casefold())
+
+
+def max_edits(token):
+    """Typos tolerated for a word of this length: none for short words"""
+    if len(token) <= 3:
+        return 0
+    if len(token) == 4:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word, distance):
+    """Every string reachable from ``word`` by removing up to ``distance`` characters"""
+    variants = {word}
+    for count in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), count):
+            variants.add(''.join(c for k, c in enumerate(word) if k not in positions))
+    return variants
+
+
+class FuzzyMatcher:
+    """Typo-tolerant lookup of menu names, SymSpell style.
+
+    Every vocabulary word is indexed under all of its deletion variants, so
+    correcting a typed word only generates the typed word's own deletions
+    and verifies the few words that share one; the cost does not grow with
+    the size of the catalog. Corrected words then vote, through a word ->
+    names inverted index, for the names containing them.
+
+    ``names`` are the menu item names; ``aliases`` maps extra phrases
+    (e.g. "waffle fries") to one of those names.
+
+    A word found in several items ("sauce", "chicken") is generic: on its
+    own it only matches a name or alias that is just that word, since any
+    one item it could mean would be a guess.
+    """
+
+    def __init__(self, names, aliases=None, max_distance=2):
+        self.max_distance = max_distance
+        self.names = tuple(names)
+        self._phrases = []  # (word set, word count, menu name) per name or alias
+        self._phrase_ids = {}  # word -> phrase ids containing it
+        self._deletes = {}  # deletion variant -> vocabulary words
+        self._items = {}  # word -> items (names without their size) containing it
+        self._single_words = {}  # word -> menu name, for one-word names and aliases
+
+        entries = [(name, name) for name in self.names]
+        entries.extend((aliases or {}).items())
+        for phrase, name in entries:
+            tokens = tuple(t for t in tokenize(phrase) if t not in STOPWORDS)
+            if not tokens:
+                continue
+            phrase_id = len(self._phrases)
+            self._phrases.append((frozenset(tokens), len(tokens), name))
+            if len(tokens) == 1:
+                self._single_words.setdefault(tokens[0], name)
+            for token in set(tokens):
+                if token not in self._phrase_ids:
+                    self._phrase_ids[token] = []
+                    for variant in _deletes(token, min(max_edits(token), max_distance)):
+                        self._deletes.setdefault(variant, []).append(token)
+                self._phrase_ids[token].append(phrase_id)
+                self._items.setdefault(token, set()).add(name.partition(' (')[0])
+
+    def corrections(self, token):
+        """All vocabulary words at the smallest edit distance, as ``[(word, distance)]``"""
+        if token in self._phrase_ids:
+            return [(token, 0)]
+        limit = min(max_edits(token), self.max_distance)
+        if not limit:
+            return []
+        best = []
+        seen = set()
+        for variant in _deletes(token, limit):
+            for word in self._deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, limit)
+                if distance > limit:
+                    continue
+                if not best or distance < best[0][1]:
+                    best = [(word, distance)]
+                elif distance == best[0][1]:
+                    best.append((word, distance))
+        return sorted(best)
+
+    def correct_token(self, token):
+        """Closest vocabulary word as ``(word, distance)``, or None"""
+        corrections = self.corrections(token)
+        return corrections[0] if corrections else None
+
+    def correct(self, text):
+        """``text`` lower-cased with each misspelled word replaced by its correction"""
+        words = []
+        for token in tokenize(text):
+            corrected = None if token in STOPWORDS else self.correct_token(token)
+            words.append(corrected[0] if corrected else token)
+        return ' '.join(words)
+
+    def rank(self, text, limit=5):
+        """Best matching menu names as ``[(score, name)]``, best first.
+
+        The score is the share of the typed words found in the name, each
+        discounted by its edit distance; ties go to the name with fewer
+        unmatched words, then to menu order.
+        """
+        # One slot per typed word, holding every equally close correction
+        slots = []
+        for token in tokenize(text):
+            if token in STOPWORDS:
+                continue
+            slots.append([(word, 1 - distance / (len(word) + 1))
+                          for word, distance in self.corrections(token)])
+        matched = [slot for slot in slots if slot]
+        if not matched:
+            return []
+
+        # Only names holding the rarest word (the next rarest too, if that
+        # leaves too few) are scored. A name without it misses part of the
+        # query anyway, and the lookup stays proportional to a few short
+        # posting lists instead of the catalog.
+        phrase_ids = self._phrase_ids
+        matched.sort(key=lambda slot: sum(len(phrase_ids[word]) for word, _ in slot))
+        candidates = set()
+        for slot in matched[:2]:
+            for word, _ in slot:
+                candidates.update(phrase_ids[word])
+            if len(candidates) >= limit:
+                break
+
+        scored = []
+        query_length = len(slots)
+        for phrase_id in candidates:
+            token_set, token_count, name = self._phrases[phrase_id]
+            weight = 0
+            for slot in matched:
+                weight += max((w for word, w in slot if word in token_set), default=0)
+            scored.append((weight / query_length, weight / token_count, -phrase_id))
+
+        # An alias and its name can both score, so over-fetch before de-duping
+        ranked = []
+        seen = set()
+        for score, coverage, negative_id in heapq.nlargest(limit * 2, scored):
+            name = self._phrases[-negative_id][2]
+            if name not in seen:
+                seen.add(name)
+                ranked.append((min(score, 1.0), name))
+        return ranked[:limit]
+
+    def match(self, text, min_score=0.6):
+        """Single best menu name for ``text``, or None below ``min_score`` or
+        when ``text`` is one generic word ("sauce")"""
+        ranked = self.rank(text, limit=1)
+        if not ranked or ranked[0][0] < min_score:
+            return None
+        tokens = [token for token in tokenize(text) if token not in STOPWORDS]
+        if len(tokens) == 1:
+            words = [word for word, _ in self.corrections(tokens[0])]
+            if all(len(self._items[word]) > 1 for word in words):
+                return next((self._single_words[word] for word in words
+                             if word in self._single_words), None)
+        return ranked[0][1]
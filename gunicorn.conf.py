@@ -0,0 +1,23 @@
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Carts only survive across workers when the session store is shared, so the
+# per-process memory backend is pinned to a single worker.
+if os.getenv('SESSION_BACKEND', 'memory') == 'memory':
+    workers = 1
+else:
+    workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Threads per worker. The session store serializes requests for one session,
+# so a single memory-backend worker can still serve many sessions at once.
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+
+# GUNICORN_PRELOAD=true imports the app once in the master and forks the
+# workers from it, so each worker boots in milliseconds and shares the
+# menu indexes copy-on-write. No gRPC channel exists before a worker's
+# first /dialogflow call, and app.py, logging_setup.py and the SQLite
+# session store re-create their per-process client, log thread and
+# database connection in every forked child.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
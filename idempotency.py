@@ -0,0 +1,78 @@
+import threading
+
+from ttl_cache import TTLCache
+
+
+def response_key(req, session_id):
+    """``(session, responseId)`` of a webhook request, or None when it has no responseId"""
+    response_id = req.get('responseId')
+    if not response_id or not isinstance(response_id, str):
+        return None
+    return session_id, response_id
+
+
+class _Attempt:
+    """The first request for a key, while its handler runs"""
+
+    __slots__ = ('done', 'reply', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.reply = None
+        self.error = None
+
+
+class WebhookResponses:
+    """Replies already sent, so a retried fulfillment request is not applied twice.
+
+    Dialogflow retries a webhook call that timed out with the same
+    responseId. The first attempt's reply is kept for ``ttl`` seconds and
+    returned to the retry without running the handler again; a retry that
+    arrives while the first attempt is still running waits for it. A
+    handler that raises is not remembered, so a later retry runs for real.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self._replies = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._running = {}  # key -> _Attempt
+        self.replays = 0
+
+    def get_or_run(self, key, run):
+        """``run()``'s reply for ``key``, computed once while it is kept"""
+        if key is None:
+            return run()
+
+        with self._lock:
+            reply = self._replies.get(key)
+            attempt = self._running.get(key) if reply is None else None
+            first = reply is None and attempt is None
+            if first:
+                attempt = self._running[key] = _Attempt()
+            else:
+                self.replays += 1
+        if reply is not None:
+            return reply
+
+        if not first:
+            attempt.done.wait()
+            if attempt.error is not None:
+                raise attempt.error
+            return attempt.reply
+
+        try:
+            attempt.reply = run()
+            self._replies.set(key, attempt.reply)
+            return attempt.reply
+        except Exception as e:
+            attempt.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._running[key]
+            attempt.done.set()
+
+    def stats(self):
+        stats = self._replies.stats()
+        stats['replays'] = self.replays
+        return stats
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+
+from fast_path import normalize
+from ttl_cache import TTLCache
+
+
+def cache_key(text, state):
+    """Normalized text plus the parts of the session state that steer Dialogflow.
+
+    The same words can mean different intents depending on what the bot
+    just asked ("12" after the nugget question vs. out of the blue), so
+    the pending question is part of the key. The cart contents are not: a
+    hit re-runs the handler against the asking session's own cart. Nor are
+    Dialogflow contexts, because only sessions with none active use the
+    cache (see app.handle_dialogflow).
+    """
+    menu_context = state.awaiting_menu_response or {}
+    return (
+        normalize(text),
+        bool(state.awaiting_order_confirmation),
+        bool(state.awaiting_more_items),
+        bool(state.last_ordered_item),
+        menu_context.get('context'),
+        menu_context.get('asked_about'),
+    )
+
+
+class _Flight:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class IntentCache:
+    """Bounded TTL cache of detect_intent results.
+
+    Concurrent misses on the same key are collapsed: the first caller
+    computes the value while the others wait for it ("single flight"), so a
+    burst of identical messages costs one upstream call.
+    """
+
+    def __init__(self, maxsize=5000, ttl=600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._async_flights = {}  # only touched from the event loop thread
+        self.coalesced = 0
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def get_or_compute(self, key, compute, keep=None):
+        """Return ``(value, computed)``; ``computed`` is True only for the caller that ran ``compute``.
+        A value for which ``keep(value)`` is false answers the waiting callers but is not cached."""
+        value = self._cache.get(key)
+        if value is not None:
+            return value, False
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, False
+
+        try:
+            flight.value = compute()
+            if keep is None or keep(flight.value):
+                self._cache.set(key, flight.value)
+            return flight.value, True
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    async def get_or_compute_async(self, key, compute, keep=None):
+        """Coroutine form of ``get_or_compute``; ``compute`` is an async callable.
+        If the leader is cancelled, a waiting caller takes over as the new leader."""
+        while True:
+            value = self._cache.get(key)
+            if value is not None:
+                return value, False
+
+            flight = self._async_flights.get(key)
+            if flight is None:
+                break
+            with self._lock:
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(flight), False
+            except asyncio.CancelledError:
+                # Only the leader's cancellation is retried, never this caller's own
+                if not flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved, even if nobody was waiting
+            raise
+        else:
+            if keep is None or keep(value):
+                self._cache.set(key, value)
+            flight.set_result(value)
+            return value, True
+        finally:
+            del self._async_flights[key]
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['coalesced'] = self.coalesced
+        return stats
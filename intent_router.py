@@ -0,0 +1,65 @@
+import time
+
+
+class IntentRequest:
+    """Everything an intent handler needs to know about one webhook call."""
+
+    __slots__ = ('session_id', 'intent_name', 'query_text', 'parameters', 'state', 'catalog', 'prices',
+                 'free_text')
+
+    def __init__(self, session_id, intent_name, query_text, parameters, state, catalog=None,
+                 prices=None, free_text=False):
+        self.session_id = session_id
+        self.intent_name = intent_name
+        self.query_text = query_text
+        self.parameters = parameters
+        # SessionState for this session, already locked by the caller
+        self.state = state
+        # Catalog to price and resolve items against (the cart's pinned version)
+        self.catalog = catalog
+        # That catalog's prices at the session's store
+        self.prices = prices
+        # True when the caller wants items parsed from the raw query text
+        # (the /dialogflow path) instead of Dialogflow's FoodItem parameters
+        self.free_text = free_text
+
+
+class IntentRouter:
+    """Dispatch table from intent display name to handler callable.
+
+    A handler takes an ``IntentRequest`` and returns the reply text, or None
+    when it has nothing to say. Timing hooks are called after every dispatch
+    with ``(intent_name, seconds, failed)``.
+    """
+
+    def __init__(self, handlers=None):
+        self._handlers = dict(handlers or {})
+        self._timing_hooks = []
+
+    def register(self, intent_name, handler):
+        self._handlers[intent_name] = handler
+
+    def add_timing_hook(self, hook):
+        self._timing_hooks.append(hook)
+
+    def __contains__(self, intent_name):
+        return intent_name in self._handlers
+
+    def intents(self):
+        return list(self._handlers)
+
+    def dispatch(self, intent_name, request):
+        handler = self._handlers[intent_name]
+        if not self._timing_hooks:
+            return handler(request)
+
+        failed = True
+        start = time.perf_counter()
+        try:
+            result = handler(request)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in self._timing_hooks:
+                hook(intent_name, elapsed, failed)
@@ -0,0 +1,139 @@
+"""Application logging: level-gated, queue-backed, with sampled payload dumps.
+
+Request threads only put records on a queue; a QueueListener thread
+formats and writes them, so neither formatting nor a slow log pipe
+stalls a worker. Messages use lazy %-style arguments, so a record below
+the configured level costs one ``isEnabledFor`` check and nothing is
+formatted.
+"""
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+
+
+class _JsonPayload:
+    """Defers json.dumps until the record is actually formatted. The payload
+    (a request body) must not be changed after it is logged."""
+    __slots__ = ('payload',)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        return json.dumps(self.payload, default=str)
+
+
+# Arguments left for the listener to format; anything else could change
+# before the listener gets to it, so it is turned into text when logged
+_DEFERRED_ARGS = (str, int, float, bytes, type(None), _JsonPayload)
+
+
+def _snapshot(value):
+    return value if isinstance(value, _DEFERRED_ARGS) else str(value)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records unformatted.
+
+    The stock ``prepare`` merges the arguments into the message and runs
+    the formatter in the logging thread. Here the message is merged and
+    formatted by the listener; the request thread only copies the record
+    and turns mutable arguments (a cart, a dict) into text.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if not isinstance(record.msg, str):
+            record.msg = str(record.msg)
+        if isinstance(record.args, dict):
+            record.args = {key: _snapshot(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(_snapshot(arg) for arg in record.args)
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log pipelines that parse fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(level='INFO', fmt='text', stream=None):
+    """Route the root logger through a queue to ``stream`` (stderr by default).
+
+    Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    os.register_at_fork(after_in_child=_restart_listener)
+
+
+def _restart_listener():
+    """Give a forked child (e.g. a preloaded gunicorn worker) its own queue and writer thread.
+
+    The parent's listener thread does not exist in the child, and records
+    the parent had queued but not yet written must not be written twice.
+    """
+    global _listener
+    old_queue = _listener.queue
+    log_queue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is old_queue:
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class PayloadSampler:
+    """Decides which raw request payloads get written to the log.
+
+    With ``every`` = N > 0, one payload in N is logged at INFO. Otherwise
+    payloads are only logged while ``logger`` is at DEBUG.
+    """
+
+    def __init__(self, logger, every=0):
+        self.logger = logger
+        self.every = every
+        self._counter = itertools.count(1)
+
+    def log(self, label, payload):
+        if self.every and next(self._counter) % self.every == 0:
+            level = logging.INFO
+        elif self.logger.isEnabledFor(logging.DEBUG):
+            level = logging.DEBUG
+        else:
+            return
+        self.logger.log(level, '%s: %s', label, _JsonPayload(payload))
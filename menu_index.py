@@ -0,0 +1,78 @@
+SIZES = ('small', 'medium', 'large')
+
+# Partial matches are looked up through every n-gram up to this length
+GRAM_SIZE = 3
+
+
+class MenuIndex:
+    """Lookup tables for resolving spoken item names, built once per menu.
+
+    Menu names are numbered in menu order. Besides the case-folded exact
+    and alias hashes, every 1- to 3-character gram of every name has a
+    posting list of those numbers (ascending). A partial lookup only scans
+    the rarest gram's posting list, so it touches a handful of names
+    instead of the whole menu.
+    """
+
+    def __init__(self, menu_items, item_name_mapping, size_required_items):
+        self.names = tuple(menu_items)
+        self._folded = tuple(name.casefold() for name in self.names)
+
+        self._exact = {}
+        for name, folded in zip(self.names, self._folded):
+            self._exact.setdefault(folded, name)
+
+        # Alias keys stay case-sensitive, as item_name_mapping always was
+        self._aliases = dict(item_name_mapping)
+
+        self._size_required = frozenset(size_required_items)
+
+        postings = {}
+        for ordinal, folded in enumerate(self._folded):
+            seen = set()
+            for length in range(1, GRAM_SIZE + 1):
+                for start in range(len(folded) - length + 1):
+                    gram = folded[start:start + length]
+                    if gram not in seen:
+                        seen.add(gram)
+                        postings.setdefault(gram, []).append(ordinal)
+        self._postings = {gram: tuple(ordinals) for gram, ordinals in postings.items()}
+
+    def exact(self, item_name):
+        """Menu name equal to ``item_name`` ignoring case, or None"""
+        return self._exact.get(item_name.casefold())
+
+    def partial(self, item_name):
+        """First menu name (in menu order) containing ``item_name``, or None"""
+        query = item_name.casefold()
+        if not query:
+            return self.names[0] if self.names else None
+
+        # Every match contains every gram of the query, so the shortest
+        # posting list among them bounds the candidates
+        length = min(GRAM_SIZE, len(query))
+        best = None
+        for start in range(len(query) - length + 1):
+            ordinals = self._postings.get(query[start:start + length])
+            if ordinals is None:
+                return None
+            if best is None or len(ordinals) < len(best):
+                best = ordinals
+
+        folded = self._folded
+        for ordinal in best:
+            if query in folded[ordinal]:
+                return self.names[ordinal]
+        return None
+
+    def resolve(self, item_name):
+        """Convert a partial or aliased item name to its full menu item name"""
+        base_name = self._aliases.get(item_name, item_name)
+
+        # If item requires size and no size specified, return small by default
+        if base_name in self._size_required:
+            lowered = item_name.lower()
+            if not any(size in lowered for size in SIZES):
+                return f"{base_name} (Small)"
+
+        return self.exact(base_name) or self.partial(base_name)
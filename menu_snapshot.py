@@ -0,0 +1,53 @@
+from types import MappingProxyType
+
+# MenuQuery categories: fixed item lists, or keywords matched against menu names
+CATEGORY_ITEMS = {
+    'sandwiches': ('Chicken Sandwich', 'Deluxe Chicken Sandwich', 'Spicy Chicken Sandwich',
+                   'Spicy Deluxe Sandwich', 'Grilled Chicken Sandwich', 'Grilled Chicken Club Sandwich'),
+    'salads': ('Cobb Salad', 'Spicy Southwest Salad', 'Market Salad', 'Side Salad'),
+}
+CATEGORY_KEYWORDS = {
+    'drinks': ('Drink', 'Lemonade', 'Tea', 'Coffee', 'Chocolate Milk', 'White Milk', 'Sunjoy'),
+    'desserts': ('Milkshake', 'Cookie', 'Icedream', 'Brownie'),
+    'sides': ('Fries', 'Mac & Cheese', 'Fruit Cup', 'Soup'),
+}
+
+
+class MenuSnapshot:
+    """Read-only view of one menu with every MenuQuery answer precomputed.
+
+    Built once from ``menu_items``; nothing in it changes afterwards. Each
+    ``Catalog`` owns its snapshot, so a reload builds a new one along with
+    the catalog that ``CatalogStore`` publishes, and a request keeps reading
+    the snapshot of the catalog version it was pinned to.
+    """
+
+    def __init__(self, menu_items):
+        self.names = tuple(menu_items)
+        self.prices = MappingProxyType({name: item['price'] for name, item in menu_items.items()})
+        self.ingredients = MappingProxyType(
+            {name: ', '.join(item['ingredients']) for name, item in menu_items.items()})
+        self.details = MappingProxyType({
+            name: f"{name}: ${self.prices[name]:.2f}\nIngredients: {self.ingredients[name]}"
+            for name in self.names
+        })
+        self.ingredient_replies = MappingProxyType({
+            name: f"{name} contains: {ingredients}. Would you like to know the price?"
+            for name, ingredients in self.ingredients.items()
+        })
+
+        categories = dict(CATEGORY_ITEMS)
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            categories[category] = tuple(name for name in self.names
+                                         if any(keyword in name for keyword in keywords))
+        self.categories = MappingProxyType(categories)
+        self.category_replies = MappingProxyType({
+            category: f"Here are our {category} options: {', '.join(items)}"
+            for category, items in categories.items() if items
+        })
+        self.overview_reply = (f"We have several menu categories: {', '.join(self.names)}. "
+                               "Which would you like to know more about?")
+
+    def items_in(self, category):
+        """Item names in ``category`` (any case), or an empty tuple"""
+        return self.categories.get(category.lower(), ())
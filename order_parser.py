@@ -0,0 +1,179 @@
+"""Free-text order parser: "can i get 2 large fries and a lemonade" -> items.
+
+The utterance is lowercased and split into words once. The catalog's
+menu names and aliases (see alias_matcher), sizes, piece counts, number
+words, separators and modifier words are compiled into one word-level
+Aho–Corasick automaton per catalog, so an utterance with any number of
+items is parsed in a single scan of its words. Longest match wins, which
+keeps "Bacon, Egg & Cheese Biscuit", "mac and cheese" and "Sweet and
+Spicy Sriracha Sauce" from being split at their "," / "and"."""
+import re
+
+from aho_corasick import AhoCorasick
+from alias_matcher import tokenize
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'a': 1, 'an': 1,
+}
+# Most of one item a single utterance may order; the parser reports more as said
+MAX_QUANTITY = 99
+SIZES = ('small', 'medium', 'large')
+SEPARATORS = (',', 'and', 'plus')
+# Lead-ins dropped wherever they appear
+FILLERS = ('can i get', 'can i have', 'could i get', 'i want', "i'd like", 'i would like',
+           'please', 'some')
+# Words that start a modifier phrase ("no pickles", "extra sauce")
+MODIFIER_WORDS = ('with', 'without', 'no', 'extra', 'hold the')
+# Generic words for items -> the alias they stand for, beyond the catalog's aliases
+ORDER_KEYWORDS = {'fry': 'Waffle Potato Fries'}
+# Words after a piece count ("12 count nuggets", "8 piece grilled nuggets")
+COUNT_WORDS = ('count', 'piece', 'pc')
+# Menu names sold by piece count: "Nuggets (12-count)"
+COUNTED_NAME = re.compile(r'^(.*) \((\d+)-count\)$')
+
+ITEM, NUMBER, SIZE, SEPARATOR, FILLER, MODIFIER, COUNT, COUNTED = range(8)
+
+
+def stated_size(text):
+    """'Small' / 'Medium' / 'Large' when ``text`` says one, else None"""
+    return next((word.capitalize() for word in tokenize(text) if word in SIZES), None)
+
+
+class ParsedItem:
+    __slots__ = ('quantity', 'size', 'item', 'modifiers', 'text')
+
+    def __init__(self, quantity=1, size=None, item=None, modifiers=(), text=''):
+        self.quantity = quantity
+        # 'Small' / 'Medium' / 'Large', or None when not said
+        self.size = size
+        # Menu name (base name for sized items), or None when nothing on the menu matched;
+        # more than MAX_QUANTITY is left for the caller to refuse
+        self.item = item
+        self.modifiers = modifiers
+        # The words left in the phrase, for fallback matching when item is None
+        self.text = text
+
+    def __repr__(self):
+        return (f"ParsedItem({self.quantity}, {self.size!r}, {self.item!r}, "
+                f"{self.modifiers!r}, {self.text!r})")
+
+
+def _counted_items(price_list):
+    """``{base name: {count: menu name}}`` for the items sold by piece count"""
+    counted = {}
+    for name in price_list:
+        match = COUNTED_NAME.match(name)
+        if match:
+            counted.setdefault(match.group(1), {})[int(match.group(2))] = name
+    return counted
+
+
+class OrderParser:
+    def __init__(self, aliases, price_list=()):
+        """Builds the automaton from an AliasMatcher's patterns plus ORDER_KEYWORDS,
+        and the piece counts of ``price_list``'s "(N-count)" items"""
+        patterns = [(words, (ITEM, target)) for words, target in aliases.patterns]
+        for keyword, alias in ORDER_KEYWORDS.items():
+            target = aliases.lookup(alias)
+            if target:
+                patterns.append(((keyword,), (ITEM, target)))
+        counted = _counted_items(price_list)
+        for base, by_count in counted.items():
+            words = tuple(tokenize(base))
+            patterns.append((words, (COUNTED, by_count)))
+            if words[-1].endswith('s'):
+                patterns.append((words[:-1] + (words[-1][:-1],), (COUNTED, by_count)))
+        count_names = {count: [str(count)] for by_count in counted.values() for count in by_count}
+        for word, number in NUMBER_WORDS.items():
+            if number in count_names and len(word) > 2:
+                count_names[number].append(word)
+        for count, names in count_names.items():
+            patterns.extend(((f"{count}-{unit}",), (COUNT, count)) for unit in COUNT_WORDS)
+            patterns.extend(((name, unit), (COUNT, count)) for name in names for unit in COUNT_WORDS)
+        patterns.extend(((word,), (NUMBER, number)) for word, number in NUMBER_WORDS.items())
+        patterns.extend(((size,), (SIZE, size.capitalize())) for size in SIZES)
+        patterns.extend(((word,), (SEPARATOR, None)) for word in SEPARATORS)
+        patterns.extend((tokenize(words), (FILLER, None)) for words in FILLERS)
+        patterns.extend((tokenize(words), (MODIFIER, None)) for words in MODIFIER_WORDS)
+        self._automaton = AhoCorasick(patterns)
+
+    def parse(self, text):
+        """The items ordered in ``text``, in order. A phrase naming nothing on the
+        menu comes back with ``item=None`` and its remaining words in ``text``.
+        A piece count goes with a counted item ("2 12 count nuggets" is two
+        Nuggets (12-count)); a modifier after a separator ("and extra sauce")
+        goes with the item before it."""
+        words = tokenize(text)
+        items = []
+        phrase_items = []     # items of the phrase being read
+        leftover = []         # unrecognized words of the phrase
+        quantity = size = count = None
+        modifier_start = None
+        cursor = 0
+
+        def skip_to(stop):
+            nonlocal quantity
+            for word in words[cursor:stop]:
+                if word.isdigit():
+                    # Digits are never patterns, so any number is read and
+                    # the caller can refuse one that is too large
+                    quantity = int(word)
+                else:
+                    leftover.append(word)
+
+        def end_phrase():
+            nonlocal quantity, size, count, phrase_items, leftover
+            if size and phrase_items and phrase_items[-1].size is None:
+                # "fries large"
+                phrase_items[-1].size = size
+            if not phrase_items:
+                if leftover:
+                    items.append(ParsedItem(quantity or 1, size, None, (), ' '.join(leftover)))
+            items.extend(phrase_items)
+            phrase_items, leftover = [], []
+            quantity = size = count = None
+
+        def end_modifier(end):
+            nonlocal modifier_start
+            if modifier_start is not None:
+                target = phrase_items or items
+                if target and end - modifier_start > 1:
+                    target[-1].modifiers += (' '.join(words[modifier_start:end]),)
+                modifier_start = None
+
+        for start, end, (kind, value) in self._automaton.search(words):
+            if modifier_start is not None:
+                end_modifier(start)
+            elif start > cursor:
+                skip_to(start)
+            cursor = end
+
+            if kind == ITEM:
+                phrase_items.append(ParsedItem(quantity or 1, size, value))
+                quantity = size = count = None
+            elif kind == COUNTED:
+                if count in value:
+                    phrase_items.append(ParsedItem(quantity or 1, None, value[count]))
+                    quantity = size = count = None
+                else:
+                    # "nuggets" alone: no menu name without its count
+                    leftover.extend(words[start:end])
+            elif kind == COUNT:
+                count = value
+            elif kind == NUMBER:
+                quantity = value
+            elif kind == SIZE:
+                size = value
+            elif kind == SEPARATOR:
+                end_phrase()
+            elif kind == MODIFIER:
+                modifier_start = start
+
+        if modifier_start is not None:
+            end_modifier(len(words))
+        elif cursor < len(words):
+            skip_to(len(words))
+        end_phrase()
+        return items
@@ -0,0 +1,139 @@
+"""Per-store prices kept in one flat array of doubles.
+
+Row 0 holds the base prices; every store in the catalog gets a row that
+starts as a copy of the base and has its overrides written in. A lookup
+is two dict hits (item -> column, store -> row) and an array index,
+whatever the number of stores.
+
+With ``shared_dir`` the array is written to a file named after its
+contents and memory-mapped read-only, so every worker on the host maps
+the same pages instead of holding its own copy. ``remove_superseded``
+deletes the files of earlier catalogs once a new one is in use.
+"""
+import hashlib
+import math
+import mmap
+import os
+from array import array
+
+_MISSING = float('nan')
+# Shared files are named prices-<sha1 of the array>.bin
+FILE_PREFIX = 'prices-'
+FILE_SUFFIX = '.bin'
+
+
+class StorePrices:
+    """Read-only ``{item name: price}`` view of one store's row"""
+
+    __slots__ = ('store_id', '_columns', '_values', '_offset')
+
+    def __init__(self, store_id, columns, values, offset):
+        self.store_id = store_id
+        self._columns = columns
+        self._values = values
+        self._offset = offset
+
+    def get(self, item_name, default=None):
+        column = self._columns.get(item_name)
+        if column is None:
+            return default
+        price = self._values[self._offset + column]
+        return default if math.isnan(price) else price
+
+    def __getitem__(self, item_name):
+        price = self.get(item_name)
+        if price is None:
+            raise KeyError(item_name)
+        return price
+
+    def __contains__(self, item_name):
+        return self.get(item_name) is not None
+
+    def __repr__(self):
+        return f"StorePrices({self.store_id!r})"
+
+
+class PriceTable:
+    def __init__(self, base_prices, store_overrides=None, shared_dir=None):
+        """``store_overrides`` is ``{store_id: {item name: price or None}}``;
+        None makes the item unpriced at that store.
+
+        Raises ValueError for an override of an item missing from the base.
+        """
+        store_overrides = store_overrides or {}
+        self._columns = {name: column for column, name in enumerate(base_prices)}
+        width = len(self._columns)
+
+        values = array('d', (float(price) for price in base_prices.values()))
+        values *= len(store_overrides) + 1
+        rows = {}
+        for row, (store_id, overrides) in enumerate(store_overrides.items(), start=1):
+            rows[store_id] = row
+            for item_name, price in overrides.items():
+                column = self._columns.get(item_name)
+                if column is None:
+                    raise ValueError(f"Store {store_id} overrides unknown item {item_name!r}")
+                values[row * width + column] = _MISSING if price is None else float(price)
+
+        # The shared file's path, or None when the table is in process memory
+        self.path = None
+        if shared_dir and width:
+            self.path, self._values = _share(values, shared_dir)
+        else:
+            self._values = values
+        self.base = StorePrices(None, self._columns, self._values, 0)
+        self._stores = {store_id: StorePrices(store_id, self._columns, self._values, row * width)
+                        for store_id, row in rows.items()}
+
+    @property
+    def stores(self):
+        return tuple(self._stores)
+
+    def for_store(self, store_id):
+        """Prices for ``store_id``; the base prices for no or an unknown store"""
+        return self._stores.get(store_id, self.base)
+
+    def nbytes(self):
+        return len(self._values) * self._values.itemsize
+
+
+def _share(values, directory):
+    """``(path, values)`` with ``values`` as a read-only memory map of a
+    content-addressed file in ``directory``"""
+    data = values.tobytes()
+    path = os.path.join(directory, f"{FILE_PREFIX}{hashlib.sha1(data).hexdigest()}{FILE_SUFFIX}")
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        f = open(temp_path, 'w+b')
+        f.write(data)
+        f.flush()
+        # Another worker may have written the same file meanwhile; the bytes are identical
+        os.replace(temp_path, path)
+    # Mapped through the open file, so another worker removing the name
+    # (remove_superseded) cannot make this fail
+    with f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return path, memoryview(mapped).cast('d')
+
+
+def remove_superseded(directory, current_path):
+    """Delete every shared price file in ``directory`` except ``current_path``.
+
+    Workers still on an older catalog keep their mapping, since only the
+    name goes; a worker that needs a deleted file again writes it anew.
+    Returns the number of files removed.
+    """
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX) and path != current_path:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                # Another worker removed it first
+                pass
+    return removed
@@ -0,0 +1,131 @@
+"""Opt-in stack-sampling profiler for request handling.
+
+A request is profiled when it carries the profiling header with the admin
+token, or when it falls into the configured sample rate. While at least
+one profiled request is running, a background thread samples the stacks
+of exactly those request threads every ``interval`` seconds and counts
+them as collapsed stacks ("outer;inner;leaf count"), the input format of
+flamegraph.pl and speedscope. Samples accumulate across requests until
+reset.
+
+Requests that are not profiled pay one header lookup and a comparison; the
+sampler thread sleeps whenever no profiled request is in flight.
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+
+def collapse(frame):
+    """One frame's stack as ``root;...;leaf``"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = Counter()
+        self.profiled_requests = 0
+        self._lock = threading.Lock()
+        self._threads = {}  # thread id -> nesting depth
+        self._active = threading.Event()
+        self._sampler = None
+
+    @contextmanager
+    def profile(self):
+        """Sample the calling thread for the duration of the block"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+            self.profiled_requests += 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._sampler.start()
+            self._active.set()
+        try:
+            yield
+        finally:
+            with self._lock:
+                depth = self._threads.pop(thread_id) - 1
+                if depth:
+                    self._threads[thread_id] = depth
+                elif not self._threads:
+                    self._active.clear()
+
+    def _run(self):
+        while True:
+            self._active.wait()
+            with self._lock:
+                thread_ids = list(self._threads)
+            frames = sys._current_frames()
+            stacks = [collapse(frames[t]) for t in thread_ids if t in frames]
+            with self._lock:
+                self.samples.update(stacks)
+            time.sleep(self.interval)
+
+    def collapsed(self):
+        """Accumulated samples in collapsed-stack format, heaviest first"""
+        with self._lock:
+            items = self.samples.most_common()
+        return ''.join(f"{stack} {count}\n" for stack, count in items)
+
+    def totals(self):
+        """``(samples, distinct stacks)`` collected so far"""
+        with self._lock:
+            return sum(self.samples.values()), len(self.samples)
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.profiled_requests = 0
+
+
+class RequestProfiler:
+    """Decides which requests get profiled and runs them under a StackSampler.
+
+    ``token`` enables per-request profiling through a header carrying it;
+    ``sample_rate`` (0.0-1.0) profiles that share of all requests and can be
+    changed at runtime.
+    """
+
+    def __init__(self, sample_rate=0.0, token=None, interval=0.001):
+        self.sample_rate = sample_rate
+        self.token = token
+        self.sampler = StackSampler(interval)
+
+    def wanted(self, header_value=None):
+        if header_value and self.token and hmac.compare_digest(header_value.encode(), self.token.encode()):
+            return True
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+    def run(self, wanted, func, *args, **kwargs):
+        """``func(*args, **kwargs)``, sampled if ``wanted``"""
+        if not wanted:
+            return func(*args, **kwargs)
+        with self.sampler.profile():
+            return func(*args, **kwargs)
+
+    def stats(self):
+        samples, distinct_stacks = self.sampler.totals()
+        return {
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.sampler.interval * 1000,
+            'profiled_requests': self.sampler.profiled_requests,
+            'samples': samples,
+            'distinct_stacks': distinct_stacks,
+        }
@@ -0,0 +1,389 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from cart import Cart
+from striped_lock import StripedLock
+from ttl_cache import TTLCache
+
+
+class SessionState:
+    """All per-conversation state, kept together in one compact record.
+
+    These used to be six separate module-level dicts in app.py keyed by
+    session id. A flag that used to be "present in the dict" is now simply
+    truthy here.
+    """
+
+    __slots__ = (
+        'orders',
+        'pending_orders',
+        'last_ordered_item',
+        'awaiting_order_confirmation',
+        'awaiting_menu_response',
+        'awaiting_more_items',
+        'catalog_version',
+        'dialogflow_contexts',
+    )
+
+    def __init__(self, orders=None, pending_orders=None, last_ordered_item=None,
+                 awaiting_order_confirmation=False, awaiting_menu_response=None,
+                 awaiting_more_items=False, catalog_version=None, dialogflow_contexts=None):
+        # Cart of everything ordered so far
+        self.orders = orders if orders is not None else Cart()
+        self.pending_orders = pending_orders
+        self.last_ordered_item = last_ordered_item
+        self.awaiting_order_confirmation = awaiting_order_confirmation
+        self.awaiting_menu_response = awaiting_menu_response
+        self.awaiting_more_items = awaiting_more_items
+        # Catalog version the cart is priced against; only meaningful with orders
+        self.catalog_version = catalog_version
+        # Contexts Dialogflow left active for this session on its last reply
+        self.dialogflow_contexts = dialogflow_contexts or []
+
+    def is_empty(self):
+        return not (self.orders or self.pending_orders or self.last_ordered_item
+                    or self.awaiting_order_confirmation
+                    or self.awaiting_menu_response
+                    or self.awaiting_more_items
+                    or self.dialogflow_contexts)
+
+    def clear(self):
+        self.orders = Cart()
+        self.pending_orders = None
+        self.last_ordered_item = None
+        self.awaiting_order_confirmation = False
+        self.awaiting_menu_response = None
+        self.awaiting_more_items = False
+        self.catalog_version = None
+        # dialogflow_contexts stays: clearing the order does not clear Dialogflow's side
+
+    def to_dict(self):
+        # Only non-empty fields are written so idle sessions stay small
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value:
+                data[name] = value
+        if self.orders:
+            data['orders'] = self.orders.to_compact()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        if 'orders' in data:
+            data = dict(data, orders=Cart.from_compact(data['orders']))
+        return cls(**data)
+
+    def __repr__(self):
+        return f"SessionState({self.to_dict()!r})"
+
+
+class SessionStore(ABC):
+    """Interface shared by every session backend.
+
+    ``get`` always returns a state object, creating an empty one for unknown
+    sessions without storing it. ``save`` persists the state, or drops the
+    session entirely once nothing is left in it.
+
+    Handlers should go through ``transaction``, which loads, yields and
+    saves the state while no other request can touch the same session.
+    If the block raises, every backend discards the changes.
+    """
+
+    @abstractmethod
+    def get(self, session_id):
+        pass
+
+    @abstractmethod
+    def transaction(self, session_id):
+        pass
+
+    @abstractmethod
+    def save(self, session_id, state):
+        pass
+
+    @abstractmethod
+    def delete(self, session_id):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def stats(self):
+        return {'backend': type(self).__name__, 'sessions': len(self)}
+
+    def field_counts(self):
+        """Number of sessions with each SessionState field set, where cheap to count"""
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """In-process backend with sliding TTL and LRU eviction past ``max_sessions``.
+
+    ``max_sessions`` caps how many sessions are kept, not the memory they
+    take: each one grows with its cart.
+
+    Transactions lock one of ``lock_stripes`` locks picked by session id, so
+    overlapping requests for one session (gunicorn --threads, the ASGI
+    worker's thread pool) take turns while other sessions run in parallel.
+    """
+
+    def __init__(self, ttl=1800, max_sessions=10000, lock_stripes=256):
+        self._cache = TTLCache(maxsize=max_sessions, ttl=ttl, sliding=True)
+        self._locks = StripedLock(lock_stripes)
+
+    def get(self, session_id):
+        state = self._cache.get(session_id)
+        if state is None:
+            state = SessionState()
+        return state
+
+    @contextmanager
+    def transaction(self, session_id):
+        # Only threads of this process can race here
+        with self._locks.for_key(session_id):
+            state = self.get(session_id)
+            # The cached state is changed in place; put it back if the block raises
+            saved = json.dumps(state.to_dict())
+            try:
+                yield state
+            except BaseException:
+                restored = SessionState.from_dict(json.loads(saved))
+                for name in SessionState.__slots__:
+                    setattr(state, name, getattr(restored, name))
+                raise
+            self.save(session_id, state)
+
+    def save(self, session_id, state):
+        if state.is_empty():
+            self._cache.pop(session_id)
+        else:
+            self._cache.set(session_id, state)
+
+    def delete(self, session_id):
+        with self._locks.for_key(session_id):
+            self._cache.pop(session_id)
+
+    def __len__(self):
+        return self._cache.purge()
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(self._cache.stats())
+        return stats
+
+    def field_counts(self):
+        counts = dict.fromkeys(SessionState.__slots__, 0)
+        for state in self._cache.values():
+            for name in SessionState.__slots__:
+                if getattr(state, name):
+                    counts[name] += 1
+        return counts
+
+
+class SqliteSessionStore(SessionStore):
+    """Shared backend backed by a local SQLite file.
+
+    Every process pointed at the same file sees the same sessions, so this
+    is what lets gunicorn run several workers on one host. The database runs
+    in WAL mode so readers never block the single writer, and transactions
+    take the write lock up front (BEGIN IMMEDIATE) so two workers cannot
+    interleave a read-modify-write on the same cart. Expiry and the
+    ``max_sessions`` cap (a number of sessions, not a size) are enforced in
+    SQL, least recently written first.
+    """
+
+    # Housekeeping (expiry + cap) runs once every this many writes
+    SWEEP_EVERY = 256
+
+    def __init__(self, path='sessions.db', ttl=1800, max_sessions=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Set up on a connection of its own and close it, so none is open
+        # when a preloaded gunicorn master forks its workers
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)"
+            )
+        finally:
+            conn.close()
+        # A connection opened before a fork must not be used in the child;
+        # the child opens its own on first use
+        os.register_at_fork(after_in_child=self._forget_connections)
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def _connect(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, session_id):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = self.get(session_id)
+            yield state
+            self.save(session_id, state)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, session_id):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, now),
+        ).fetchone()
+        if row is None:
+            return SessionState()
+        return SessionState.from_dict(json.loads(row[0]))
+
+    def save(self, session_id, state):
+        if state.is_empty():
+            self.delete(session_id)
+            return
+        data = json.dumps(state.to_dict(), separators=(',', ':'))
+        self._connect().execute(
+            "INSERT INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(session_id) DO UPDATE SET"
+            " data = excluded.data, expires_at = excluded.expires_at",
+            (session_id, data, time.time() + self.ttl),
+        )
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def delete(self, session_id):
+        self._connect().execute(
+            "DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def sweep(self):
+        """Remove expired sessions and trim the table down to ``max_sessions``."""
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        # expires_at is last write + ttl, so the smallest values are the LRU ones
+        conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            " SELECT session_id FROM sessions ORDER BY expires_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+
+    def __len__(self):
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return row[0]
+
+
+class RedisSessionStore(SessionStore):
+    """Shared backend on any Redis-protocol server, for multi-host deployments.
+
+    Needs the optional ``redis`` package. A per-session lock key serializes
+    read-modify-write across every worker and dyno; TTL is Redis key expiry,
+    and the memory cap is the server's own ``maxmemory`` + ``allkeys-lru``.
+    A sorted set of session ids scored by expiry time keeps the live count
+    cheap for the metrics gauge, without scanning the keyspace.
+    """
+
+    KEY_PREFIX = 'cfa:session:'
+    LOCK_PREFIX = 'cfa:lock:'
+    INDEX_KEY = 'cfa:sessions'
+
+    def __init__(self, url='redis://localhost:6379/0', ttl=1800, lock_timeout=10):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "SESSION_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, session_id):
+        data = self._client.get(self.KEY_PREFIX + session_id)
+        if data is None:
+            return SessionState()
+        return SessionState.from_dict(json.loads(data))
+
+    @contextmanager
+    def transaction(self, session_id):
+        lock = self._client.lock(self.LOCK_PREFIX + session_id,
+                                 timeout=self.lock_timeout,
+                                 blocking_timeout=self.lock_timeout)
+        if not lock.acquire():
+            raise TimeoutError(f"Timed out waiting for session {session_id}")
+        try:
+            state = self.get(session_id)
+            yield state
+            self.save(session_id, state)
+        finally:
+            lock.release()
+
+    def save(self, session_id, state):
+        if state.is_empty():
+            self.delete(session_id)
+            return
+        data = json.dumps(state.to_dict(), separators=(',', ':'))
+        pipe = self._client.pipeline()
+        pipe.set(self.KEY_PREFIX + session_id, data, ex=self.ttl)
+        pipe.zadd(self.INDEX_KEY, {session_id: time.time() + self.ttl})
+        pipe.execute()
+
+    def delete(self, session_id):
+        pipe = self._client.pipeline()
+        pipe.delete(self.KEY_PREFIX + session_id)
+        pipe.zrem(self.INDEX_KEY, session_id)
+        pipe.execute()
+
+    def __len__(self):
+        # Drop the ids whose keys Redis has expired, then count the rest
+        pipe = self._client.pipeline()
+        pipe.zremrangebyscore(self.INDEX_KEY, '-inf', time.time())
+        pipe.zcard(self.INDEX_KEY)
+        return pipe.execute()[1]
+
+
+def create_session_store(config):
+    """Build the session backend selected by ``config.SESSION_BACKEND``."""
+    backend = config.SESSION_BACKEND
+    if backend == 'memory':
+        return MemorySessionStore(ttl=config.SESSION_TTL_SECONDS,
+                                  max_sessions=config.SESSION_MAX_SESSIONS,
+                                  lock_stripes=config.SESSION_LOCK_STRIPES)
+    if backend == 'sqlite':
+        return SqliteSessionStore(path=config.SESSION_SQLITE_PATH,
+                                  ttl=config.SESSION_TTL_SECONDS,
+                                  max_sessions=config.SESSION_MAX_SESSIONS)
+    if backend == 'redis':
+        return RedisSessionStore(url=config.SESSION_REDIS_URL,
+                                 ttl=config.SESSION_TTL_SECONDS)
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
@@ -0,0 +1,38 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def catalog():
+    return app.catalogs.current
+
+
+@pytest.mark.parametrize('text, size, expected', [
+    ('Waffle Potato Fries (Large)', None, 'Waffle Potato Fries (Large)'),
+    ('Waffle Potato Fries (Large)', 'Small', 'Waffle Potato Fries (Large)'),
+    ('large lemonade', None, 'Chick-fil-A Lemonade (Large)'),
+    ('large lemonade', 'Small', 'Chick-fil-A Lemonade (Large)'),
+    ('lemonade', 'Medium', 'Chick-fil-A Lemonade (Medium)'),
+    ('spicy deluxe', None, 'Spicy Deluxe Sandwich'),
+])
+def test_added_item_keeps_stated_size(catalog, text, size, expected):
+    assert app.resolve_added_item(catalog, text, size) == expected
+
+
+@pytest.mark.parametrize('phrase, expected', [
+    ('fries', ('category', 'fries')),
+    ('all drinks', ('category', 'drinks')),
+    ('Soft Drink (Medium)', ('item', 'Soft Drink (Medium)')),
+    ('Waffle Potato Fries (Large)', ('item', 'Waffle Potato Fries (Large)')),
+    ('my coke', ('base', 'Soft Drink')),
+])
+def test_removal_target(catalog, phrase, expected):
+    assert catalog.removal_target(phrase) == expected
+
+
+def test_milkshakes_are_desserts_not_drinks(catalog):
+    drinks = catalog.snapshot.items_in('drinks')
+    assert '1% White Milk' in drinks
+    assert not [name for name in drinks if 'Milkshake' in name]
+    assert 'Milkshake (Small)' in catalog.snapshot.items_in('desserts')
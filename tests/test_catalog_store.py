@@ -0,0 +1,22 @@
+import json
+
+from catalog import CatalogStore, DEFAULT_PATH
+
+
+def test_malformed_item_keeps_current_catalog(tmp_path):
+    with open(DEFAULT_PATH) as f:
+        data = json.load(f)
+    catalog_path = tmp_path / 'catalog.json'
+    catalog_path.write_text(json.dumps(data))
+    store = CatalogStore(str(catalog_path))
+    current = store.current
+
+    del data['menu_items']['Cobb Salad']['ingredients']
+    catalog_path.write_text(json.dumps(data) + '\n')
+
+    assert store.reload() is False
+    assert store.reload_errors == 1
+    assert store.current is current
+    # The same broken file is reported once, not on every poll
+    assert store.reload() is False
+    assert store.reload_errors == 1
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+import app
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(app.Config, 'DIALOGFLOW_ENDPOINT', None)
+    monkeypatch.setattr(app, '_dialogflow_credentials', None)
+    monkeypatch.setattr(app, '_dialogflow_retry_at', 0.0)
+    monkeypatch.setattr(app, 'load_dialogflow_credentials', AnonymousCredentials)
+    monkeypatch.setitem(app.app.config, 'DIALOGFLOW_CLIENT', None)
+
+
+def in_thread(func, timeout=30):
+    """``func()``'s result, failing the test if it does not return in time"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{func.__name__} did not return (deadlock?)"
+    return result[0]
+
+
+def test_client_is_built_through_the_credentials_path(fresh_client):
+    client = in_thread(app.get_dialogflow_client)
+
+    assert client is not None
+    assert isinstance(app._dialogflow_credentials, AnonymousCredentials)
+    assert in_thread(app.get_dialogflow_client) is client
+
+
+def test_webhook_body_on_dialogflow_does_not_wait_on_client_build(fresh_client):
+    body = {
+        'session': 'projects/p/agent/sessions/test-client',
+        'queryResult': {'intent': {'displayName': 'Default Welcome Intent'}, 'queryText': 'hi'},
+    }
+
+    response = in_thread(lambda: app.app.test_client().post('/dialogflow', json=body))
+
+    assert response.status_code == 200
+    assert 'Welcome' in response.get_json()['fulfillmentText']
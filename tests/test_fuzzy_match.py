@@ -0,0 +1,28 @@
+import pytest
+
+from fuzzy_match import FuzzyMatcher
+
+NAMES = ['Chicken Sandwich', 'Chicken Biscuit', 'Polynesian Sauce', 'Barbeque Sauce',
+         'Chick-fil-A Lemonade', 'Frosted Lemonade', 'Cobb Salad', 'Mac & Cheese (Small)',
+         'Mac & Cheese (Large)']
+
+
+@pytest.fixture
+def matcher():
+    return FuzzyMatcher(NAMES, aliases={'lemonade': 'Chick-fil-A Lemonade'})
+
+
+@pytest.mark.parametrize('text', ['sauce', 'chicken', 'some chiken please'])
+def test_one_generic_word_matches_nothing(matcher, text):
+    assert matcher.match(text) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('lemonaid', 'Chick-fil-A Lemonade'),   # one-word alias
+    ('salda', 'Cobb Salad'),                # word of one item only
+    ('mac', 'Mac & Cheese (Small)'),        # every size is the same item
+    ('polynesain sauce', 'Polynesian Sauce'),
+    ('chiken sandwhich', 'Chicken Sandwich'),
+])
+def test_typos_and_distinctive_words_match(matcher, text, expected):
+    assert matcher.match(text) == expected
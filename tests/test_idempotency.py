@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from idempotency import WebhookResponses, response_key
+
+
+def test_response_key_needs_a_response_id():
+    assert response_key({'responseId': 'r1'}, 's') == ('s', 'r1')
+    assert response_key({}, 's') is None
+
+
+def test_concurrent_retries_run_the_handler_once():
+    responses = WebhookResponses()
+    release = threading.Event()
+    runs = []
+
+    def run():
+        runs.append(1)
+        release.wait(5)
+        return 'reply'
+
+    replies = []
+    threads = [threading.Thread(target=lambda: replies.append(responses.get_or_run(('s', 'r'), run)))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert replies == ['reply'] * 20
+    assert len(runs) == 1
+    assert responses.replays == 19
+
+
+def test_failed_attempt_is_not_remembered():
+    responses = WebhookResponses()
+
+    def fail():
+        raise RuntimeError('handler failed')
+
+    with pytest.raises(RuntimeError):
+        responses.get_or_run(('s', 'r'), fail)
+    assert responses.get_or_run(('s', 'r'), lambda: 'reply') == 'reply'
+    assert responses.replays == 0
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from google.cloud.dialogflow_v2.types import Context, DetectIntentResponse, Intent, QueryResult
+
+import app
+from fast_path import FastPathClassifier
+from intent_cache import IntentCache
+
+
+class StubAgent:
+    """SessionsClient stand-in: every text maps to an intent and the contexts it leaves"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+
+    def session_path(self, project, session):
+        return f"projects/{project}/agent/sessions/{session}"
+
+    def detect_intent(self, request):
+        text = request['query_input'].text.text
+        self.calls.append((request['session'].rsplit('/', 1)[-1], text))
+        intent, contexts = self.replies[text]
+        return DetectIntentResponse(query_result=QueryResult(
+            query_text=text,
+            intent=Intent(display_name=intent),
+            parameters={},
+            fulfillment_text=f"[agent] {intent}",
+            output_contexts=[Context(name=f"{request['session']}/contexts/{name}", lifespan_count=2)
+                             for name in contexts + ['__system_counters__']],
+        ))
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    stub = StubAgent({
+        'hours': ('StoreHours', []),
+        'i want nuggets': ('OrderNuggets', ['ordernuggets-followup']),
+        'yes': ('Yes', []),
+    })
+    monkeypatch.setitem(app.app.config, 'DIALOGFLOW_CLIENT', stub)
+    monkeypatch.setattr(app, 'intent_cache', IntentCache(100, 600))
+    monkeypatch.setattr(app, 'fast_path', FastPathClassifier())
+    return stub
+
+
+def chat(session_id, text):
+    app.session_store.delete(session_id)
+    client = app.app.test_client()
+    return client.post('/dialogflow', json={'sessionId': session_id, 'text': text}).get_json()
+
+
+def test_context_free_result_is_replayed(agent):
+    chat('cache-a', 'hours')
+    chat('cache-b', 'hours')
+
+    assert agent.calls == [('cache-a', 'hours')]
+
+
+def test_result_that_sets_contexts_is_not_replayed(agent):
+    chat('cache-c', 'i want nuggets')
+    chat('cache-d', 'i want nuggets')
+
+    assert agent.calls == [('cache-c', 'i want nuggets'), ('cache-d', 'i want nuggets')]
+    assert app.session_store.get('cache-d').dialogflow_contexts == ['ordernuggets-followup']
+
+
+def test_session_with_active_contexts_skips_cache_and_fast_path(agent):
+    app.fast_path.learn('Yes')
+    client = app.app.test_client()
+    for session_id, contexts in (('cache-e', []), ('cache-f', ['ordernuggets-followup'])):
+        app.session_store.delete(session_id)
+        with app.session_store.transaction(session_id) as state:
+            state.awaiting_order_confirmation = True
+            state.dialogflow_contexts = contexts
+        client.post('/dialogflow', json={'sessionId': session_id, 'text': 'hours'})
+    client.post('/dialogflow', json={'sessionId': 'cache-f', 'text': 'yes'})
+
+    assert agent.calls == [('cache-e', 'hours'), ('cache-f', 'hours')]
+    # Dialogflow's reply to "hours" left no contexts, so "yes" was answered locally
+    assert app.session_store.get('cache-f').dialogflow_contexts == []
+    assert app.fast_path.hits == 1
+
+
+def test_fast_path_waits_until_dialogflow_shows_intent_sets_no_contexts(agent):
+    state = app.session_store.get('cache-g')
+    state.awaiting_order_confirmation = True
+
+    assert app.fast_path.classify('yes', state) is None
+    app.fast_path.learn('Yes')
+    assert app.fast_path.classify('yes', state) == ('Yes', {})
+
+
+def test_waiter_takes_over_when_async_leader_is_cancelled():
+    cache = IntentCache(100, 600)
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0 if len(calls) > 1 else 10)
+        return 'Result'
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_compute_async('key', compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute_async('key', compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(scenario()) == ('Result', True)
+    assert len(calls) == 2
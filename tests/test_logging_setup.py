@@ -0,0 +1,44 @@
+import io
+import logging
+import logging.handlers
+import queue
+import threading
+
+from logging_setup import DeferredQueueHandler, _JsonPayload
+
+
+def test_records_are_formatted_by_the_listener():
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, writer)
+    logger = logging.getLogger('test_logging_setup')
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    payload = _JsonPayload({'items': [1, 2]})
+    seen = []
+    original_str = _JsonPayload.__str__
+
+    def recording_str(self):
+        seen.append(threading.current_thread().name)
+        return original_str(self)
+
+    _JsonPayload.__str__ = recording_str
+    try:
+        logger.warning('payload %s cart %s', payload, {'cart': 1})
+        queued = log_queue.get_nowait()
+        assert queued.msg == 'payload %s cart %s'
+        assert queued.args[0] is payload
+        # Mutable arguments are captured as text when logged
+        assert queued.args[1] == "{'cart': 1}"
+        assert seen == []
+
+        log_queue.put(queued)
+        listener.start()
+        listener.stop()
+    finally:
+        _JsonPayload.__str__ = original_str
+
+    assert stream.getvalue() == 'payload {"items": [1, 2]} cart {\'cart\': 1}\n'
+    assert seen and threading.current_thread().name not in seen
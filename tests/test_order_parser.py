@@ -0,0 +1,96 @@
+import pytest
+
+import app
+from order_parser import MAX_QUANTITY
+
+
+@pytest.fixture
+def parse():
+    return app.catalogs.current.order_parser.parse
+
+
+def summary(items):
+    return [(item.quantity, item.size, item.item, item.modifiers) for item in items]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('can i get 2 large fries and a lemonade',
+     [(2, 'Large', 'Waffle Potato Fries', ()), (1, None, 'Chick-fil-A Lemonade', ())]),
+    ('Bacon, Egg & Cheese Biscuit', [(1, None, 'Bacon, Egg & Cheese Biscuit', ())]),
+    ('a spicy deluxe, a coke', [(1, None, 'Spicy Deluxe Sandwich', ()), (1, None, 'Soft Drink', ())]),
+])
+def test_items_sizes_and_quantities(parse, text, expected):
+    assert summary(parse(text)) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('12 count nuggets', [(1, None, 'Nuggets (12-count)', ())]),
+    ('8 piece grilled nuggets', [(1, None, 'Grilled Nuggets (8-count)', ())]),
+    ('2 12-count nuggets', [(2, None, 'Nuggets (12-count)', ())]),
+    ('eight count nugget and a coke', [(1, None, 'Nuggets (8-count)', ()), (1, None, 'Soft Drink', ())]),
+])
+def test_piece_count_is_the_item_not_the_quantity(parse, text, expected):
+    assert summary(parse(text)) == expected
+
+
+def test_nuggets_without_a_count_are_left_for_fallback(parse):
+    [item] = parse('grilled nuggets')
+    assert item.item is None
+    assert item.text == 'grilled nuggets'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('mac and cheese', [(1, None, 'Mac & Cheese', ())]),
+    ('a large mac and cheese and a coke', [(1, 'Large', 'Mac & Cheese', ()), (1, None, 'Soft Drink', ())]),
+    ('sweet and spicy sriracha sauce', [(1, None, 'Sweet and Spicy Sriracha Sauce', ())]),
+])
+def test_names_with_and_are_not_split(parse, text, expected):
+    assert summary(parse(text)) == expected
+
+
+def test_quantity_above_the_limit_is_kept_for_the_caller(parse):
+    [item] = parse(f"{MAX_QUANTITY + 51} chicken sandwiches")
+    assert item.quantity == MAX_QUANTITY + 51
+    assert item.item == 'Chicken Sandwich'
+
+
+@pytest.mark.parametrize('text', [
+    'a chicken sandwich with pickles and extra sauce',
+    'a chicken sandwich no pickles, extra sauce',
+])
+def test_modifier_after_separator_stays_with_item(parse, text):
+    [item] = parse(text)
+    assert item.item == 'Chicken Sandwich'
+    assert len(item.modifiers) == 2
+    assert item.modifiers[1] == 'extra sauce'
+
+
+def test_order_food_refuses_quantity_above_the_limit():
+    client = app.app.test_client()
+    body = {
+        'session': 'projects/p/agent/sessions/test-parser-limit',
+        'queryResult': {'intent': {'displayName': 'OrderFood'},
+                        'queryText': '150 chicken sandwiches and a coke', 'parameters': {}},
+    }
+    reply = client.post('/dialogflow', json=body).get_json()['fulfillmentText']
+    assert f"up to {MAX_QUANTITY}" in reply
+    assert 'Chicken Sandwich' not in reply
+    assert 'Soft Drink' in reply
+
+
+@pytest.mark.parametrize('sizes, expected', [
+    ([], 'Chick-fil-A Lemonade (Medium)'),
+    (['Large'], 'Chick-fil-A Lemonade (Large)'),
+])
+def test_order_food_takes_default_size_from_size_list(sizes, expected):
+    session_id = f"test-parser-sizes-{len(sizes)}"
+    app.session_store.delete(session_id)
+    client = app.app.test_client()
+    body = {
+        'session': f"projects/p/agent/sessions/{session_id}",
+        'queryResult': {'intent': {'displayName': 'OrderFood'},
+                        'queryText': 'a lemonade', 'parameters': {'Size': sizes}},
+    }
+    reply = client.post('/dialogflow', json=body).get_json()['fulfillmentText']
+    assert expected in reply
+    assert [line.item for line in app.session_store.get(session_id).orders] == [expected]
@@ -0,0 +1,32 @@
+import json
+import os
+
+from catalog import CatalogStore, DEFAULT_PATH
+from price_table import PriceTable
+
+
+def test_shared_file_is_mapped_and_priced(tmp_path):
+    table = PriceTable({'Cobb Salad': 8.19, 'Side Salad': 5.0},
+                       {'s1': {'Cobb Salad': None}}, shared_dir=str(tmp_path))
+
+    assert os.path.dirname(table.path) == str(tmp_path)
+    assert table.base['Cobb Salad'] == 8.19
+    assert table.for_store('s1').get('Cobb Salad') is None
+
+
+def test_reload_removes_superseded_price_files(tmp_path):
+    with open(DEFAULT_PATH) as f:
+        data = json.load(f)
+    catalog_path = tmp_path / 'catalog.json'
+    catalog_path.write_text(json.dumps(data))
+    shared_dir = tmp_path / 'prices'
+    store = CatalogStore(str(catalog_path), shared_dir=str(shared_dir))
+    first = store.current
+
+    data['price_list']['Cobb Salad'] += 1
+    catalog_path.write_text(json.dumps(data))
+    assert store.reload(force=True)
+
+    assert os.listdir(shared_dir) == [os.path.basename(store.current.price_table.path)]
+    # The earlier catalog still reads its prices from the removed file's mapping
+    assert first.prices_for(None)['Cobb Salad'] == data['price_list']['Cobb Salad'] - 1
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from session_store import MemorySessionStore, SessionStore, SqliteSessionStore
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_sqlite_child_opens_its_own_connection_after_fork(tmp_path):
+    store = SqliteSessionStore(str(tmp_path / 'sessions.db'))
+    with store.transaction('parent') as state:
+        state.awaiting_more_items = True
+    parent_conn = store._connect()
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = store._connect() is not parent_conn and store.get('parent').awaiting_more_items
+            with store.transaction('child') as state:
+                state.awaiting_more_items = True
+            os.write(write, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+
+    assert os.read(read, 1) == b'1'
+    assert store.get('child').awaiting_more_items
+
+
+def test_session_store_interface_is_abstract():
+    class Partial(SessionStore):
+        def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path: MemorySessionStore(),
+    lambda tmp_path: SqliteSessionStore(str(tmp_path / 'sessions.db')),
+])
+def test_transaction_that_raises_leaves_state_unchanged(tmp_path, make_store):
+    store = make_store(tmp_path)
+    with store.transaction('s') as state:
+        state.orders.add('Cobb Salad', 1, 899)
+
+    with pytest.raises(RuntimeError):
+        with store.transaction('s') as state:
+            state.orders.add('Cobb Salad', 1, 899)
+            state.awaiting_order_confirmation = True
+            raise RuntimeError
+
+    state = store.get('s')
+    assert state.orders.to_compact() == [['Cobb Salad', 1, 899]]
+    assert not state.awaiting_order_confirmation
@@ -0,0 +1,62 @@
+import pytest
+
+import app
+from catalog import Catalog, read_catalog_file
+
+STORE = 'store9'
+
+
+@pytest.fixture
+def store_catalog(monkeypatch):
+    """The shipped catalog plus a store that does not price the Cobb Salad"""
+    data = read_catalog_file()
+    data['stores'] = {STORE: {'prices': {'Cobb Salad': None}}}
+    catalog = Catalog(data, 10**6)
+    monkeypatch.setattr(app.catalogs, 'current', catalog)
+    return catalog
+
+
+def send(client, session, intent, text='', parameters=None):
+    body = {
+        'session': f"projects/p/agent/sessions/{session}",
+        'queryResult': {'intent': {'displayName': intent}, 'queryText': text,
+                        'parameters': parameters or {}},
+    }
+    return client.post('/webhook', json=body).get_json()['fulfillmentText']
+
+
+def test_price_question_for_unpriced_item_does_not_crash(store_catalog):
+    client = app.app.test_client()
+    session = f"{STORE}__price-question"
+    app.session_store.delete(session)
+    send(client, session, 'MenuQuery', 'tell me about the cobb salad', {'fooditem': 'Cobb Salad'})
+
+    reply = send(client, session, 'Yes', 'yes')
+
+    assert 'Cobb Salad' in reply
+    assert '$' not in reply
+
+
+def test_item_a_store_does_not_sell_is_not_added(store_catalog):
+    client = app.app.test_client()
+    session = f"{STORE}__add-unpriced"
+    app.session_store.delete(session)
+
+    reply = send(client, session, 'OrderFood', 'a cobb salad and a chicken sandwich',
+                 {'FoodItem': ['Cobb Salad', 'Chicken Sandwich']})
+
+    assert 'Cobb Salad is not available' in reply
+    assert [line.item for line in app.session_store.get(session).orders] == ['Chicken Sandwich']
+
+
+def test_price_answer_uses_the_store_price_only(store_catalog):
+    client = app.app.test_client()
+    session = f"{STORE}__confirm-price"
+    app.session_store.delete(session)
+    with app.session_store.transaction(session) as state:
+        state.awaiting_menu_response = {'item': 'Cobb Salad', 'asked_about': 'price'}
+
+    reply = send(client, session, 'ConfirmOrder', 'yes')
+
+    assert '$' not in reply
+    assert "don't have a price" in reply
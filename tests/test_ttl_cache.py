@@ -0,0 +1,28 @@
+import time
+
+from ttl_cache import TTLCache
+
+
+def test_read_without_sliding_does_not_hide_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=10)
+    cache.set('a', 1)
+    now[0] += 5
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    now[0] += 7
+    # 'a' expired; a read must not have moved it behind the live 'b'
+    assert cache.purge() == 1
+    assert 'b' in cache
+
+
+def test_sliding_read_makes_entry_most_recent():
+    cache = TTLCache(maxsize=2, ttl=60, sliding=True)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    # The read made 'a' the most recent, so 'b' was evicted
+    assert 'a' in cache and 'b' not in cache
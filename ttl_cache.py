@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire after ``ttl`` seconds.
+
+    Entries are kept in expiry order, so with a constant TTL every expired
+    entry sits at the front of the ordering and can be purged in O(1) each.
+    With ``sliding=True`` a successful read pushes the expiry out again and
+    moves the entry to the back, making eviction LRU, which is what
+    conversation state wants. Caches leave it off; a read then neither
+    extends nor reorders the entry, and eviction drops the oldest write.
+    """
+
+    def __init__(self, maxsize=10000, ttl=1800, sliding=False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sliding = sliding
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            if self.sliding:
+                self._data[key] = (now + self.ttl, value)
+                self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            self._purge(now)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def purge(self):
+        """Drop every expired entry. Returns the number of entries left."""
+        with self._lock:
+            self._purge(time.monotonic())
+            return len(self._data)
+
+    def values(self):
+        """Snapshot of the live values, oldest first."""
+        now = time.monotonic()
+        with self._lock:
+            return [value for expires_at, value in self._data.values()
+                    if expires_at > now]
+
+    def _purge(self, now):
+        # Caller holds the lock
+        data = self._data
+        while data:
+            key, (expires_at, _) = next(iter(data.items()))
+            if expires_at > now:
+                break
+            del data[key]
+            self.expirations += 1
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        # Membership checks neither count as hits nor refresh the entry
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
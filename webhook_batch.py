@@ -0,0 +1,119 @@
+"""Replay many Dialogflow fulfillment requests through the intent handlers.
+
+Input is NDJSON, one webhook request body per line; output is NDJSON, one
+webhook response per input line, in input order. Requests for the same
+session run one after another in input order, while different sessions
+run in parallel.
+
+    python webhook_batch.py recorded.ndjson > responses.ndjson
+    python webhook_batch.py --url http://localhost:5000/webhook/batch < recorded.ndjson
+
+Without --url the handlers run in this process (against the configured
+session store); with it the file is streamed to a running app's
+/webhook/batch endpoint.
+"""
+import argparse
+import json
+import shutil
+import sys
+import threading
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def parse_line(line):
+    """Webhook request dict for an NDJSON line, or None if it isn't one"""
+    try:
+        req = json.loads(line)
+    except ValueError:
+        return None
+    return req if isinstance(req, dict) else None
+
+
+def run_batch(lines, handle, session_of, max_workers=8, window=1024):
+    """Yield ``handle(req)`` for every NDJSON line of ``lines``, in input order.
+
+    Each session gets a lane: the first request for a session schedules a
+    task that drains that session's queue, so its requests never overlap
+    or reorder. At most ``window`` results are held waiting for an earlier,
+    slower line, which bounds memory on long inputs.
+    """
+    lock = threading.Lock()
+    lanes = {}  # session -> deque of (req, future) not yet started
+
+    def drain(session):
+        while True:
+            with lock:
+                lane = lanes[session]
+                if not lane:
+                    del lanes[session]
+                    return
+                req, future = lane.popleft()
+            try:
+                future.set_result(handle(req))
+            except Exception as e:
+                future.set_exception(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for line in lines:
+            if not line.strip():
+                continue
+            future = Future()
+            req = parse_line(line)
+            if req is None:
+                future.set_result({'fulfillmentText': "Invalid request format."})
+            else:
+                session = session_of(req)
+                with lock:
+                    lane = lanes.get(session)
+                    start = lane is None
+                    if start:
+                        lane = lanes[session] = deque()
+                    lane.append((req, future))
+                if start:
+                    pool.submit(drain, session)
+            pending.append(future)
+
+            while pending and (pending[0].done() or len(pending) >= window):
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def to_ndjson(results):
+    for result in results:
+        yield json.dumps(result) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', nargs='?', help='NDJSON file (default: stdin)')
+    parser.add_argument('--url', help='stream to this /webhook/batch endpoint instead')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='sessions processed in parallel (local mode)')
+    args = parser.parse_args()
+
+    source = open(args.input, 'rb') if args.input else sys.stdin.buffer
+    with source:
+        if args.url:
+            batch_request = urllib.request.Request(
+                args.url, data=source, method='POST',
+                headers={'Content-Type': 'application/x-ndjson'})
+            with urllib.request.urlopen(batch_request) as response:
+                shutil.copyfileobj(response, sys.stdout.buffer)
+            return
+
+        from app import process_webhook, get_consistent_session_id
+        results = run_batch(
+            source, process_webhook,
+            lambda req: get_consistent_session_id(req.get('session', '')),
+            max_workers=args.workers)
+        for chunk in to_ndjson(results):
+            sys.stdout.write(chunk)
+
+
+if __name__ == '__main__':
+    main()